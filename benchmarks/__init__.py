@@ -0,0 +1,6 @@
+"""
+Benchmarks of the optimization engines on synthetic load profiles.
+
+Run `python -m benchmarks run -o results.json` from the repository root and
+compare two runs with `python -m benchmarks compare before.json after.json`.
+"""
@@ -0,0 +1,98 @@
+import argparse
+import fnmatch
+import logging
+import sys
+
+from benchmarks.runner import STAGES, compare, load, run_benchmarks, save
+from benchmarks.scenarios import ENGINES, SCENARIOS
+from benchmarks.startup import COMMANDS, run_startup_benchmarks
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Peak Shaving Analyzer benchmarks")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    subparsers.add_parser("list", help="List the scenarios and their engines")
+
+    run_parser = subparsers.add_parser("run", help="Run benchmarks and save the timings")
+    run_parser.add_argument(
+        "-s", "--scenario", type=str, nargs="+", default=["*"], help="Scenario names or patterns, e.g. 'storage_1y_*'"
+    )
+    run_parser.add_argument("-e", "--engine", type=str, nargs="+", choices=ENGINES, default=None)
+    run_parser.add_argument("-r", "--repeat", type=int, default=3, help="Optimizations per benchmark")
+    run_parser.add_argument("--seed", type=int, default=0, help="Seed of the synthetic timeseries")
+    run_parser.add_argument(
+        "--include-slow", help="Also run engines on scenarios above their size limit", action="store_true"
+    )
+    run_parser.add_argument("-o", "--output", type=str, default=None, help="Path to save the results to (json)")
+
+    startup_parser = subparsers.add_parser("startup", help="Measure the import and CLI startup times")
+    startup_parser.add_argument(
+        "-c", "--command", dest="command_names", type=str, nargs="+", choices=list(COMMANDS), default=None
+    )
+    startup_parser.add_argument("-r", "--repeat", type=int, default=10, help="Processes per command")
+    startup_parser.add_argument("-o", "--output", type=str, default=None, help="Path to save the results to (json)")
+
+    compare_parser = subparsers.add_parser("compare", help="Compare the timings of two runs")
+    compare_parser.add_argument("baseline", type=str, help="Results of the earlier run")
+    compare_parser.add_argument("results", type=str, help="Results of the later run")
+    compare_parser.add_argument("--stage", type=str, choices=STAGES, default="total")
+    compare_parser.add_argument(
+        "--threshold", type=float, default=1.2, help="Ratio above which a benchmark counts as slower"
+    )
+
+    args = parser.parse_args(argv)
+    # only the benchmarks log progress, the optimizations themselves stay quiet
+    logging.basicConfig(format="%(asctime)s %(levelname)-8s %(message)s", level=logging.WARNING, datefmt="%H:%M:%S")
+    logging.getLogger("benchmarks").setLevel(logging.INFO)
+
+    if args.command == "list":
+        for scenario in SCENARIOS:
+            print(f"{scenario.name:<28}{scenario.n_timesteps:>8} timesteps   {', '.join(scenario.engines())}")
+        return 0
+
+    if args.command == "run":
+        scenarios = [s for s in SCENARIOS if any(fnmatch.fnmatch(s.name, pattern) for pattern in args.scenario)]
+        if not scenarios:
+            print(f"No scenario matches {args.scenario}.", file=sys.stderr)
+            return 1
+
+        report = run_benchmarks(
+            scenarios, engines=args.engine, repeat=args.repeat, seed=args.seed, include_slow=args.include_slow
+        )
+        for b in report["benchmarks"]:
+            seconds = "  ".join(f"{stage} {b['median_seconds'][stage]:.3f}" for stage in STAGES)
+            print(f"{b['scenario']:<28}{b['engine']:<9}{seconds}")
+
+        if args.output:
+            save(report, args.output)
+            print(f"Results saved to {args.output}")
+        return 0
+
+    if args.command == "startup":
+        report = run_startup_benchmarks(args.command_names, repeat=args.repeat)
+        for b in report["benchmarks"]:
+            print(f"{b['engine']:<18}{b['median_seconds']['total']:.3f} s")
+
+        if args.output:
+            save(report, args.output)
+            print(f"Results saved to {args.output}")
+        return 0
+
+    rows = compare(load(args.baseline), load(args.results), stage=args.stage)
+    n_slower = 0
+    for row in rows:
+        slower = row["ratio"] is not None and row["ratio"] > args.threshold
+        n_slower += slower
+        flags = ("  SLOWER" if slower else "") + ("  COSTS CHANGED" if row["costs_changed"] else "")
+        ratio = "-" if row["ratio"] is None else f"{row['ratio']:.2f}x"
+        print(
+            f"{row['scenario']:<28}{row['engine']:<9}"
+            f"{row['baseline_seconds']:>10.3f} s -> {row['seconds']:>10.3f} s  {ratio:>7}{flags}"
+        )
+
+    return 1 if n_slower else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,192 @@
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import time
+from collections.abc import Iterable
+from datetime import datetime, timezone
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+
+from benchmarks.scenarios import Scenario
+from peakshaving_analyzer.profiling import PHASES
+from peakshaving_analyzer.PSA import PeakShavingAnalyzer
+
+log = logging.getLogger(__name__)
+
+# timed stages of a benchmark: generating the synthetic input, the phases of the optimization and in total
+STAGES = ("generate", *PHASES, "total")
+
+PACKAGES = ("peakshaving-analyzer", "numpy", "pandas", "scipy", "highspy", "pyomo", "fine")
+
+
+def run_benchmark(scenario: Scenario, engine: str, repeat: int = 3, seed: int = 0) -> dict:
+    """Optimizes a scenario several times and collects the timings of every stage.
+
+    Args:
+        scenario (Scenario): The scenario.
+        engine (str): The engine, see `benchmarks.scenarios.ENGINES`.
+        repeat (int): Number of optimizations.
+        seed (int): Seed of the synthetic timeseries.
+
+    Returns:
+        dict: Minimum and median seconds per stage, the model size and the total costs
+            (to notice changed results besides changed timings).
+    """
+
+    timings = {stage: [] for stage in STAGES}
+    for _ in range(repeat):
+        start = time.perf_counter()
+        config = scenario.config(engine, seed=seed)
+        timings["generate"].append(time.perf_counter() - start)
+
+        results = PeakShavingAnalyzer(config).optimize()
+        for phase in PHASES:
+            timings[phase].append(getattr(results.profile, f"{phase}_seconds"))
+        timings["total"].append(results.profile.total_seconds)
+
+    profile = results.profile
+
+    return {
+        "scenario": scenario.name,
+        "engine": engine,
+        "n_timesteps": scenario.n_timesteps,
+        "repeat": repeat,
+        "min_seconds": {stage: min(values) for stage, values in timings.items()},
+        "median_seconds": {stage: statistics.median(values) for stage, values in timings.items()},
+        "n_variables": profile.n_variables,
+        "n_constraints": profile.n_constraints,
+        "n_nonzeros": profile.n_nonzeros,
+        "total_yearly_costs_eur": results.total_yearly_costs_eur,
+    }
+
+
+def run_benchmarks(
+    scenarios: Iterable[Scenario],
+    engines: Iterable[str] | None = None,
+    repeat: int = 3,
+    seed: int = 0,
+    include_slow: bool = False,
+) -> dict:
+    """Runs the benchmarks of all scenarios and engines.
+
+    Args:
+        scenarios (Iterable[Scenario]): The scenarios.
+        engines (Iterable[str] | None): Engines to benchmark, defaults to all engines of each scenario.
+        repeat (int): Number of optimizations per benchmark.
+        seed (int): Seed of the synthetic timeseries.
+        include_slow (bool): Whether to run engines on scenarios above their `MAX_TIMESTEPS`.
+
+    Returns:
+        dict: Metadata of the run (commit, versions, machine) and the benchmarks.
+    """
+
+    benchmarks = []
+    for scenario in scenarios:
+        for engine in scenario.engines(include_slow=include_slow):
+            if engines is not None and engine not in engines:
+                continue
+
+            log.info(f"Benchmarking {scenario.name} with the {engine} engine.")
+            benchmark = run_benchmark(scenario, engine, repeat=repeat, seed=seed)
+            benchmarks.append(benchmark)
+            log.info(f"{scenario.name} ({engine}): {benchmark['median_seconds']['total']:.3f} s")
+
+    return {"metadata": metadata(seed=seed, repeat=repeat), "benchmarks": benchmarks}
+
+
+def metadata(**kwargs) -> dict:
+    """Commit, package versions and machine of a benchmark run."""
+
+    versions = {}
+    for package in PACKAGES:
+        try:
+            versions[package] = version(package)
+        except PackageNotFoundError:
+            versions[package] = None
+
+    return {
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "n_cpus": os.cpu_count(),
+        "versions": versions,
+        **kwargs,
+    }
+
+
+def save(report: dict, path: str | Path) -> None:
+    with open(path, "w") as f:
+        json.dump(report, f, indent=4)
+
+
+def load(path: str | Path) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(baseline: dict, report: dict, stage: str = "total", statistic: str = "median_seconds") -> list[dict]:
+    """Compares the timings of two benchmark runs.
+
+    Args:
+        baseline (dict): Report of the earlier run.
+        report (dict): Report of the later run.
+        stage (str): Stage to compare, see `STAGES`.
+        statistic (str): "median_seconds" or "min_seconds".
+
+    Returns:
+        list[dict]: One entry per benchmark in both runs with both timings and
+            their ratio (above 1 means slower) and whether the total costs changed.
+    """
+
+    if stage not in STAGES:
+        raise ValueError(f"Unknown stage '{stage}'. Choose one of {STAGES}.")
+
+    baseline_benchmarks = {(b["scenario"], b["engine"]): b for b in baseline["benchmarks"]}
+
+    rows = []
+    for benchmark in report["benchmarks"]:
+        old = baseline_benchmarks.get((benchmark["scenario"], benchmark["engine"]))
+        if old is None:
+            continue
+
+        old_seconds = old[statistic][stage]
+        new_seconds = benchmark[statistic][stage]
+        rows.append(
+            {
+                "scenario": benchmark["scenario"],
+                "engine": benchmark["engine"],
+                "baseline_seconds": old_seconds,
+                "seconds": new_seconds,
+                "ratio": new_seconds / old_seconds if old_seconds else None,
+                "costs_changed": not _isclose(old["total_yearly_costs_eur"], benchmark["total_yearly_costs_eur"]),
+            }
+        )
+
+    return rows
+
+
+def _isclose(a: float | None, b: float | None, rel_tol: float = 1e-6) -> bool:
+    if a is None or b is None:
+        return a is b
+
+    return abs(a - b) <= rel_tol * max(abs(a), abs(b), 1.0)
+
+
+def _git_commit() -> str | None:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=Path(__file__).parent,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+    return result.stdout.strip()
@@ -0,0 +1,91 @@
+from dataclasses import dataclass, field
+
+from benchmarks.synthetic import n_timesteps, synthetic_config
+from peakshaving_analyzer.config import Config
+
+# benchmarked engines, "rolling" is the native engine optimizing in monthly windows
+ENGINES = ("fine", "native", "fast", "rolling")
+
+# largest problems solved by default per engine, larger ones take too long for regular runs
+MAX_TIMESTEPS = {"fine": 8760}
+
+ROLLING_WINDOW_HOURS = 30 * 24
+ROLLING_OVERLAP_HOURS = 7 * 24
+
+# system variants: storage only with a flat price (solvable by the fast engine),
+# PV only and storage with PV, both with a dynamic price
+SYSTEMS = {
+    "storage": dict(storage=True, pv=False, dynamic_price=False),
+    "pv": dict(storage=False, pv=True, dynamic_price=True),
+    "storage_pv": dict(storage=True, pv=True, dynamic_price=True),
+}
+
+
+@dataclass(frozen=True)
+class Scenario:
+    system: str
+    years: float
+    hours_per_timestep: float
+    config_parameters: dict = field(default_factory=dict, compare=False, hash=False)
+
+    @property
+    def name(self) -> str:
+        return f"{self.system}_{self.years:g}y_{self.hours_per_timestep * 60:g}min"
+
+    @property
+    def n_timesteps(self) -> int:
+        return n_timesteps(self.years, self.hours_per_timestep)
+
+    @property
+    def fast_path_applicable(self) -> bool:
+        """Whether the fast engine solves the scenario, see `is_fast_path_applicable`."""
+
+        parameters = SYSTEMS[self.system] | self.config_parameters
+
+        return parameters["storage"] and not parameters["pv"] and not parameters["dynamic_price"]
+
+    def config(self, engine: str, seed: int = 0) -> Config:
+        """Synthetic configuration of the scenario for an engine."""
+
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine '{engine}'. Choose one of {ENGINES}.")
+
+        parameters = SYSTEMS[self.system] | self.config_parameters
+        if engine == "rolling":
+            parameters |= dict(
+                engine="native",
+                rolling_window_hours=ROLLING_WINDOW_HOURS,
+                rolling_overlap_hours=ROLLING_OVERLAP_HOURS,
+            )
+        else:
+            parameters |= dict(engine=engine)
+
+        config = synthetic_config(self.years, self.hours_per_timestep, seed=seed, **parameters)
+        config.name = self.name
+
+        return config
+
+    def engines(self, include_slow: bool = False) -> list[str]:
+        """Engines benchmarked for the scenario.
+
+        The fast engine is skipped where it would fall back to the native LP,
+        engines are skipped above their `MAX_TIMESTEPS` unless `include_slow` is set.
+        """
+
+        engines = []
+        for engine in ENGINES:
+            if not include_slow and self.n_timesteps > MAX_TIMESTEPS.get(engine, self.n_timesteps):
+                continue
+            if engine == "fast" and not self.fast_path_applicable:
+                continue
+            engines.append(engine)
+
+        return engines
+
+
+SCENARIOS = [
+    Scenario(system, years, hours_per_timestep)
+    for system in SYSTEMS
+    for hours_per_timestep in (1, 0.25)
+    for years in (1, 2, 3)
+]
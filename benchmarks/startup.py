@@ -0,0 +1,61 @@
+import logging
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from benchmarks.runner import metadata
+
+log = logging.getLogger(__name__)
+
+# python arguments per measured command, "python" is the interpreter alone for reference
+COMMANDS = {
+    "python": ["-c", "pass"],
+    "import_package": ["-c", "import peakshaving_analyzer"],
+    "import_analyzer": ["-c", "from peakshaving_analyzer import PeakShavingAnalyzer"],
+    "import_fine": ["-c", "import fine"],
+    "cli_help": ["-m", "psa_cli.main", "--help"],
+}
+
+# the checkout is imported rather than an installed version
+ROOT = Path(__file__).parent.parent
+
+
+def run_startup_benchmarks(commands: list[str] | None = None, repeat: int = 10) -> dict:
+    """Measures the startup time of fresh processes importing the package or running the CLI.
+
+    The results use the scenario "startup" and the command as engine, so they can
+    be saved and compared like the other benchmarks.
+
+    Args:
+        commands (list[str] | None): Commands to measure, defaults to all `COMMANDS`.
+        repeat (int): Number of processes per command.
+
+    Returns:
+        dict: Metadata of the run and the benchmarks.
+    """
+
+    benchmarks = []
+    for command in commands or COMMANDS:
+        log.info(f"Measuring startup of {command}.")
+        seconds = [_run(COMMANDS[command]) for _ in range(repeat)]
+        benchmarks.append(
+            {
+                "scenario": "startup",
+                "engine": command,
+                "repeat": repeat,
+                "min_seconds": {"total": min(seconds)},
+                "median_seconds": {"total": statistics.median(seconds)},
+                "total_yearly_costs_eur": None,
+            }
+        )
+
+    return {"metadata": metadata(repeat=repeat), "benchmarks": benchmarks}
+
+
+def _run(args: list[str]) -> float:
+    start = time.perf_counter()
+    subprocess.run([sys.executable, *args], cwd=ROOT, check=True, stdout=subprocess.DEVNULL)
+
+    return time.perf_counter() - start
@@ -0,0 +1,155 @@
+import numpy as np
+import pandas as pd
+from scipy.signal import lfilter
+
+from peakshaving_analyzer.config import Config
+
+HOURS_PER_YEAR = 8760
+
+START = "2023-01-01"
+
+
+def n_timesteps(years: float, hours_per_timestep: float) -> int:
+    return int(round(years * HOURS_PER_YEAR / hours_per_timestep))
+
+
+def synthetic_load(
+    n_timesteps: int, hours_per_timestep: float, seed: int = 0, base_kw: float = 400, shift_kw: float = 600
+) -> np.ndarray:
+    """Load of an industrial site working in two shifts on weekdays.
+
+    The load combines a base load, shift operation from 6 to 22 o'clock on
+    weekdays, a seasonal variation, correlated noise and short peaks of large
+    machines starting up.
+
+    Args:
+        n_timesteps (int): Number of timesteps.
+        hours_per_timestep (float): Length of a timestep in hours.
+        seed (int): Seed of the random generator, the same seed gives the same load.
+        base_kw (float): Load outside of shifts in kW.
+        shift_kw (float): Additional load during shifts in kW.
+
+    Returns:
+        np.ndarray: Load in kW.
+    """
+
+    rng = np.random.default_rng(seed)
+    hours = np.arange(n_timesteps) * hours_per_timestep
+    hour_of_day = hours % 24
+    day_of_week = (hours // 24) % 7
+
+    working = (day_of_week < 5) & (hour_of_day >= 6) & (hour_of_day < 22)
+    # smooth ramps at the start and end of the shifts
+    ramp = np.clip(np.minimum(hour_of_day - 6, 22 - hour_of_day), 0, 1)
+    seasonal = 1 + 0.15 * np.cos(2 * np.pi * hours / HOURS_PER_YEAR)
+
+    # AR(1) noise, correlated over about two hours
+    phi = np.exp(-hours_per_timestep / 2)
+    innovations = rng.normal(0, 0.05 * np.sqrt(1 - phi**2), n_timesteps)
+    noise = lfilter([1], [1, -phi], innovations)
+
+    load = (base_kw + shift_kw * working * ramp) * seasonal * (1 + noise)
+
+    # machine start-ups, on average every other working day
+    n_peaks = rng.poisson(n_timesteps * hours_per_timestep / 24 / 2 * 5 / 7)
+    starts = rng.choice(np.flatnonzero(working), size=min(n_peaks, working.sum()), replace=False)
+    duration = max(1, int(round(0.5 / hours_per_timestep)))
+    for start, height in zip(starts, rng.uniform(0.3, 0.8, len(starts)) * shift_kw, strict=True):
+        load[start : start + duration] += height
+
+    return np.maximum(load, 0)
+
+
+def synthetic_price(n_timesteps: int, hours_per_timestep: float, seed: int = 0, dynamic: bool = True) -> np.ndarray:
+    """Energy price in EUR/kWh.
+
+    Dynamic prices have a morning and an evening peak, a midday dip, lower
+    prices on weekends and noise. Otherwise the price is flat.
+    """
+
+    if not dynamic:
+        return np.full(n_timesteps, 0.25)
+
+    rng = np.random.default_rng(seed + 1)
+    hours = np.arange(n_timesteps) * hours_per_timestep
+    hour_of_day = hours % 24
+    weekend = ((hours // 24) % 7) >= 5
+
+    daily = (
+        0.03 * np.exp(-(((hour_of_day - 8) / 2) ** 2))
+        + 0.05 * np.exp(-(((hour_of_day - 19) / 2) ** 2))
+        - 0.03 * np.exp(-(((hour_of_day - 13) / 2.5) ** 2))
+    )
+    daily_level = rng.normal(0, 0.02, int(np.ceil(hours[-1] / 24)) + 1)[(hours // 24).astype(int)]
+
+    return 0.12 + daily - 0.02 * weekend + daily_level + rng.normal(0, 0.005, n_timesteps)
+
+
+def synthetic_pv(n_timesteps: int, hours_per_timestep: float, seed: int = 0) -> np.ndarray:
+    """PV generation per kWp (between 0 and 1) with seasonal day length and cloudy days."""
+
+    rng = np.random.default_rng(seed + 2)
+    hours = np.arange(n_timesteps) * hours_per_timestep
+    hour_of_day = hours % 24
+    day = (hours // 24).astype(int)
+
+    # longest days in summer, the year starts on January 1st
+    season = -np.cos(2 * np.pi * (hours / 24 + 10) / 365)
+    half_day_length = 6 + 2.5 * season
+    sun = np.clip(np.cos(np.pi / 2 * (hour_of_day + hours_per_timestep / 2 - 12.5) / half_day_length), 0, None)
+    peak = 0.55 + 0.3 * season
+
+    clearness = rng.beta(2, 1.2, day.max() + 1)[day]
+
+    return np.clip(sun * peak * clearness, 0, 1)
+
+
+def synthetic_config(
+    years: float = 1,
+    hours_per_timestep: float = 1,
+    storage: bool = True,
+    pv: bool = False,
+    dynamic_price: bool = True,
+    seed: int = 0,
+    **kwargs,
+) -> Config:
+    """Creates a complete configuration from synthetic timeseries, without any input files or network access.
+
+    Args:
+        years (float): Length of the optimization period.
+        hours_per_timestep (float): Length of a timestep in hours.
+        storage (bool): Whether a storage may be added.
+        pv (bool): Whether an existing PV system is present and a new one may be added.
+        dynamic_price (bool): Whether the energy price varies, otherwise it is flat.
+        seed (int): Seed of the timeseries.
+        **kwargs: Further config parameters.
+
+    Returns:
+        Config: The configuration.
+    """
+
+    n = n_timesteps(years, hours_per_timestep)
+    price = synthetic_price(n, hours_per_timestep, seed=seed, dynamic=dynamic_price)
+
+    data = dict(
+        name=f"synthetic_{years:g}y_{hours_per_timestep * 60:g}min",
+        add_storage=storage,
+        consumption_timeseries=pd.Series(synthetic_load(n, hours_per_timestep, seed=seed)),
+        price_timeseries=pd.DataFrame({"grid": price, "consumption_site": 0.0}),
+        timestamps=pd.date_range(START, periods=n, freq=pd.Timedelta(hours=hours_per_timestep)),
+        n_timesteps=n,
+        hours_per_timestep=hours_per_timestep,
+    )
+
+    if pv:
+        generation = pd.DataFrame({"grid": 0.0, "consumption_site": synthetic_pv(n, hours_per_timestep, seed=seed)})
+        data |= dict(
+            pv_system_already_exists=True,
+            existing_pv_size_kwp=100,
+            existing_pv_generation_timeseries=generation,
+            allow_additional_pv=True,
+            max_pv_system_size_kwp=500,
+            new_pv_generation_timeseries=generation.copy(),
+        )
+
+    return Config(**(data | kwargs))
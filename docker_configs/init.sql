@@ -1,2 +1,47 @@
+CREATE EXTENSION IF NOT EXISTS timescaledb;
+
 CREATE SCHEMA IF NOT EXISTS input;
 CREATE SCHEMA IF NOT EXISTS output;
+
+-- scalar results, one row per optimization
+CREATE TABLE IF NOT EXISTS output.overview (
+    optimization_id TEXT NOT NULL,
+    name TEXT,
+    energy_costs_eur DOUBLE PRECISION,
+    grid_energy_costs_eur DOUBLE PRECISION,
+    grid_capacity_costs_eur DOUBLE PRECISION,
+    grid_capacity_kw DOUBLE PRECISION,
+    storage_invest_eur DOUBLE PRECISION,
+    storage_annuity_eur DOUBLE PRECISION,
+    storage_capacity_kwh DOUBLE PRECISION,
+    inverter_invest_eur DOUBLE PRECISION,
+    inverter_annuity_eur DOUBLE PRECISION,
+    inverter_capacity_kw DOUBLE PRECISION,
+    new_pv_invest_eur DOUBLE PRECISION,
+    new_pv_annuity_eur DOUBLE PRECISION,
+    new_pv_capacity_kwp DOUBLE PRECISION,
+    total_yearly_costs_eur DOUBLE PRECISION,
+    total_annuity_eur DOUBLE PRECISION,
+    total_invest_eur DOUBLE PRECISION,
+    tsa_rmse DOUBLE PRECISION,
+    tsa_mae DOUBLE PRECISION,
+    full_resolution_grid_peak_kw DOUBLE PRECISION
+);
+CREATE INDEX IF NOT EXISTS ix_output_overview_optimization_id ON output.overview (optimization_id);
+
+-- optimized timeseries, one row per optimization and timestep
+CREATE TABLE IF NOT EXISTS output.timeseries (
+    timestamp TIMESTAMP WITH TIME ZONE NOT NULL,
+    grid_usage_kw DOUBLE PRECISION,
+    storage_charge_kw DOUBLE PRECISION,
+    storage_discharge_kw DOUBLE PRECISION,
+    storage_soc_kwh DOUBLE PRECISION,
+    existing_pv_generation_kw DOUBLE PRECISION,
+    new_pv_generation_kw DOUBLE PRECISION,
+    consumption_kw DOUBLE PRECISION,
+    energy_price_eur DOUBLE PRECISION,
+    name TEXT,
+    optimization_id TEXT NOT NULL
+);
+SELECT create_hypertable('output.timeseries', 'timestamp', if_not_exists => TRUE);
+CREATE INDEX IF NOT EXISTS ix_timeseries_optimization_id ON output.timeseries (optimization_id, timestamp);
@@ -1,21 +1,44 @@
+import itertools
 import logging
+import time
 import uuid
+from collections.abc import Iterable
+from typing import TYPE_CHECKING
 
-import fine as fn
 import numpy as np
 import pandas as pd
 
+from peakshaving_analyzer.cache import ResultCache, cached_results, config_hash
 from peakshaving_analyzer.config import Config
+from peakshaving_analyzer.fast import optimize_fast
+from peakshaving_analyzer.native import PeakShavingLP
 from peakshaving_analyzer.output import Results, create_results
+from peakshaving_analyzer.profiling import SolverProfile
+from peakshaving_analyzer.rolling import optimize_rolling
+from peakshaving_analyzer.shared import attach_timeseries
+
+if TYPE_CHECKING:
+    import fine as fn
 
 log = logging.getLogger(__name__)
 
+ENGINES = ("fine", "native", "fast")
+
+
+def _fine():
+    """FINE module, imported on first use since FINE and pyomo take seconds to import."""
+    import fine
+
+    return fine
+
 
 class PeakShavingAnalyzer:
     def __init__(
         self,
         config: Config,
     ) -> None:
+        # timeseries referenced in shared memory or .npy files are attached without copying
+        config = attach_timeseries(config)
         self.config = config
 
         self.consumption_timeseries = config.consumption_timeseries
@@ -30,6 +53,18 @@ class PeakShavingAnalyzer:
         else:
             log.setLevel(level=logging.WARNING)
 
+        self._esm = None
+        self._lp = None
+
+    @property
+    def esm(self) -> "fn.EnergySystemModel":
+        """FINE energy system model, built on first access."""
+        if self._esm is None:
+            self._build_esm()
+
+        return self._esm
+
+    def _build_esm(self):
         self._create_esm()
         self._add_source()
         self._add_transmission()
@@ -49,7 +84,7 @@ class PeakShavingAnalyzer:
             log.info("Added pv.")
 
     def _create_esm(self):
-        self.esm = fn.EnergySystemModel(
+        self._esm = _fine().EnergySystemModel(
             locations={"grid", "consumption_site"},
             commodities={"energy", "stored_energy"},
             commodityUnitsDict={"energy": "kWh", "stored_energy": "kWh"},
@@ -69,7 +104,7 @@ class PeakShavingAnalyzer:
         load_df["consumption_site"] = self.consumption_timeseries * self.config.hours_per_timestep
 
         self.esm.add(
-            fn.Sink(
+            _fine().Sink(
                 esM=self.esm,
                 commodity="energy",
                 name="consumption_site",
@@ -88,7 +123,7 @@ class PeakShavingAnalyzer:
         source_df["consumption_site"] = 0
 
         self.esm.add(
-            fn.Source(
+            _fine().Source(
                 esM=self.esm,
                 commodity="energy",
                 name="grid",
@@ -100,7 +135,7 @@ class PeakShavingAnalyzer:
 
     def _add_transmission(self):
         self.esm.add(
-            fn.Transmission(
+            _fine().Transmission(
                 esM=self.esm,
                 name="capacity_price",
                 commodity="energy",
@@ -115,7 +150,7 @@ class PeakShavingAnalyzer:
 
     def _add_existing_pv(self):
         self.esm.add(
-            fn.Source(
+            _fine().Source(
                 esM=self.esm,
                 name="Existing PV",
                 commodity="energy",
@@ -127,7 +162,7 @@ class PeakShavingAnalyzer:
 
     def add_additional_pv(self):
         self.esm.add(
-            fn.Source(
+            _fine().Source(
                 esM=self.esm,
                 name="New PV",
                 commodity="energy",
@@ -147,7 +182,7 @@ class PeakShavingAnalyzer:
         else:
             max_cap = None
         self.esm.add(
-            fn.Conversion(
+            _fine().Conversion(
                 esM=self.esm,
                 name="to_storage",
                 physicalUnit="kWh",
@@ -168,7 +203,7 @@ class PeakShavingAnalyzer:
         else:
             max_cap = None
         self.esm.add(
-            fn.Storage(
+            _fine().Storage(
                 esM=self.esm,
                 name="storage",
                 commodity="stored_energy",
@@ -193,7 +228,7 @@ class PeakShavingAnalyzer:
         else:
             max_cap = None
         self.esm.add(
-            fn.Conversion(
+            _fine().Conversion(
                 esM=self.esm,
                 name="from_storage",
                 physicalUnit="kWh",
@@ -208,26 +243,201 @@ class PeakShavingAnalyzer:
             )
         )
 
-    def optimize(self, solver: str | None = None) -> Results:
-        log.info("Creating pyomo model.")
-        self.esm.declareOptimizationProblem()
+    def optimize(
+        self, solver: str | None = None, engine: str | None = None, cache: ResultCache | None = None
+    ) -> Results:
+        """Optimizes the system.
 
-        # add constraint setting storage level on start
-        # of optimization to zero
-        if self.config.add_storage:
-            self.esm.pyM.stateOfCharge_stor["consumption_site", "storage", 0, 0, 0].setub(0)
+        Args:
+            solver (str | None): Solver used by pyomo with the FINE engine. Defaults to the solver
+                of the config. The other engines always solve with HiGHS.
+            engine (str | None): "fine" builds the model with FINE and pyomo, "native"
+                builds the same LP directly and solves it with HiGHS, "fast" solves
+                storage-only configurations with a flat energy price without an LP
+                (see `optimize_fast`). Defaults to the engine of the config. If the config sets a rolling window, the
+                native engine is used.
+            cache (ResultCache | None): Cache to look up and store the results in.
+
+        Returns:
+            Results: The optimization results, with the timings and model size in `profile`.
+        """
+
+        start = time.perf_counter()
+
+        if not engine:
+            engine = self.config.engine
+
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine '{engine}'. Choose one of {ENGINES}.")
+
+        uses_fine = engine == "fine" and not self.config.rolling_window_hours
+        if solver and "highs" not in solver and not uses_fine:
+            log.warning(f"The solver '{solver}' is only used by the FINE engine, the {engine} engine uses HiGHS.")
 
         # set solver if not provided
         if not solver:
             solver = self.config.solver
 
+        if cache is not None:
+            key = config_hash(self.config, solver=solver, engine=engine)
+            results = cache.get(key)
+            if results is not None:
+                log.info("Found results in cache.")
+                results = cached_results(results, self.config)
+                results.profile = SolverProfile(
+                    engine=engine, cache_hit=True, total_seconds=time.perf_counter() - start
+                )
+                return results
+
+        if self.config.tsa_typical_periods and (engine != "fine" or self.config.rolling_window_hours):
+            log.warning("Time series aggregation is only supported by the FINE engine and will be ignored.")
+
+        if self.config.rolling_window_hours:
+            if engine != "native":
+                log.info("Rolling horizon optimization always uses the native engine.")
+            profile = SolverProfile(engine="native")
+            results = optimize_rolling(self.config, profile=profile)
+        elif engine == "native":
+            profile = SolverProfile(engine=engine)
+            results = self._optimize_native(profile)
+        elif engine == "fast":
+            profile = SolverProfile(engine=engine)
+            results = optimize_fast(self.config, profile=profile)
+        else:
+            profile = SolverProfile(engine=engine)
+            results = self._optimize_fine(solver, profile)
+
+        profile.total_seconds = time.perf_counter() - start
+        results.profile = profile
+        log.info(f"Optimized in {profile.total_seconds:.3f} s (solver {profile.solve_seconds:.3f} s).")
+
+        if cache is not None:
+            cache.put(key, results)
+
+        return results
+
+    def _optimize_fine(self, solver: str, profile: SolverProfile) -> Results:
+        from peakshaving_analyzer.aggregation import add_aggregation_results, aggregate_timeseries
+
+        use_tsa = bool(self.config.tsa_typical_periods)
+        with profile.measure("build"):
+            esm = self.esm
+            if use_tsa:
+                aggregate_timeseries(esm, self.config)
+
+        log.info("Creating pyomo model.")
+        with profile.measure("declare"):
+            esm.declareOptimizationProblem(timeSeriesAggregation=use_tsa)
+
+            # add constraint setting storage level on start
+            # of optimization to zero
+            if self.config.add_storage and use_tsa:
+                esm.pyM.stateOfChargeInterPeriods_stor["consumption_site", "storage", 0, 0].setub(0)
+            elif self.config.add_storage:
+                esm.pyM.stateOfCharge_stor["consumption_site", "storage", 0, 0, 0].setub(0)
+
+        # counting the nonzeros of a pyomo model takes about as long as declaring it, so they are left out
+        profile.record_model_size(esm.pyM.nvariables(), esm.pyM.nconstraints())
+
         log.info("Optimizing. Depending on the given parameters and your setup, this may take a while.")
 
-        self.esm.optimize(solver=solver, declaresOptimizationProblem=False)
+        with profile.measure("solve"):
+            esm.optimize(solver=solver, declaresOptimizationProblem=False, timeSeriesAggregation=use_tsa)
 
         if not self.config.optimization_id:
             self.config.optimization_id = str(uuid.uuid4())
 
-        results = create_results(self.config, self.esm)
+        with profile.measure("extract"):
+            results = create_results(self.config, esm)
+
+            if use_tsa:
+                add_aggregation_results(results, self.config, esm)
+
+        return results
+
+    def _optimize_native(self, profile: SolverProfile | None = None) -> Results:
+        log.info("Building native LP.")
+        # kept for re-optimizing with changed consumption
+        self._lp = PeakShavingLP(self.config, profile=profile)
+
+        return self._lp.solve()
+
+    def reoptimize(self, consumption_timeseries: pd.Series | np.ndarray) -> Results:
+        """Optimizes the system again after the consumption changed.
+
+        The native model of the previous optimization is kept and only the energy
+        balance of changed timesteps is updated. HiGHS starts from the basis of the
+        previous solve, so e.g. daily updates of the latest values of a yearly profile
+        are much faster than optimizing from scratch. Without a previous native
+        optimization, the model is built first. Rolling windows are ignored.
+
+        Args:
+            consumption_timeseries (pd.Series | np.ndarray): Consumption in kW, one
+                value per timestep of the config.
+
+        Returns:
+            Results: The optimization results, with the timings and model size in `profile`.
+        """
+
+        start = time.perf_counter()
+        profile = SolverProfile(engine="native")
+
+        if self._lp is None:
+            log.info("Building native LP for re-optimization.")
+            self._lp = PeakShavingLP(self.config, profile=profile)
+        else:
+            self._lp.profile = profile
+            profile.record_model_size(self._lp.highs.getNumCol(), self._lp.highs.getNumRow(), self._lp.highs.getNumNz())
+
+        with profile.measure("build"):
+            n_changed = self._lp.update_consumption(consumption_timeseries)
+        log.info(f"Consumption changed in {n_changed} timesteps.")
+
+        results = self._lp.solve()
+
+        self.config = self._lp.config
+        self.consumption_timeseries = self.config.consumption_timeseries
+        # the FINE model still has the previous consumption
+        self._esm = None
+
+        profile.total_seconds = time.perf_counter() - start
+        results.profile = profile
+        log.info(f"Re-optimized in {profile.total_seconds:.3f} s (solver {profile.solve_seconds:.3f} s).")
 
         return results
+
+    def sweep(self, parameters: dict[str, Iterable[float]]) -> pd.DataFrame:
+        """Optimizes the system for every combination of the given cost parameters.
+
+        The native model is built once. Between the solves only the changed cost
+        coefficients are updated and HiGHS starts from the basis of the previous
+        solve, so sweeps are much faster than optimizing every point separately.
+
+        Args:
+            parameters (dict[str, Iterable[float]]): Values per cost parameter, e.g.
+                {"storage_cost_per_kwh": [150, 200], "interest_rate": [2, 4]}. See
+                `COST_PARAMETERS` for the parameters that can be swept.
+
+        Returns:
+            pd.DataFrame: One row per combination with the swept parameters and the
+                scalar results.
+        """
+
+        names = list(parameters)
+        points = list(itertools.product(*(parameters[name] for name in names)))
+
+        log.info(f"Building native LP for sweep over {len(points)} points.")
+        lp = PeakShavingLP(self.config)
+
+        rows = []
+        for point in points:
+            point = dict(zip(names, point, strict=True))
+            lp.update_costs(**point)
+            results = lp.solve()
+
+            row = results.to_dict(include_timeseries=False)
+            for key in ("optimization_id", "name", "timestamps", "profile"):
+                row.pop(key, None)
+            rows.append(point | row)
+
+        return pd.DataFrame(rows)
@@ -1,13 +1,25 @@
 import logging
+from pathlib import Path
+from typing import TYPE_CHECKING
 
-import plotly.express as px
-import plotly.graph_objects as go
-from statsmodels.tsa import seasonal
+import numpy as np
+import pandas as pd
 
 from peakshaving_analyzer.config import Config
+from peakshaving_analyzer.fast import TOLERANCE, _required_level
+from peakshaving_analyzer.plotting import DEFAULT_MAX_POINTS, line_figure, show
+
+if TYPE_CHECKING:
+    from statsmodels.tsa import seasonal
 
 log = logging.getLogger(__name__)
 
+# percentiles of the load added to the statistics
+PERCENTILES = (5, 25, 75, 95)
+
+# default peak caps of the shaving potential as shares of the peak load
+PEAK_CAP_SHARES = np.linspace(0.95, 0.5, 10)
+
 
 class TimeseriesAnalyzer:
     """Analysis helpers that operate on a `Config` instance.
@@ -18,20 +30,57 @@ class TimeseriesAnalyzer:
     def __init__(self, config: Config):
         self.config = config
 
+        self._source = None
+        self._consumption = None
+        self._statistics = None
+        self._sorted = None
+
     def timeseries_to_df(self):
         return self.config.timeseries_to_df()
 
+    def consumption(self) -> np.ndarray:
+        """Consumption in kW as a read-only array.
+
+        The array is cached until the config or its consumption timeseries is
+        replaced, changing the values of the timeseries in place isn't detected.
+        """
+
+        # the cached objects are kept, so an identity check can't match a new object at a reused address
+        source = (self.config, self.config.consumption_timeseries, self.config.hours_per_timestep)
+        if self._source is None or any(a is not b for a, b in zip(source, self._source, strict=True)):
+            # a view, as the array may be the one backing the timeseries
+            values = np.asarray(self.config.consumption_timeseries, dtype=float).view()
+            values.flags.writeable = False
+
+            self._source = source
+            self._consumption = values
+            self._statistics = None
+            self._sorted = None
+
+        return self._consumption
+
+    def sorted_consumption(self) -> np.ndarray:
+        """Consumption in kW sorted descending as a read-only array, cached like `consumption`."""
+
+        consumption = self.consumption()
+        if self._sorted is None:
+            self._sorted = np.sort(consumption)[::-1]
+            self._sorted.flags.writeable = False
+
+        return self._sorted
+
     def calculate_statistics(self, print_out: bool = False) -> dict[str, float]:
-        ts_df = self.timeseries_to_df()
-        stats = {}
+        """Statistics of the consumption, calculated once per consumption timeseries.
 
-        stats["min_load_kw"] = ts_df["consumption_kw"].min()
-        stats["max_load_kw"] = ts_df["consumption_kw"].max()
-        stats["mean_load_kw"] = ts_df["consumption_kw"].mean()
-        stats["median_load_kw"] = ts_df["consumption_kw"].median()
-        stats["variance"] = ts_df["consumption_kw"].var()
-        stats["std"] = ts_df["consumption_kw"].std()
-        stats["total_consumption_kwh"] = ts_df["consumption_kw"].sum() * self.config.hours_per_timestep
+        See `calculate_portfolio_statistics` for the statistics.
+        """
+
+        consumption = self.consumption()
+        if self._statistics is None:
+            stats = _statistics(consumption[np.newaxis], self.config.hours_per_timestep)
+            self._statistics = {key: float(values[0]) for key, values in stats.items()}
+
+        stats = dict(self._statistics)
 
         if print_out:
             for key, value in stats.items():
@@ -39,62 +88,216 @@ class TimeseriesAnalyzer:
 
         return stats
 
-    def plot_load_duration_curve(self):
-        ts_df = self.timeseries_to_df()
+    def load_duration_curve(self) -> pd.DataFrame:
+        """Load duration curve of the consumption.
+
+        Returns:
+            pd.DataFrame: The load sorted descending (`load_kw`) and the number of
+                hours it is reached or exceeded (`hours`).
+        """
+
+        load = self.sorted_consumption()
+
+        return pd.DataFrame({"hours": np.arange(1, len(load) + 1) * self.config.hours_per_timestep, "load_kw": load})
+
+    def shaving_potential(self, peak_caps: list[float] | np.ndarray | None = None) -> pd.DataFrame:
+        """Storage needed to shave the consumption to candidate peak caps, without an optimization.
+
+        For every cap, the storage covers the load above the cap and is charged
+        while the load is below it, limited by the cap and the power of the storage.
+        Like in the optimization, the storage is empty at the start and has the
+        efficiencies of the config. Charge rates and the cyclic lifetime are
+        ignored, so the sizes are lower bounds of the optimal ones. The cost takes
+        one cumulative sum over the consumption per cap.
+
+        Args:
+            peak_caps (list[float] | np.ndarray | None): Peak caps in kW. Defaults
+                to 95 % down to 50 % of the peak load (see `PEAK_CAP_SHARES`).
+
+        Returns:
+            pd.DataFrame: One row per cap with the peak reduction, the hours and the
+                energy above the cap, and the smallest storage power and energy
+                shaving the load to the cap. The energy is NaN if no storage can,
+                because the load above the cap occurs before enough energy is charged.
+        """
+
+        h = self.config.hours_per_timestep
+        load = self.sorted_consumption()
+        peak_kw = float(load[0])
+
+        if peak_caps is None:
+            peak_caps = peak_kw * PEAK_CAP_SHARES
+        peak_caps = np.asarray(peak_caps, dtype=float)
+
+        # energy above all caps at once from the cumulative sum of the sorted load
+        n_above = len(load) - np.searchsorted(load[::-1], peak_caps, side="right")
+        cumulative = np.concatenate([[0.0], np.cumsum(load)])
+        power_kw = np.maximum(peak_kw - peak_caps, 0.0)
+
+        return pd.DataFrame(
+            {
+                "peak_cap_kw": peak_caps,
+                "peak_reduction_kw": power_kw,
+                "peak_reduction_share": power_kw / peak_kw if peak_kw > 0 else np.zeros_like(power_kw),
+                "hours_above_cap": n_above * h,
+                "energy_above_cap_kwh": (cumulative[n_above] - n_above * peak_caps) * h,
+                "storage_power_kw": power_kw,
+                "storage_energy_kwh": [
+                    self._storage_energy(cap, power) for cap, power in zip(peak_caps, power_kw, strict=True)
+                ],
+            }
+        )
+
+    def _storage_energy(self, peak_cap_kw: float, power_kw: float) -> float:
+        """Smallest storage energy shaving the consumption to a cap, see `shaving_potential`."""
+
+        cfg = self.config
+        h = cfg.hours_per_timestep
+
+        excess = (self.consumption() - peak_cap_kw) * h
+        deficit = np.maximum(excess, 0)
+        uptake = (
+            np.minimum(np.maximum(-excess, 0), power_kw * h) * cfg.inverter_efficiency * cfg.storage_charge_efficiency
+        )
+
+        level = _required_level(np.where(deficit > 0, deficit / cfg.storage_discharge_efficiency, -uptake))
+        if level[0] > TOLERANCE * max(1.0, float(level.max())):
+            return np.nan
+
+        return float(level.max())
+
+    def plot_load_duration_curve(
+        self, max_points: int | None = DEFAULT_MAX_POINTS, dynamic: bool = False, path: str | Path | None = None
+    ):
+        """Plots the load sorted descending.
 
-        fig = px.line(
-            data_frame=ts_df.sort_values("consumption_kw", ascending=False, ignore_index=True),
-            x=ts_df.index,
-            y="consumption_kw",
+        Args:
+            max_points (int | None): Maximum number of points, None keeps all points.
+            dynamic (bool): Whether to downsample the visible range again when zooming (Jupyter only).
+            path (str | Path | None): HTML or image file to write the figure to instead of showing it.
+        """
+
+        load = self.sorted_consumption()
+
+        fig = line_figure(
+            np.arange(len(load)),
+            {"consumption_kw": load},
+            max_points=max_points,
+            dynamic=dynamic,
             title="Load duration curve",
+            xaxis_title="Number of times",
+            yaxis_title="Load in kW",
         )
-        fig.update_layout(xaxis_title="Number of times", yaxis_title="Load in kW")
+        show(fig, path)
 
-        fig.show()
+        return fig
 
     def plot_load_histogram(self):
-        ts_df = self.timeseries_to_df()
+        import plotly.express as px
 
-        fig = px.histogram(data_frame=ts_df, x="consumption_kw", title="Histogram of load")
+        fig = px.histogram(x=self.consumption(), title="Histogram of load")
         fig.update_layout(xaxis_title="Load in kW")
 
         fig.show()
 
     def plot_load_box(self):
-        ts_df = self.timeseries_to_df()
+        import plotly.express as px
 
-        fig = px.box(
-            data_frame=ts_df,
-            x="consumption_kw",
-            title="Boxplot of load",
-        )
+        fig = px.box(x=self.consumption(), title="Boxplot of load")
         fig.update_layout(xaxis_title="Load in kW")
 
         fig.show()
 
-    def seasonal_decompose(self) -> seasonal.DecomposeResult:
-        ts_df = self.timeseries_to_df()
-        ts_df.index = self.config.timestamps.copy()
+    def seasonal_decompose(self) -> "seasonal.DecomposeResult":
+        # statsmodels takes about half a second to import
+        from statsmodels.tsa import seasonal
+
+        consumption = pd.Series(self.consumption(), index=self.config.timestamps.copy(), name="consumption_kw")
 
-        decompose_result = seasonal.seasonal_decompose(x=ts_df["consumption_kw"])
+        decompose_result = seasonal.seasonal_decompose(x=consumption)
 
         return decompose_result
 
-    def plot_seasonal_decompose(self):
-        decompose_result = self.seasonal_decompose()
+    def plot_seasonal_decompose(
+        self, max_points: int | None = DEFAULT_MAX_POINTS, dynamic: bool = False, path: str | Path | None = None
+    ):
+        """Plots seasonal, trend and residual component of the load, see `plot_load_duration_curve`."""
 
-        fig = go.Figure()
-        for var in ["seasonal", "trend", "resid"]:
-            fig.add_scatter(
-                x=self.config.timestamps,
-                y=getattr(decompose_result, var),
-                name=var,
-            )
+        decompose_result = self.seasonal_decompose()
 
-        fig.update_layout(
+        fig = line_figure(
+            self.config.timestamps,
+            {var: getattr(decompose_result, var) for var in ["seasonal", "trend", "resid"]},
+            max_points=max_points,
+            dynamic=dynamic,
             title="Seasonal decomposition",
             xaxis_title="Time",
             yaxis_title="Load in kW",
         )
+        show(fig, path)
 
-        fig.show()
+        return fig
+
+
+def calculate_portfolio_statistics(
+    consumption: np.ndarray, hours_per_timestep: float, names: list[str] | None = None
+) -> pd.DataFrame:
+    """Statistics of the consumption of many profiles at once.
+
+    Args:
+        consumption (np.ndarray): Consumption in kW with shape profiles x timesteps.
+        hours_per_timestep (float): Hours per timestep of all profiles.
+        names (list[str] | None): Names of the profiles used as index.
+
+    Returns:
+        pd.DataFrame: One row per profile with the minimum, maximum, mean and median
+            load, variance, standard deviation, total consumption, full load hours,
+            load percentiles (see `PERCENTILES`) and peak to average ratio.
+    """
+
+    consumption = np.asarray(consumption, dtype=float)
+    if consumption.ndim != 2:
+        raise ValueError(f"Expected consumption with shape profiles x timesteps, got shape {consumption.shape}.")
+    if names is not None and len(names) != len(consumption):
+        raise ValueError(f"Expected {len(consumption)} names, got {len(names)}.")
+
+    return pd.DataFrame(_statistics(consumption, hours_per_timestep), index=names)
+
+
+def _statistics(consumption: np.ndarray, hours_per_timestep: float) -> dict[str, np.ndarray]:
+    """Statistics per row of a profiles x timesteps array, as in `calculate_portfolio_statistics`."""
+
+    n = consumption.shape[1]
+
+    # one partition for minimum, median, maximum and all percentiles
+    q = np.array([0, 50, 100, *PERCENTILES])
+    percentiles = np.percentile(consumption, q, axis=1)
+
+    total = consumption.sum(axis=1)
+    mean = total / n
+    # sample variance like pandas, undefined for a single timestep
+    if n > 1:
+        variance = np.square(consumption - mean[:, np.newaxis]).sum(axis=1) / (n - 1)
+    else:
+        variance = np.full(len(consumption), np.nan)
+    max_load = percentiles[2]
+    total_kwh = total * hours_per_timestep
+
+    stats = {}
+    stats["min_load_kw"] = percentiles[0]
+    stats["max_load_kw"] = max_load
+    stats["mean_load_kw"] = mean
+    stats["median_load_kw"] = percentiles[1]
+    stats["variance"] = variance
+    stats["std"] = np.sqrt(variance)
+    stats["total_consumption_kwh"] = total_kwh
+
+    for percentile, values in zip(PERCENTILES, percentiles[3:], strict=True):
+        stats[f"p{percentile}_load_kw"] = values
+
+    # profiles without any consumption have neither
+    with np.errstate(divide="ignore", invalid="ignore"):
+        stats["full_load_hours"] = total_kwh / max_load
+        stats["peak_to_average_ratio"] = max_load / mean
+
+    return stats
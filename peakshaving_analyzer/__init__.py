@@ -1,21 +1,79 @@
 # __init__.py
-from peakshaving_analyzer.config import Config
-from peakshaving_analyzer.input import load_oeds_config, load_yaml_config
-from peakshaving_analyzer.output import Results
-from peakshaving_analyzer.PSA import PeakShavingAnalyzer
-from peakshaving_analyzer.util import create_default_yaml
-
 """
 PeakShaverAnalyzer package initialization.
+
+The public names are imported on first access, so importing the package (e.g.
+in short-lived worker processes or the CLI) doesn't load the optimization,
+plotting, database and geocoding dependencies until they are used.
 """
 
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from peakshaving_analyzer.batch import BatchResult, optimize_batch
+    from peakshaving_analyzer.cache import ResultCache
+    from peakshaving_analyzer.config import Config
+    from peakshaving_analyzer.database import write_results
+    from peakshaving_analyzer.input import load_oeds_config, load_oeds_configs, load_yaml_config
+    from peakshaving_analyzer.output import Results
+    from peakshaving_analyzer.PSA import PeakShavingAnalyzer
+    from peakshaving_analyzer.shared import SharedTimeseriesStore
+    from peakshaving_analyzer.store import ResultStore
+    from peakshaving_analyzer.TSA import TimeseriesAnalyzer
+    from peakshaving_analyzer.TSA import TimeseriesAnalyzer as TimeSeriesAnalyzer
+    from peakshaving_analyzer.util import create_default_yaml
+
+# public name -> (module, attribute)
+_LAZY_ATTRIBUTES = {
+    "PeakShavingAnalyzer": ("peakshaving_analyzer.PSA", "PeakShavingAnalyzer"),
+    "TimeseriesAnalyzer": ("peakshaving_analyzer.TSA", "TimeseriesAnalyzer"),
+    "TimeSeriesAnalyzer": ("peakshaving_analyzer.TSA", "TimeseriesAnalyzer"),
+    "Config": ("peakshaving_analyzer.config", "Config"),
+    "Results": ("peakshaving_analyzer.output", "Results"),
+    "load_yaml_config": ("peakshaving_analyzer.input", "load_yaml_config"),
+    "load_oeds_config": ("peakshaving_analyzer.input", "load_oeds_config"),
+    "load_oeds_configs": ("peakshaving_analyzer.input", "load_oeds_configs"),
+    "create_default_yaml": ("peakshaving_analyzer.util", "create_default_yaml"),
+    "optimize_batch": ("peakshaving_analyzer.batch", "optimize_batch"),
+    "BatchResult": ("peakshaving_analyzer.batch", "BatchResult"),
+    "ResultCache": ("peakshaving_analyzer.cache", "ResultCache"),
+    "write_results": ("peakshaving_analyzer.database", "write_results"),
+    "ResultStore": ("peakshaving_analyzer.store", "ResultStore"),
+    "SharedTimeseriesStore": ("peakshaving_analyzer.shared", "SharedTimeseriesStore"),
+}
+
 __all__ = [
     "PeakShavingAnalyzer",
     "TimeSeriesAnalyzer",
+    "TimeseriesAnalyzer",
     "Config",
     "Results",
     "load_yaml_config",
     "load_oeds_config",
+    "load_oeds_configs",
     "create_default_yaml",
+    "optimize_batch",
+    "BatchResult",
+    "ResultCache",
+    "write_results",
+    "ResultStore",
+    "SharedTimeseriesStore",
 ]
 __version__ = "0.1.11"
+
+
+def __getattr__(name: str):
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    module, attribute = _LAZY_ATTRIBUTES[name]
+    value = getattr(importlib.import_module(module), attribute)
+    # cached, so later accesses don't go through __getattr__
+    globals()[name] = value
+
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
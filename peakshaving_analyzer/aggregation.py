@@ -0,0 +1,92 @@
+import logging
+
+import fine as fn
+import numpy as np
+
+from peakshaving_analyzer.config import Config
+from peakshaving_analyzer.fast import StorageSizing
+from peakshaving_analyzer.native import _optional_bound
+from peakshaving_analyzer.output import Results
+
+log = logging.getLogger(__name__)
+
+
+def aggregate_timeseries(esm: fn.EnergySystemModel, config: Config) -> None:
+    """Clusters the timeseries of the model into typical periods.
+
+    Args:
+        esm (fn.EnergySystemModel): The model to aggregate.
+        config (Config): The configuration with `tsa_typical_periods` set.
+    """
+
+    steps_per_period = round(config.tsa_hours_per_period / config.hours_per_timestep)
+    if steps_per_period < 1 or config.n_timesteps % steps_per_period:
+        raise ValueError(
+            f"Number of timesteps ({config.n_timesteps}) must be a multiple of the timesteps per period "
+            f"({steps_per_period}) for time series aggregation."
+        )
+
+    n_periods = config.n_timesteps // steps_per_period
+    if config.tsa_typical_periods > n_periods:
+        raise ValueError(f"Can't cluster {n_periods} periods into {config.tsa_typical_periods} typical periods.")
+
+    log.info(f"Clustering {n_periods} periods into {config.tsa_typical_periods} typical periods.")
+    esm.aggregateTemporally(
+        numberOfTypicalPeriods=config.tsa_typical_periods,
+        numberOfTimeStepsPerPeriod=steps_per_period,
+        segmentation=False,
+        storeTSAinstance=True,
+    )
+
+
+def add_aggregation_results(results: Results, config: Config, esm: fn.EnergySystemModel) -> None:
+    """Adds the aggregation errors and the full resolution grid peak to results of an aggregated model.
+
+    Args:
+        results (Results): Results of the aggregated model.
+        config (Config): The configuration.
+        esm (fn.EnergySystemModel): The aggregated and optimized model.
+    """
+
+    # errors of the normalized timeseries, the largest of all aggregated timeseries is reported
+    accuracy = esm.tsaInstance.accuracyIndicators()
+    results.tsa_rmse = float(accuracy["RMSE"].max())
+    results.tsa_mae = float(accuracy["MAE"].max())
+
+    results.full_resolution_grid_peak_kw = full_resolution_grid_peak(config, results)
+    if results.full_resolution_grid_peak_kw > results.grid_capacity_kw * 1.001:
+        log.warning(
+            f"The system sized on typical periods can only limit the grid peak of the full timeseries to "
+            f"{results.full_resolution_grid_peak_kw:.2f} kW instead of {results.grid_capacity_kw:.2f} kW."
+        )
+
+
+def full_resolution_grid_peak(config: Config, results: Results) -> float:
+    """Lowest grid peak the optimized system can enforce on the full resolution timeseries.
+
+    Args:
+        config (Config): The configuration with the full resolution timeseries.
+        results (Results): Results containing the system sizes.
+
+    Returns:
+        float: The grid peak in kW.
+    """
+
+    # PV generation reduces the load to cover, surplus can charge the storage
+    load = np.asarray(config.consumption_timeseries, dtype=float)
+    if config.pv_system_already_exists:
+        rate = np.asarray(config.existing_pv_generation_timeseries["consumption_site"], dtype=float)
+        # an unset size is unlimited, as in the optimization
+        size = _optional_bound(config.existing_pv_size_kwp)
+        with np.errstate(invalid="ignore"):
+            load = load - np.where(rate > 0, rate * size, 0)
+    if config.allow_additional_pv:
+        rate = np.asarray(config.new_pv_generation_timeseries["consumption_site"], dtype=float)
+        load = load - rate * results.new_pv_capacity_kwp
+
+    if not config.add_storage:
+        return max(0.0, float(load.max()))
+
+    sizing = StorageSizing(config, load_kw=load)
+
+    return sizing.smallest_grid_capacity(results.storage_capacity_kwh, results.inverter_capacity_kw)
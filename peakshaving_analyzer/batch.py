@@ -0,0 +1,245 @@
+import logging
+import multiprocessing
+import os
+import signal
+import time
+from collections import deque
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from multiprocessing.connection import wait
+from pathlib import Path
+
+from peakshaving_analyzer.cache import ResultCache
+from peakshaving_analyzer.config import Config
+from peakshaving_analyzer.input import load_yaml_config
+from peakshaving_analyzer.output import Results
+from peakshaving_analyzer.PSA import PeakShavingAnalyzer
+from peakshaving_analyzer.shared import SharedTimeseriesStore
+
+log = logging.getLogger(__name__)
+
+
+@dataclass
+class BatchResult:
+    # position of the job in the submitted list
+    index: int
+
+    # name of the optimization (path stem if the config could not be loaded)
+    name: str
+
+    # results of the optimization, None if the job failed
+    results: Results | None = None
+
+    # error message, None if the job succeeded
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def optimize_batch(
+    jobs: Iterable[Config | Path | str],
+    n_workers: int | None = None,
+    timeout: float | None = None,
+    solver: str | None = None,
+    cache: ResultCache | None = None,
+    shared_timeseries: SharedTimeseriesStore | None = None,
+) -> Iterator[BatchResult]:
+    """Optimizes many configurations in parallel on a process pool.
+
+    Results are yielded in order of completion. A failing job (e.g. an
+    infeasible profile or a broken config file) does not abort the batch, its
+    error is reported in the returned `BatchResult` instead.
+
+    Args:
+        jobs (Iterable[Config | Path | str]): Configs or paths to YAML config files.
+        n_workers (int | None): Number of worker processes. Defaults to the number of CPUs.
+        timeout (float | None): Maximum wall-clock time per job in seconds. The worker
+            process of a job exceeding it is terminated and replaced.
+        solver (str | None): Solver overriding the solver of each config.
+        cache (ResultCache | None): Cache to look up and store the results in.
+        shared_timeseries (SharedTimeseriesStore | None): Store to put the timeseries of the configs in,
+            so identical timeseries are sent to the workers once instead of pickled with every job.
+            Needs to stay open until the batch is finished.
+
+    Yields:
+        BatchResult: One result per job as soon as it is finished.
+    """
+
+    jobs = list(jobs)
+    if shared_timeseries is not None:
+        jobs = [shared_timeseries.share(job) if isinstance(job, Config) else job for job in jobs]
+    if n_workers is None:
+        n_workers = os.cpu_count() or 1
+    n_workers = max(1, min(n_workers, len(jobs)))
+
+    log.info(f"Optimizing {len(jobs)} configurations on {n_workers} worker processes.")
+
+    pending = deque(enumerate(jobs))
+    workers = [_Worker() for _ in range(n_workers)]
+    try:
+        while pending or any(worker.busy for worker in workers):
+            for worker in workers:
+                if not worker.busy and pending:
+                    index, job = pending.popleft()
+                    try:
+                        worker.submit(index, job, solver, cache, timeout)
+                    except Exception as e:
+                        # e.g. a config that can't be pickled
+                        yield _log_result(BatchResult(index=index, name=_job_name(job), error=_format_error(e)))
+
+            busy = [worker for worker in workers if worker.busy]
+            if not busy:
+                continue
+            deadlines = [worker.deadline for worker in busy if worker.deadline is not None]
+            wait_seconds = max(min(deadlines) - time.monotonic(), 0) if deadlines else None
+            ready = wait([c for worker in busy for c in (worker.conn, worker.process.sentinel)], timeout=wait_seconds)
+
+            for worker in busy:
+                batch_result = worker.collect(ready)
+                if batch_result is not None:
+                    yield _log_result(batch_result)
+    finally:
+        for worker in workers:
+            worker.stop()
+
+
+class _Worker:
+    """Worker process optimizing one job at a time.
+
+    Timeouts are enforced from the parent, as a signal inside the worker can't
+    interrupt a solver running in C code. A worker exceeding its timeout is
+    terminated and started again for the next job.
+    """
+
+    def __init__(self) -> None:
+        self.process = None
+        self.conn = None
+        self.index = None
+        self.name = None
+        self.deadline = None
+        self.timeout = None
+
+    @property
+    def busy(self) -> bool:
+        return self.index is not None
+
+    def submit(
+        self, index: int, job: Config | Path | str, solver: str | None, cache: ResultCache | None, timeout: float | None
+    ) -> None:
+        if self.process is None:
+            self.conn, child_conn = multiprocessing.Pipe()
+            self.process = multiprocessing.Process(target=_work, args=(child_conn,), daemon=True)
+            self.process.start()
+            child_conn.close()
+
+        self.conn.send((index, job, solver, cache))
+        self.index = index
+        self.name = _job_name(job)
+        self.timeout = timeout
+        self.deadline = time.monotonic() + timeout if timeout is not None else None
+
+    def collect(self, ready: list) -> BatchResult | None:
+        """Result of the current job, if it finished, failed or timed out."""
+
+        if self.conn in ready or self.process.sentinel in ready:
+            try:
+                batch_result = self.conn.recv()
+            except EOFError:
+                # the worker process itself died, e.g. killed by the OS
+                error = f"Worker process died with exit code {self.process.exitcode}."
+                batch_result = BatchResult(index=self.index, name=self.name, error=error)
+                self.stop()
+        elif self.deadline is not None and time.monotonic() >= self.deadline:
+            self.stop()
+            error = f"TimeoutError: Job exceeded its timeout of {self.timeout:g} s."
+            batch_result = BatchResult(index=self.index, name=self.name, error=error)
+        else:
+            return None
+
+        self.index = self.name = self.deadline = self.timeout = None
+
+        return batch_result
+
+    def stop(self) -> None:
+        """Stops the worker process, a running job is aborted."""
+
+        if self.process is None:
+            return
+
+        try:
+            if self.busy:
+                self.process.terminate()
+            else:
+                self.conn.send(None)
+        except OSError:
+            # the process already exited
+            pass
+        self.process.join(5)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+
+        self.conn.close()
+        self.process = None
+        self.conn = None
+
+
+def _work(conn) -> None:
+    """Runs the jobs received from the parent until it sends None."""
+
+    # the parent stops the workers on Ctrl+C
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            # the parent exited
+            return
+        if task is None:
+            return
+
+        conn.send(_run_job(*task))
+
+
+def _run_job(index: int, job: Config | Path | str, solver: str | None, cache: ResultCache | None) -> BatchResult:
+    """Runs a single job inside a worker process."""
+
+    name = _job_name(job)
+
+    try:
+        config = load_yaml_config(job) if isinstance(job, (Path | str)) else job
+        name = config.name
+
+        psa = PeakShavingAnalyzer(config=config)
+        results = psa.optimize(solver=solver, cache=cache)
+    except Exception as e:
+        return BatchResult(index=index, name=name, error=_format_error(e))
+
+    return BatchResult(index=index, name=name, results=results)
+
+
+def _log_result(batch_result: BatchResult) -> BatchResult:
+    if batch_result.ok:
+        log.info(f"Finished optimization {batch_result.name}.")
+    else:
+        log.warning(f"Optimization {batch_result.name} failed: {batch_result.error}")
+
+    return batch_result
+
+
+def _job_name(job: Config | Path | str) -> str:
+    if isinstance(job, Config):
+        return job.name
+
+    return Path(job).stem
+
+
+def _format_error(e: BaseException) -> str:
+    msg = str(e)
+    if msg:
+        return f"{type(e).__name__}: {msg}"
+
+    return type(e).__name__
@@ -0,0 +1,206 @@
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+import time
+import uuid
+from dataclasses import fields, replace
+from importlib import metadata
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from peakshaving_analyzer.config import Config
+from peakshaving_analyzer.output import Results
+
+log = logging.getLogger(__name__)
+
+# config fields not influencing the optimization results
+IGNORED_FIELDS = ("optimization_id", "verbose")
+
+
+class ResultCache:
+    """On-disk cache for optimization results.
+
+    Results are stored as one file per configuration, keyed by `config_hash`.
+    When the cache grows larger than `max_size_mb`, the least recently used
+    entries are removed.
+    """
+
+    def __init__(self, directory: str | Path | None = None, max_size_mb: float = 1024) -> None:
+        self.directory = Path(directory) if directory else default_cache_dir()
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+
+    def get(self, key: str) -> Results | None:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                results = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            # entries written by another package version can fail with any error while unpickling
+            log.warning(f"Removing unreadable cache entry {path.name}: {e}")
+            path.unlink(missing_ok=True)
+            return None
+
+        _touch(path)
+
+        return results
+
+    def put(self, key: str, results: Results) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        # write to a temporary file first, so concurrent readers never see partial entries
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(results, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self._path(key))
+        _touch(self._path(key))
+
+        self._evict()
+
+    def clear(self) -> None:
+        for path in self._entries():
+            path.unlink(missing_ok=True)
+
+    def size_bytes(self) -> int:
+        return sum(_file_size(path) for path in self._entries())
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.pkl"
+
+    def _entries(self) -> list[Path]:
+        if not self.directory.exists():
+            return []
+
+        return list(self.directory.glob("*.pkl"))
+
+    def _evict(self) -> None:
+        entries = []
+        for path in self._entries():
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+            if total <= self.max_size_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            log.info(f"Evicted cache entry {path.name}.")
+
+
+def cached_results(results: Results, config: Config) -> Results:
+    """Returns cached results with the optimization id of the given config."""
+
+    if not config.optimization_id:
+        config.optimization_id = str(uuid.uuid4())
+
+    return replace(results, optimization_id=config.optimization_id)
+
+
+def config_hash(config: Config, solver: str | None = None, engine: str | None = None) -> str:
+    """Creates a stable hash of a configuration and its timeseries.
+
+    Args:
+        config (Config): The configuration.
+        solver (str | None): Solver used for the optimization.
+        engine (str | None): Engine used for the optimization.
+
+    Returns:
+        str: Hex digest identifying the optimization.
+    """
+
+    h = hashlib.sha256()
+    _update(h, "version", _package_version())
+    _update(h, "solver", solver)
+    _update(h, "engine", engine)
+
+    for field in fields(config):
+        if field.name in IGNORED_FIELDS:
+            continue
+        _update(h, field.name, getattr(config, field.name))
+
+    return h.hexdigest()
+
+
+def default_cache_dir(name: str = "results") -> Path:
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+
+    return Path(base) / "peakshaving_analyzer" / name
+
+
+def _update(h, name: str, value) -> None:
+    h.update(name.encode())
+    h.update(b"\0")
+
+    if isinstance(value, pd.DataFrame):
+        h.update(repr(list(value.columns)).encode())
+        _update_index(h, value.index)
+        for col in value.columns:
+            _update_array(h, value[col].to_numpy())
+    elif isinstance(value, pd.Series):
+        _update_index(h, value.index)
+        _update_array(h, value.to_numpy())
+    elif isinstance(value, pd.Index):
+        _update_index(h, value)
+    elif isinstance(value, (list | tuple | np.ndarray)):
+        _update_array(h, np.asarray(value))
+    else:
+        h.update(repr(value).encode())
+
+    h.update(b"\0")
+
+
+def _update_index(h, index: pd.Index) -> None:
+    if isinstance(index, pd.RangeIndex):
+        h.update(repr((index.start, index.stop, index.step)).encode())
+    elif isinstance(index, pd.DatetimeIndex):
+        h.update(str(index.tz).encode())
+        _update_array(h, index.asi8)
+    else:
+        _update_array(h, index.to_numpy())
+
+
+def _update_array(h, values: np.ndarray) -> None:
+    if values.dtype == object:
+        h.update(repr(values.tolist()).encode())
+        return
+
+    h.update(values.dtype.str.encode())
+    h.update(repr(values.shape).encode())
+    h.update(np.ascontiguousarray(values).tobytes())
+
+
+def _package_version() -> str:
+    try:
+        return metadata.version("peakshaving-analyzer")
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def _touch(path: Path) -> None:
+    """Marks an entry as recently used.
+
+    The modification time is set explicitly, as the timestamps set by the file
+    system are often too coarse to order entries used in quick succession.
+    """
+
+    now = time.time_ns()
+    try:
+        os.utime(path, ns=(now, now))
+    except FileNotFoundError:
+        pass
+
+
+def _file_size(path: Path) -> int:
+    try:
+        return path.stat().st_size
+    except FileNotFoundError:
+        return 0
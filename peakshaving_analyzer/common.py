@@ -1,11 +1,16 @@
 import json
-from dataclasses import asdict, fields
+from dataclasses import asdict, fields, is_dataclass
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
-import plotly.express as px
 import yaml
 
+from peakshaving_analyzer.plotting import DEFAULT_MAX_POINTS, line_figure, show
+
+# key of the arrow schema metadata holding the scalar fields and the layout of the columns
+ARROW_METADATA_KEY = b"peakshaving_analyzer"
+
 
 class IOHandler:
     def print(self, include_timeseries: bool = False):
@@ -35,24 +40,180 @@ class IOHandler:
         with open(path, "w") as f:
             yaml.safe_dump(self.to_dict(include_timeseries=False), f, sort_keys=False)
 
+    def to_arrow(self):
+        """Converts to an Arrow table with one typed column per timeseries.
+
+        Scalar fields are stored as JSON in the schema metadata. Dataframes are
+        stored as one column per dataframe column, named `<field>.<column>`.
+
+        Returns:
+            pyarrow.Table: The table.
+        """
+
+        pa = _import_pyarrow()
+
+        arrays = {}
+        layout = {}
+        scalars = {}
+        for field in fields(self):
+            value = getattr(self, field.name)
+            if isinstance(value, pd.DataFrame):
+                layout[field.name] = {"kind": "dataframe", "columns": [str(col) for col in value.columns]}
+                for col in value.columns:
+                    arrays[f"{field.name}.{col}"] = pa.array(value[col])
+            elif isinstance(value, pd.Series):
+                layout[field.name] = {"kind": "series", "name": _to_builtin(value.name)}
+                arrays[field.name] = pa.array(value)
+            elif isinstance(value, pd.Index):
+                layout[field.name] = {"kind": "index", "name": _to_builtin(value.name)}
+                arrays[field.name] = pa.array(value)
+            elif isinstance(value, list | np.ndarray):
+                layout[field.name] = {"kind": "list"}
+                arrays[field.name] = pa.array(value)
+            else:
+                scalars[field.name] = _to_builtin(value)
+
+        lengths = {len(array) for array in arrays.values()}
+        if len(lengths) > 1:
+            raise ValueError(f"All timeseries of {type(self).__name__} need the same length, got lengths {lengths}.")
+
+        metadata = {"class": type(self).__name__, "scalars": scalars, "layout": layout}
+
+        return pa.table(arrays).replace_schema_metadata({ARROW_METADATA_KEY: json.dumps(metadata)})
+
+    @classmethod
+    def from_arrow(cls, table):
+        """Creates an instance from an Arrow table written by `to_arrow`.
+
+        Args:
+            table (pyarrow.Table): The table.
+        """
+
+        if not table.schema.metadata or ARROW_METADATA_KEY not in table.schema.metadata:
+            raise ValueError("Table wasn't written by peakshaving analyzer, metadata is missing.")
+
+        metadata = json.loads(table.schema.metadata[ARROW_METADATA_KEY])
+        if metadata["class"] != cls.__name__:
+            raise ValueError(f"Table contains {metadata['class']}, not {cls.__name__}.")
+
+        data = dict(metadata["scalars"])
+        for name, spec in metadata["layout"].items():
+            if spec["kind"] == "dataframe":
+                data[name] = pd.DataFrame({col: table.column(f"{name}.{col}").to_pandas() for col in spec["columns"]})
+            elif spec["kind"] == "series":
+                data[name] = table.column(name).to_pandas().rename(spec["name"])
+            elif spec["kind"] == "index":
+                data[name] = pd.Index(table.column(name).to_pandas()).rename(spec["name"])
+            else:
+                data[name] = table.column(name).to_pylist()
+
+        return cls(**data)
+
+    def to_parquet(self, path: str | Path):
+        """Writes scalars and timeseries to a Parquet file, see `to_arrow`."""
+
+        _import_pyarrow()
+        import pyarrow.parquet as pq
+
+        pq.write_table(self.to_arrow(), path)
+
+    @classmethod
+    def from_parquet(cls, path: str | Path):
+        """Reads an instance from a Parquet file written by `to_parquet`."""
+
+        _import_pyarrow()
+        import pyarrow.parquet as pq
+
+        return cls.from_arrow(pq.read_table(path))
+
+    def to_arrow_ipc(self, path: str | Path):
+        """Writes scalars and timeseries to an uncompressed Arrow IPC file, see `to_arrow`."""
+
+        pa = _import_pyarrow()
+
+        table = self.to_arrow()
+        with pa.OSFile(str(path), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+    @classmethod
+    def from_arrow_ipc(cls, path: str | Path):
+        """Reads an instance from an Arrow IPC file written by `to_arrow_ipc`.
+
+        The file is memory mapped, so numeric columns aren't copied while reading.
+        """
+
+        pa = _import_pyarrow()
+
+        with pa.memory_map(str(path)) as source:
+            table = pa.ipc.open_file(source).read_all()
+
+        return cls.from_arrow(table)
+
     def _plot(
-        self, cols_to_plot: list[str] | None = None, xaxis_title: str | None = None, yaxis_title: str | None = None
+        self,
+        cols_to_plot: list[str] | None = None,
+        xaxis_title: str | None = None,
+        yaxis_title: str | None = None,
+        max_points: int | None = DEFAULT_MAX_POINTS,
+        dynamic: bool = False,
+        path: str | Path | None = None,
     ):
         ts_df = self.timeseries_to_df()
 
-        if "timestamp" in ts_df.columns:
-            x = ts_df["timestamp"]
-        elif "datetime" in ts_df.columns:
-            x = ts_df["datetime"]
-        else:
-            x = ts_df.index
+        x = ts_df.index
+        for col in ("timestamp", "datetime"):
+            if col in ts_df.columns:
+                if ts_df[col].notna().any():
+                    x = ts_df[col]
+                ts_df = ts_df.drop(columns=col)
+                break
 
         if not cols_to_plot:
             cols_to_plot = ts_df.columns.tolist()
 
-        fig = px.line(ts_df, x=x, y=cols_to_plot)
-        fig.update_layout(xaxis_title=xaxis_title, yaxis_title=yaxis_title)
-        fig.show()
+        fig = line_figure(
+            x,
+            {col: ts_df[col] for col in cols_to_plot},
+            max_points=max_points,
+            dynamic=dynamic,
+            xaxis_title=xaxis_title,
+            yaxis_title=yaxis_title,
+        )
+        show(fig, path)
+
+        return fig
+
+    def plot_timeseries(
+        self, max_points: int | None = DEFAULT_MAX_POINTS, dynamic: bool = False, path: str | Path | None = None
+    ):
+        """Plots all timeseries.
+
+        Args:
+            max_points (int | None): Maximum number of points per line, None keeps all points.
+            dynamic (bool): Whether to downsample the visible range again when zooming (Jupyter only).
+            path (str | Path | None): HTML or image file to write the figure to instead of showing it.
+        """
+
+        return self._plot(max_points=max_points, dynamic=dynamic, path=path)
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow as pa
+    except ImportError as e:
+        raise ImportError("Parquet and Arrow files need pyarrow, install peakshaving-analyzer[parquet].") from e
+
+    return pa
+
+
+def _to_builtin(value):
+    """Converts numpy scalars, paths and dataclasses to python objects for JSON."""
+
+    if is_dataclass(value):
+        return asdict(value)
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, Path):
+        return str(value)
 
-    def plot_timeseries(self):
-        self._plot()
+    return value
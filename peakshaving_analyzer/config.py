@@ -14,6 +14,8 @@ class Config(IOHandler):
     allow_additional_pv: bool = False
     auto_opt: bool = False
     solver: str = "appsi_highs"
+    engine: str = "fine"
+    results_dtype: str = "float64"
     verbose: bool = False
     postal_code: int | str | None = None
 
@@ -57,6 +59,14 @@ class Config(IOHandler):
     grid_energy_price: float = 0.046
     interest_rate: float = 2
 
+    # rolling horizon (optimize in windows instead of the whole period at once)
+    rolling_window_hours: float | None = None
+    rolling_overlap_hours: float = 0
+
+    # time series aggregation (cluster the timeseries into typical periods, FINE engine only)
+    tsa_typical_periods: int | None = None
+    tsa_hours_per_period: float = 24
+
     # optional optimization metadata
     optimization_id: str | None = None
 
@@ -0,0 +1,293 @@
+import csv
+import io
+import logging
+from collections.abc import Iterable
+from contextlib import contextmanager
+from dataclasses import fields
+from typing import get_args
+
+import numpy as np
+import pandas as pd
+import sqlalchemy
+
+from peakshaving_analyzer.input import _get_engine
+from peakshaving_analyzer.output import TIMESERIES_FIELDS, Results
+
+log = logging.getLogger(__name__)
+
+OVERVIEW_TABLE = "overview"
+TIMESERIES_TABLE = "timeseries"
+
+# rows per multi-row insert if COPY is not available
+INSERT_BATCH_SIZE = 10_000
+
+
+def results_tables(
+    metadata: sqlalchemy.MetaData,
+    overview_table_name: str = OVERVIEW_TABLE,
+    timeseries_table_name: str = TIMESERIES_TABLE,
+) -> tuple[sqlalchemy.Table, sqlalchemy.Table]:
+    """Defines the overview and timeseries tables for results.
+
+    The overview table contains one row with the scalar results per
+    optimization, the timeseries table one row per timestep.
+
+    Args:
+        metadata (sqlalchemy.MetaData): Metadata to add the tables to, its schema is used.
+        overview_table_name (str): Name of the overview table.
+        timeseries_table_name (str): Name of the timeseries table.
+
+    Returns:
+        tuple[sqlalchemy.Table, sqlalchemy.Table]: The overview and timeseries table.
+    """
+
+    overview_columns = [
+        sqlalchemy.Column("optimization_id", sqlalchemy.Text, nullable=False, index=True),
+        sqlalchemy.Column("name", sqlalchemy.Text),
+    ]
+    overview_columns += [sqlalchemy.Column(name, sqlalchemy.Double) for name in _overview_value_columns()]
+    overview = sqlalchemy.Table(overview_table_name, metadata, *overview_columns)
+
+    timeseries = sqlalchemy.Table(
+        timeseries_table_name,
+        metadata,
+        # not null, as it's the time column of the hypertable on TimescaleDB
+        sqlalchemy.Column("timestamp", sqlalchemy.DateTime(timezone=True), nullable=False),
+        *[sqlalchemy.Column(name, sqlalchemy.Double) for name in TIMESERIES_FIELDS],
+        sqlalchemy.Column("name", sqlalchemy.Text),
+        sqlalchemy.Column("optimization_id", sqlalchemy.Text, nullable=False),
+        sqlalchemy.Index(f"ix_{timeseries_table_name}_optimization_id", "optimization_id", "timestamp"),
+    )
+
+    return overview, timeseries
+
+
+def create_tables(
+    connection: str | sqlalchemy.engine.Engine | sqlalchemy.engine.Connection,
+    schema: str | None = None,
+    overview_table_name: str = OVERVIEW_TABLE,
+    timeseries_table_name: str = TIMESERIES_TABLE,
+) -> tuple[sqlalchemy.Table, sqlalchemy.Table]:
+    """Creates the results tables if they don't exist.
+
+    On TimescaleDB, the timeseries table is turned into a hypertable.
+
+    Args:
+        connection (str | sqlalchemy.engine.Engine | sqlalchemy.engine.Connection): Database URI,
+            engine or connection.
+        schema (str | None): Schema of the tables, defaults to the default schema of the database.
+        overview_table_name (str): Name of the overview table.
+        timeseries_table_name (str): Name of the timeseries table.
+
+    Returns:
+        tuple[sqlalchemy.Table, sqlalchemy.Table]: The overview and timeseries table.
+    """
+
+    with _transaction(connection) as con:
+        return _create_tables(con, schema, overview_table_name, timeseries_table_name)
+
+
+def write_results(
+    results: Iterable[Results],
+    connection: str | sqlalchemy.engine.Engine | sqlalchemy.engine.Connection,
+    include_timeseries: bool = True,
+    overview_table_name: str = OVERVIEW_TABLE,
+    timeseries_table_name: str = TIMESERIES_TABLE,
+    schema: str | None = None,
+) -> int:
+    """Writes many results to the database in one transaction.
+
+    Missing tables are created first. On PostgreSQL, rows are streamed with
+    `COPY FROM STDIN`, other databases use batched multi-row inserts.
+    Timeseries can only be written for results with timestamps.
+
+    Args:
+        results (Iterable[Results]): The results to write.
+        connection (str | sqlalchemy.engine.Engine | sqlalchemy.engine.Connection): Database URI,
+            engine or connection.
+        include_timeseries (bool): Whether to write the timeseries as well.
+        overview_table_name (str): Name of the overview table.
+        timeseries_table_name (str): Name of the timeseries table.
+        schema (str | None): Schema of the tables, defaults to the default schema of the database.
+
+    Returns:
+        int: Number of written results.
+
+    Raises:
+        ValueError: If timeseries are written and results have no timestamps.
+    """
+
+    with _transaction(connection) as con:
+        overview, timeseries = _create_tables(con, schema, overview_table_name, timeseries_table_name)
+        write = _copy if con.dialect.name == "postgresql" else _insert
+
+        n_results = 0
+        overview_rows = []
+        for result in results:
+            if include_timeseries and result.timestamps is None:
+                msg = f"Results {result.name} have no timestamps, which are needed to write their timeseries. "
+                msg += "Set the timestamps or write them with include_timeseries=False."
+                raise ValueError(msg)
+
+            overview_rows.append(_overview_row(result))
+            if include_timeseries:
+                write(con, timeseries, _timeseries_frame(result))
+            n_results += 1
+
+        if overview_rows:
+            write(con, overview, pd.DataFrame(overview_rows, columns=[c.name for c in overview.columns]))
+
+    log.info(f"Wrote {n_results} results to the database.")
+
+    return n_results
+
+
+@contextmanager
+def _transaction(connection: str | sqlalchemy.engine.Engine | sqlalchemy.engine.Connection):
+    if isinstance(connection, sqlalchemy.engine.Connection):
+        # join a transaction of the caller, otherwise commit our own
+        if connection.in_transaction():
+            yield connection
+        else:
+            with connection.begin():
+                yield connection
+        return
+
+    engine = _get_engine(connection) if isinstance(connection, str) else connection
+    with engine.begin() as con:
+        yield con
+
+
+def _create_tables(
+    connection: sqlalchemy.engine.Connection, schema: str | None, overview_table_name: str, timeseries_table_name: str
+) -> tuple[sqlalchemy.Table, sqlalchemy.Table]:
+    metadata = sqlalchemy.MetaData(schema=schema)
+    overview, timeseries = results_tables(metadata, overview_table_name, timeseries_table_name)
+    metadata.create_all(connection, checkfirst=True)
+    for table in (overview, timeseries):
+        _add_missing_columns(connection, table)
+
+    if _has_timescaledb(connection):
+        connection.execute(
+            sqlalchemy.text("SELECT create_hypertable(:table, 'timestamp', if_not_exists => TRUE)"),
+            {"table": timeseries.fullname},
+        )
+
+    return overview, timeseries
+
+
+def _add_missing_columns(connection: sqlalchemy.engine.Connection, table: sqlalchemy.Table) -> None:
+    """Adds columns missing in an existing table, e.g. created by pandas `to_sql` in earlier versions."""
+
+    existing = {c["name"] for c in sqlalchemy.inspect(connection).get_columns(table.name, schema=table.schema)}
+    preparer = connection.dialect.identifier_preparer
+
+    for column in table.columns:
+        if column.name in existing:
+            continue
+
+        log.info(f"Adding missing column {column.name} to {table.fullname}.")
+        column_type = column.type.compile(dialect=connection.dialect)
+        connection.execute(
+            sqlalchemy.text(
+                f"ALTER TABLE {preparer.format_table(table)} ADD COLUMN {preparer.quote(column.name)} {column_type}"
+            )
+        )
+
+
+def _has_timescaledb(connection: sqlalchemy.engine.Connection) -> bool:
+    if connection.dialect.name != "postgresql":
+        return False
+
+    query = sqlalchemy.text("SELECT 1 FROM pg_extension WHERE extname = 'timescaledb'")
+
+    return connection.execute(query).first() is not None
+
+
+def _overview_value_columns() -> list[str]:
+    """Scalar fields of the results besides id and name."""
+
+    return [
+        field.name
+        for field in fields(Results)
+        if float in (field.type, *get_args(field.type)) and field.name not in ("optimization_id", "name")
+    ]
+
+
+def _overview_row(result: Results) -> list:
+    return [result.optimization_id, result.name] + [
+        _to_float(getattr(result, name)) for name in _overview_value_columns()
+    ]
+
+
+def _to_float(value) -> float | None:
+    return None if value is None else float(value)
+
+
+def _timeseries_frame(result: Results) -> pd.DataFrame:
+    df = result.timeseries_to_df()
+    df["name"] = result.name
+    df["optimization_id"] = result.optimization_id
+
+    return df[["timestamp", *TIMESERIES_FIELDS, "name", "optimization_id"]]
+
+
+def _copy(connection: sqlalchemy.engine.Connection, table: sqlalchemy.Table, df: pd.DataFrame) -> None:
+    """Streams the rows of a dataframe into a table with COPY FROM STDIN."""
+
+    buffer = io.StringIO()
+    df.to_csv(buffer, index=False, header=False, quoting=csv.QUOTE_MINIMAL, date_format="%Y-%m-%d %H:%M:%S%z")
+    buffer.seek(0)
+
+    columns = ", ".join(f'"{column}"' for column in df.columns)
+    table_name = f'"{table.schema}"."{table.name}"' if table.schema else f'"{table.name}"'
+    sql = f"COPY {table_name} ({columns}) FROM STDIN WITH (FORMAT csv)"
+
+    cursor = connection.connection.cursor()
+    try:
+        if hasattr(cursor, "copy_expert"):
+            # psycopg2
+            cursor.copy_expert(sql, buffer)
+        else:
+            # psycopg 3
+            with cursor.copy(sql) as copy:
+                copy.write(buffer.getvalue())
+    finally:
+        cursor.close()
+
+
+def _insert(connection: sqlalchemy.engine.Connection, table: sqlalchemy.Table, df: pd.DataFrame) -> None:
+    """Writes the rows of a dataframe with batched multi-row inserts."""
+
+    compiled = table.insert().compile(dialect=connection.dialect, column_keys=list(df.columns))
+    values = {name: _bind_values(df[name], table.c[name].type, connection.dialect) for name in df.columns}
+
+    # rows as tuples passed straight to the driver, without per-row processing by sqlalchemy
+    if connection.dialect.positional:
+        rows = list(zip(*(values[name] for name in compiled.positiontup), strict=True))
+    else:
+        rows = [dict(zip(values, row, strict=True)) for row in zip(*values.values(), strict=True)]
+
+    for start in range(0, len(rows), INSERT_BATCH_SIZE):
+        connection.exec_driver_sql(str(compiled), rows[start : start + INSERT_BATCH_SIZE])
+
+
+def _bind_values(s: pd.Series, column_type: sqlalchemy.types.TypeEngine, dialect: sqlalchemy.engine.Dialect) -> list:
+    """Converts a column to python values as expected by the database driver."""
+
+    if pd.api.types.is_float_dtype(s):
+        values = s.tolist()
+        if s.isna().any():
+            values = [None if np.isnan(value) else value for value in values]
+        return values
+
+    if pd.api.types.is_datetime64_any_dtype(s):
+        values = [None if pd.isna(value) else value for value in s.dt.to_pydatetime()]
+    else:
+        values = s.astype(object).where(s.notna(), None).tolist()
+
+    processor = column_type.bind_processor(dialect)
+    if processor is None:
+        return values
+
+    return [processor(value) for value in values]
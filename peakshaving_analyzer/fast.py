@@ -0,0 +1,328 @@
+import logging
+import math
+
+import numpy as np
+
+from peakshaving_analyzer.config import Config
+from peakshaving_analyzer.native import (
+    HOURS_PER_YEAR,
+    PeakShavingLP,
+    _location_values,
+    _optional_bound,
+    capital_charge_factor,
+    create_native_results,
+)
+from peakshaving_analyzer.output import Results
+from peakshaving_analyzer.profiling import SolverProfile
+
+log = logging.getLogger(__name__)
+
+# golden ratio used to shrink the search interval of the grid capacity
+INV_PHI = (math.sqrt(5) - 1) / 2
+
+# relative tolerance of the searched capacities
+TOLERANCE = 1e-9
+
+
+def is_fast_path_applicable(config: Config) -> bool:
+    """Checks whether the fast path can solve a configuration.
+
+    This is the case for a storage without any PV system and a flat energy
+    price, so only the grid peak and the storage losses are worth optimizing.
+    """
+
+    if not config.add_storage or config.pv_system_already_exists or config.allow_additional_pv:
+        return False
+
+    price = _location_values(config.price_timeseries, config.n_timesteps, location="grid")
+
+    return bool(np.ptp(price) <= TOLERANCE * max(1.0, np.abs(price).max()))
+
+
+def optimize_fast(config: Config, profile: SolverProfile | None = None) -> Results:
+    """Optimizes storage-only peak shaving without an LP.
+
+    The smallest feasible grid capacity is found by bisection, then the
+    capacity minimizing the total costs is found by golden-section search.
+    For a given grid capacity, the required state of charge is calculated
+    backwards in time, which gives the smallest storage and inverter able to
+    enforce it. Configurations with PV or varying energy prices are solved
+    with the native LP instead.
+
+    Args:
+        config (Config): The configuration.
+        profile (SolverProfile | None): Profile to add the timings to. The search
+            counts as solving, there is no model to declare.
+
+    Returns:
+        Results: The optimization results.
+    """
+
+    if profile is None:
+        profile = SolverProfile(engine="fast")
+
+    if not is_fast_path_applicable(config):
+        log.info("Fast path requires a storage, no PV and a flat energy price. Using the native LP.")
+        return PeakShavingLP(config, profile=profile).solve()
+
+    with profile.measure("build"):
+        sizing = StorageSizing(config)
+
+    with profile.measure("solve"):
+        # smallest grid capacity the storage can enforce
+        low, high = 0.0, sizing.peak_kw
+        while high - low > TOLERANCE * max(1.0, sizing.peak_kw):
+            middle = (low + high) / 2
+            if sizing.size(middle) is None:
+                low = middle
+            else:
+                high = middle
+
+        grid_capacity = _minimize(sizing.costs, high, sizing.peak_kw)
+    log.info(f"Fast path found a grid capacity of {grid_capacity:.3f} kW.")
+
+    with profile.measure("extract"):
+        return sizing.create_results(grid_capacity)
+
+
+class StorageSizing:
+    """Smallest storage system enforcing a grid capacity.
+
+    Operation is expressed as energy per timestep (kWh) with the same
+    conventions as `PeakShavingLP`: the storage is charged and discharged on
+    the stored side of the inverter, the state of charge is zero at the start
+    and end of the optimization period.
+    """
+
+    def __init__(self, config: Config, load_kw: np.ndarray | None = None) -> None:
+        """
+        Args:
+            config (Config): The configuration.
+            load_kw (np.ndarray | None): Load to cover, e.g. net of PV generation.
+                Defaults to the consumption timeseries of the config.
+        """
+
+        self.config = config
+        self.hours_per_timestep = config.hours_per_timestep
+
+        if load_kw is None:
+            load_kw = config.consumption_timeseries
+        self.load = np.asarray(load_kw, dtype=float) * self.hours_per_timestep
+        self.peak_kw = max(0.0, float(self.load.max()) / self.hours_per_timestep)
+
+        self.max_storage_kwh = _optional_bound(config.max_storage_size_kwh)
+        self.max_inverter_kw = min(
+            _optional_bound(config.max_inverter_charge), _optional_bound(config.max_inverter_discharge)
+        )
+
+        self.annualization_factor = HOURS_PER_YEAR / (config.n_timesteps * self.hours_per_timestep)
+        price = _location_values(config.price_timeseries, config.n_timesteps, location="grid")
+        self.energy_cost = (price[0] + config.grid_energy_price) * self.annualization_factor
+        self.grid_capacity_cost = config.grid_capacity_price / capital_charge_factor(config.interest_rate, 1)
+        self.storage_cost = config.storage_cost_per_kwh / capital_charge_factor(
+            config.interest_rate, config.storage_lifetime
+        )
+        self.inverter_cost = config.inverter_cost_per_kw / capital_charge_factor(
+            config.interest_rate, config.inverter_lifetime
+        )
+
+        # fraction of the energy taken from the grid reaching the stored side
+        self.charge_efficiency = config.inverter_efficiency * config.storage_charge_efficiency
+
+    def size(self, grid_capacity_kw: float) -> tuple[float, float, np.ndarray] | None:
+        """Sizes storage and inverter for a grid capacity at the lowest investment costs.
+
+        The inverter has to cover the largest deficit. A larger inverter charges
+        faster between the deficits, which can reduce the storage needed.
+
+        Args:
+            grid_capacity_kw (float): The grid capacity to enforce.
+
+        Returns:
+            tuple[float, float, np.ndarray] | None: Storage capacity (kWh), inverter
+                capacity (kW) and state of charge (kWh, one more value than
+                timesteps), None if no allowed storage can enforce the capacity.
+        """
+
+        excess = self.load - grid_capacity_kw * self.hours_per_timestep
+        min_inverter_kw = max(0.0, float(excess.max())) / self.hours_per_timestep
+        max_inverter_kw = min(
+            self.max_inverter_kw, max(min_inverter_kw, -float(excess.min()) / self.hours_per_timestep)
+        )
+        if min_inverter_kw > max_inverter_kw:
+            return None
+
+        fastest = self._size_storage(excess, max_inverter_kw)
+        if fastest is None:
+            return None
+
+        slowest = self._size_storage(excess, min_inverter_kw)
+        if slowest is not None and slowest[0] <= fastest[0] * (1 + TOLERANCE):
+            return slowest[0], min_inverter_kw, slowest[1]
+
+        def invest(inverter_kw):
+            sizing = self._size_storage(excess, inverter_kw)
+            if sizing is None:
+                return np.inf
+            return self.storage_cost * sizing[0] + self.inverter_cost * inverter_kw
+
+        inverter_kw = _minimize(invest, min_inverter_kw, max_inverter_kw)
+        storage_kwh, soc = self._size_storage(excess, inverter_kw)
+
+        return storage_kwh, inverter_kw, soc
+
+    def smallest_grid_capacity(self, storage_kwh: float, inverter_kw: float) -> float:
+        """Smallest grid capacity a given storage and inverter can enforce.
+
+        Args:
+            storage_kwh (float): Storage capacity.
+            inverter_kw (float): Inverter capacity.
+
+        Returns:
+            float: The grid capacity in kW.
+        """
+
+        def enforces(grid_capacity_kw):
+            excess = self.load - grid_capacity_kw * self.hours_per_timestep
+            if excess.max() > inverter_kw * self.hours_per_timestep * (1 + TOLERANCE):
+                return False
+            sizing = self._size_storage(excess, inverter_kw)
+            return sizing is not None and sizing[0] <= storage_kwh * (1 + TOLERANCE)
+
+        low, high = 0.0, self.peak_kw
+        if enforces(low):
+            return low
+
+        while high - low > TOLERANCE * max(1.0, self.peak_kw):
+            middle = (low + high) / 2
+            if enforces(middle):
+                high = middle
+            else:
+                low = middle
+
+        return high
+
+    def _size_storage(self, excess: np.ndarray, inverter_kw: float) -> tuple[float, np.ndarray] | None:
+        """Smallest storage covering the positive excess load with the given inverter."""
+
+        cfg = self.config
+        h = self.hours_per_timestep
+
+        deficit = np.maximum(excess, 0)
+        is_deficit = deficit > 0
+
+        # storage needed for the discharge power and the cyclic lifetime
+        charged = float(deficit.sum()) / (cfg.storage_discharge_efficiency * cfg.storage_charge_efficiency)
+        storage_kwh = max(
+            float(deficit.max()) / h / cfg.storage_discharge_rate,
+            self.annualization_factor * charged * cfg.storage_lifetime / cfg.storage_cyclic_lifetime,
+        )
+
+        # energy the storage can take up per timestep, independent of its size
+        uptake = np.minimum(np.maximum(-excess, 0), inverter_kw * h) * self.charge_efficiency
+
+        def required_soc(capacity):
+            limit = np.minimum(uptake, cfg.storage_charge_efficiency * capacity * cfg.storage_charge_rate * h)
+            return _required_level(np.where(is_deficit, deficit / cfg.storage_discharge_efficiency, -limit))
+
+        def fits(capacity, soc):
+            return soc.max() <= capacity * (1 + TOLERANCE) and soc[0] <= TOLERANCE * max(1.0, capacity)
+
+        # without any limit by the storage size, the state of charge can't be lower
+        soc = required_soc(np.inf)
+        if soc[0] > TOLERANCE * max(1.0, soc.max()):
+            return None
+        storage_kwh = max(storage_kwh, float(soc.max()))
+
+        # larger storages charge faster, so the required state of charge shrinks with the size
+        soc = required_soc(storage_kwh)
+        if not fits(storage_kwh, soc):
+            low = storage_kwh
+            high = max(storage_kwh, float(uptake.max()) / (cfg.storage_charge_efficiency * cfg.storage_charge_rate * h))
+            while high - low > TOLERANCE * high:
+                middle = (low + high) / 2
+                if fits(middle, required_soc(middle)):
+                    high = middle
+                else:
+                    low = middle
+            storage_kwh = high
+            soc = required_soc(storage_kwh)
+
+        if storage_kwh > self.max_storage_kwh:
+            return None
+
+        return storage_kwh, soc
+
+    def costs(self, grid_capacity_kw: float) -> float:
+        """Annualized costs of the system enforcing a grid capacity, infinite if infeasible."""
+
+        sizing = self.size(grid_capacity_kw)
+        if sizing is None:
+            return np.inf
+        storage_kwh, inverter_kw, _ = sizing
+
+        discharged = np.maximum(self.load - grid_capacity_kw * self.hours_per_timestep, 0).sum()
+        losses = discharged / (self.config.storage_discharge_efficiency * self.charge_efficiency) - discharged
+
+        return float(
+            self.grid_capacity_cost * grid_capacity_kw
+            + self.storage_cost * storage_kwh
+            + self.inverter_cost * inverter_kw
+            + self.energy_cost * (self.load.sum() + losses)
+        )
+
+    def create_results(self, grid_capacity_kw: float) -> Results:
+        storage_kwh, inverter_kw, soc = self.size(grid_capacity_kw)
+
+        # charge just in time, reaching exactly the required state of charge
+        deficit = np.maximum(self.load - grid_capacity_kw * self.hours_per_timestep, 0)
+        charge = np.where(deficit > 0, 0, np.diff(soc) / self.config.storage_charge_efficiency)
+        grid = self.load - deficit + charge / self.config.inverter_efficiency
+
+        return create_native_results(
+            config=self.config,
+            grid=grid,
+            charge=charge,
+            discharge=deficit,
+            soc=soc[:-1],
+            existing_pv=None,
+            new_pv=None,
+            grid_capacity_kw=grid_capacity_kw,
+            storage_capacity_kwh=storage_kwh,
+            inverter_capacity_kw=inverter_kw,
+            new_pv_capacity_kwp=0.0,
+        )
+
+
+def _required_level(change: np.ndarray) -> np.ndarray:
+    """Smallest state of charge covering all future discharges.
+
+    Solves the backward recursion level[t] = max(0, level[t + 1] + change[t])
+    with level[n] = 0 in one pass: the level at t is the largest sum of the
+    changes from t to any later timestep.
+    """
+
+    remaining = np.append(np.cumsum(change[::-1])[::-1], 0.0)
+    lowest = np.minimum.accumulate(remaining[::-1])[::-1]
+
+    return remaining - lowest
+
+
+def _minimize(f, low: float, high: float) -> float:
+    """Golden-section search for the minimum of a convex function on [low, high]."""
+
+    a, b = low, high
+    c, d = b - INV_PHI * (b - a), a + INV_PHI * (b - a)
+    f_c, f_d = f(c), f(d)
+    while b - a > TOLERANCE * max(1.0, abs(high)):
+        if f_c <= f_d:
+            b, d, f_d = d, c, f_c
+            c = b - INV_PHI * (b - a)
+            f_c = f(c)
+        else:
+            a, c, f_c = c, d, f_d
+            d = a + INV_PHI * (b - a)
+            f_d = f(d)
+
+    # the minimum may lie on a bound of the interval
+    return min((low, (a + b) / 2, high), key=f)
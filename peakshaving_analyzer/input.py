@@ -1,19 +1,34 @@
 import calendar
 import logging
+import math
+from collections.abc import Iterable
+from contextlib import contextmanager
 from datetime import datetime
-from io import BytesIO
+from functools import lru_cache
 from pathlib import Path
+from typing import TYPE_CHECKING
 
+import numpy as np
 import pandas as pd
-import pgeocode
-import requests
-import sqlalchemy
 import yaml
 
 from peakshaving_analyzer.config import Config
+from peakshaving_analyzer.pv import PVCache, PVLocation, get_pv_generation
+from peakshaving_analyzer.resample import infer_hours_per_timestep, resample, resample_to_length
+
+if TYPE_CHECKING:
+    import sqlalchemy
 
 log = logging.getLogger(__name__)
 
+# file suffixes read with pyarrow, all other files are read as CSV
+PARQUET_SUFFIXES = (".parquet", ".pq")
+FEATHER_SUFFIXES = (".feather", ".arrow")
+
+# OEDS tables of the industrial load profiles
+OEDS_LOAD_TABLE = "vea_industrial_load_profiles.load"
+OEDS_MASTER_TABLE = "vea_industrial_load_profiles.master"
+
 
 def load_yaml_config(config_file_path: Path | str, test_mode: bool = False) -> Config:
     config_path = Path(config_file_path)
@@ -34,14 +49,20 @@ def load_yaml_config(config_file_path: Path | str, test_mode: bool = False) -> C
 
     _check_minimum_inputs(data)
 
-    # read in consumption timeseries
-    data["consumption_timeseries"] = pd.read_csv(data["consumption_file_path"])[data["consumption_value_column"]]
+    # read in consumption timeseries and timestamps if provided in one pass
+    df = _read_data_file(
+        data,
+        "consumption_file_path",
+        value_columns=[data["consumption_value_column"]],
+        timestamp_column=data.get("timestamp_column"),
+    )
+    data["consumption_timeseries"] = df[data["consumption_value_column"]]
     log.info("Consumption timeseries loaded")
 
-    # read in timestamps if provided
     if data.get("timestamp_column"):
-        data["timestamps"] = pd.to_datetime(pd.read_csv(data["consumption_file_path"])[data["timestamp_column"]])
+        data["timestamps"] = df[data["timestamp_column"]]
         log.info("Timestamps loaded")
+        _resample_consumption(data)
     else:
         data["timestamps"] = None
 
@@ -66,7 +87,7 @@ def load_yaml_config(config_file_path: Path | str, test_mode: bool = False) -> C
 
 
 def load_oeds_config(
-    con: str | sqlalchemy.engine.Connection,
+    con: "str | sqlalchemy.engine.Engine | sqlalchemy.engine.Connection",
     profile_id: int,
     price_inflation_percent: float = 26.24,
     use_given_grid_prices: bool = True,
@@ -74,83 +95,283 @@ def load_oeds_config(
     *args,
     **kwargs,
 ) -> Config:
-    data = {}
-
-    data.update(kwargs)
-
-    # set fixed values
-    if "name" not in data:
-        data["name"] = "profile_" + str(profile_id)
-    data["hours_per_timestep"] = 0.25
-    data["producer_energy_price"] = producer_energy_price
-    log.info("Set fixed values")
-
-    # load consumption timeseries
-    data["consumption_timeseries"] = pd.read_sql(
-        sql=f"""
-        SELECT *
-        FROM vea_industrial_load_profiles.load
-        WHERE id = {profile_id}
-        ORDER BY timestamp ASC
-        """,
-        con=con,
-    )["value"]
-    log.info("Loaded consumption timeseries from OEDS")
-
-    data["n_timesteps"] = len(data["consumption_timeseries"])
-    data["leap_year"] = True
-    data["assumed_year"] = 2016
-    data["timestamps"] = pd.date_range(
-        start="2016-01-01",
-        periods=data["n_timesteps"],
-        freq="0.25h",
-        tz="UTC",
+    configs = load_oeds_configs(
+        con,
+        [profile_id],
+        price_inflation_percent=price_inflation_percent,
+        use_given_grid_prices=use_given_grid_prices,
+        producer_energy_price=producer_energy_price,
+        **kwargs,
     )
-    log.info("Created timeseries metadata")
+    if not configs:
+        raise ValueError(f"Profile {profile_id} not found in OEDS.")
 
-    # read or create price timeseries
-    _read_or_create_price_timeseries(data)
+    return configs[0]
 
-    # retrieve pv generation timeseries
-    _load_pv_timeseries(data)
 
+def load_oeds_configs(
+    con: "str | sqlalchemy.engine.Engine | sqlalchemy.engine.Connection",
+    profile_ids: Iterable[int],
+    price_inflation_percent: float = 26.24,
+    use_given_grid_prices: bool = True,
+    producer_energy_price: float = 0.1665,
+    chunksize: int = 500_000,
+    **kwargs,
+) -> list[Config]:
+    """Loads configurations for many OEDS industrial load profiles at once.
+
+    All load rows and all grid prices are fetched with one query each and
+    streamed in chunks, regardless of the number of profiles. Connections to
+    database URIs are pooled and reused across calls.
+
+    Args:
+        con (str | sqlalchemy.engine.Engine | sqlalchemy.engine.Connection): Database URI,
+            engine or connection.
+        profile_ids (Iterable[int]): Ids of the profiles to load.
+        price_inflation_percent (float): Inflation applied to the given grid prices.
+        use_given_grid_prices (bool): Use the grid prices of the profiles.
+        producer_energy_price (float): Fixed energy price.
+        chunksize (int): Number of load rows read at once.
+        **kwargs: Further config parameters, applied to every profile.
+
+    Returns:
+        list[Config]: One config per found profile, in the order of `profile_ids`.
+            Profiles missing in the database are skipped with a warning.
+    """
+
+    profile_ids = [int(profile_id) for profile_id in dict.fromkeys(profile_ids)]
+    if not profile_ids:
+        return []
+
+    with _oeds_connection(con) as connection:
+        consumption = _read_oeds_load(connection, profile_ids, chunksize)
+        log.info(f"Loaded {len(consumption)} consumption timeseries from OEDS")
+
+        grid_prices = _read_oeds_grid_prices(connection, profile_ids) if use_given_grid_prices else None
+
+    missing = [profile_id for profile_id in profile_ids if profile_id not in consumption]
+    if missing:
+        log.warning(f"Profiles not found in OEDS: {missing}")
+
+    # timestamps only depend on the length of the profile
+    timestamps = {}
+
+    configs = []
+    for profile_id in profile_ids:
+        if profile_id not in consumption:
+            continue
+
+        data = dict(kwargs)
+
+        # set fixed values
+        if "name" not in data:
+            data["name"] = "profile_" + str(profile_id)
+        data["hours_per_timestep"] = 0.25
+        data["producer_energy_price"] = producer_energy_price
+
+        data["consumption_timeseries"] = consumption[profile_id]
+
+        data["n_timesteps"] = len(data["consumption_timeseries"])
+        data["leap_year"] = True
+        data["assumed_year"] = 2016
+        if data["n_timesteps"] not in timestamps:
+            timestamps[data["n_timesteps"]] = pd.date_range(
+                start="2016-01-01",
+                periods=data["n_timesteps"],
+                freq="0.25h",
+                tz="UTC",
+            )
+        data["timestamps"] = timestamps[data["n_timesteps"]]
+
+        # read or create price timeseries
+        _read_or_create_price_timeseries(data)
+
+        # retrieve pv generation timeseries
+        _load_pv_timeseries(data)
+
+        if use_given_grid_prices:
+            _set_oeds_grid_prices(data, grid_prices, profile_id, price_inflation_percent)
+
+        _remove_unused_keys(data)
+
+        configs.append(Config(**data))
+
+    log.info(f"Created {len(configs)} configs from OEDS")
+
+    return configs
+
+
+@contextmanager
+def _oeds_connection(con: "str | sqlalchemy.engine.Engine | sqlalchemy.engine.Connection"):
+    # only loaded when reading from a database
+    import sqlalchemy
+
+    if isinstance(con, sqlalchemy.engine.Connection):
+        yield con
+        return
+
+    engine = _get_engine(con) if isinstance(con, str) else con
+    with engine.connect() as connection:
+        yield connection
+
+
+@lru_cache(maxsize=8)
+def _get_engine(uri: str) -> "sqlalchemy.engine.Engine":
+    """Returns a pooled engine per database URI, reused across calls."""
+
+    import sqlalchemy
+
+    return sqlalchemy.create_engine(uri, pool_pre_ping=True)
+
+
+def _read_oeds_load(
+    connection: "sqlalchemy.engine.Connection", profile_ids: list[int], chunksize: int
+) -> dict[int, pd.Series]:
+    """Reads the load of all profiles in one query, split into one series per profile."""
+
+    import sqlalchemy
+
+    query = sqlalchemy.text(
+        f"""
+        SELECT id, value
+        FROM {OEDS_LOAD_TABLE}
+        WHERE id IN :ids
+        ORDER BY id ASC, timestamp ASC
+        """
+    ).bindparams(sqlalchemy.bindparam("ids", expanding=True))
+
+    # rows of a profile can span multiple chunks
+    parts = {}
+    chunks = pd.read_sql(
+        sql=query,
+        con=connection.execution_options(stream_results=True),
+        params={"ids": profile_ids},
+        chunksize=chunksize,
+    )
+    for chunk in chunks:
+        for profile_id, values in chunk.groupby("id", sort=False)["value"]:
+            parts.setdefault(int(profile_id), []).append(values.to_numpy(dtype=float))
+
+    return {profile_id: pd.Series(np.concatenate(values), name="value") for profile_id, values in parts.items()}
+
+
+def _read_oeds_grid_prices(connection: "sqlalchemy.engine.Connection", profile_ids: list[int]) -> pd.DataFrame:
+    """Reads the grid prices of all profiles in one query."""
+
+    import sqlalchemy
+
+    query = sqlalchemy.text(
+        f"""
+        SELECT
+            id,
+            capacity_price_under_2500h_eur_per_kw,
+            capacity_price_over_2500h_eur_per_kw,
+            energy_price_under_2500h_eur_per_kwh,
+            energy_price_over_2500h_eur_per_kwh
+        FROM {OEDS_MASTER_TABLE}
+        WHERE id IN :ids
+        """
+    ).bindparams(sqlalchemy.bindparam("ids", expanding=True))
+
+    return pd.read_sql(sql=query, con=connection, params={"ids": profile_ids}).set_index("id")
+
+
+def _set_oeds_grid_prices(data, grid_prices: pd.DataFrame, profile_id: int, price_inflation_percent: float):
     # calculate if consumption is over 2500h full load hours
-    is_over_2500h = (data["consumption_timeseries"].sum() / 4) / data["consumption_timeseries"].max() > 2500
+    consumption = data["consumption_timeseries"]
+    is_over_2500h = (consumption.sum() * data["hours_per_timestep"]) / consumption.max() > 2500
 
     if is_over_2500h:
         sql_flh_text = "under"
     else:
         sql_flh_text = "over"
 
-    if use_given_grid_prices:
-        # get capacity_price
-        original_cap_price = pd.read_sql(
-            sql=f"""
-            SELECT capacity_price_{sql_flh_text}_2500h_eur_per_kw
-            FROM vea_industrial_load_profiles.master
-            WHERE id = {profile_id}
-            """,
-            con=con,
-        )[f"capacity_price_{sql_flh_text}_2500h_eur_per_kw"].values[0]
-        data["grid_capacity_price"] = original_cap_price * (1 + price_inflation_percent / 100)
-        log.info(f"Retrieved grid_capacity_price and updated with an inflation of {price_inflation_percent}%")
-
-        # get energy_price
-        original_energy_price = pd.read_sql(
-            sql=f"""
-            SELECT energy_price_{sql_flh_text}_2500h_eur_per_kwh
-            FROM vea_industrial_load_profiles.master
-            WHERE id = {profile_id}
-            """,
-            con=con,
-        )[f"energy_price_{sql_flh_text}_2500h_eur_per_kwh"].values[0]
-        log.info("")
-        data["grid_energy_price"] = original_energy_price * (1 + price_inflation_percent / 100)
-        log.info(f"Retrieved grid_energy_price and updated with an inflation of {price_inflation_percent}%")
+    if profile_id not in grid_prices.index:
+        raise ValueError(f"No grid prices found in OEDS for profile {profile_id}.")
+    prices = grid_prices.loc[profile_id]
 
-    _remove_unused_keys(data)
+    # get capacity_price
+    original_cap_price = prices[f"capacity_price_{sql_flh_text}_2500h_eur_per_kw"]
+    data["grid_capacity_price"] = original_cap_price * (1 + price_inflation_percent / 100)
+    log.info(f"Retrieved grid_capacity_price and updated with an inflation of {price_inflation_percent}%")
+
+    # get energy_price
+    original_energy_price = prices[f"energy_price_{sql_flh_text}_2500h_eur_per_kwh"]
+    data["grid_energy_price"] = original_energy_price * (1 + price_inflation_percent / 100)
+    log.info(f"Retrieved grid_energy_price and updated with an inflation of {price_inflation_percent}%")
 
-    return Config(**data)
+
+def read_timeseries_file(
+    path: Path | str,
+    value_columns: list[str],
+    timestamp_column: str | None = None,
+    dtype: str = "float64",
+    chunksize: int | None = None,
+) -> pd.DataFrame:
+    """Reads timeseries columns from a CSV, Parquet or Feather file in one pass.
+
+    Only the requested columns are read. Values are parsed directly as `dtype`
+    and timestamps as datetimes, without inferring the types of other columns.
+
+    Args:
+        path (Path | str): Path to the file. Files ending with .parquet/.pq or
+            .feather/.arrow are read with pyarrow, all others as CSV.
+        value_columns (list[str]): Names of the value columns.
+        timestamp_column (str | None): Name of the timestamp column.
+        dtype (str): Type of the values, e.g. "float32" to halve the memory.
+        chunksize (int | None): Read CSV files in chunks of this many rows,
+            which limits the memory needed for parsing very large files.
+
+    Returns:
+        pd.DataFrame: The requested columns.
+    """
+
+    path = Path(path)
+    columns = list(dict.fromkeys([*value_columns, timestamp_column] if timestamp_column else value_columns))
+    value_dtypes = {column: dtype for column in value_columns}
+
+    suffix = path.suffix.lower()
+    if suffix in PARQUET_SUFFIXES:
+        df = pd.read_parquet(path, columns=columns)
+    elif suffix in FEATHER_SUFFIXES:
+        df = pd.read_feather(path, columns=columns)
+    else:
+        csv_kwargs = {
+            "usecols": columns,
+            "dtype": value_dtypes,
+            "parse_dates": [timestamp_column] if timestamp_column else False,
+        }
+        if chunksize:
+            df = pd.concat(pd.read_csv(path, chunksize=chunksize, **csv_kwargs), ignore_index=True)
+        else:
+            df = pd.read_csv(path, **csv_kwargs)
+
+    df = df[columns].astype(value_dtypes, copy=False)
+    if timestamp_column and not pd.api.types.is_datetime64_any_dtype(df[timestamp_column]):
+        df[timestamp_column] = pd.to_datetime(df[timestamp_column])
+
+    return df
+
+
+def _read_data_file(data, path_key: str, value_columns: list[str], timestamp_column: str | None = None):
+    return read_timeseries_file(
+        _resolve_path(data, data[path_key]),
+        value_columns=value_columns,
+        timestamp_column=timestamp_column,
+        dtype=data.get("timeseries_dtype") or "float64",
+        chunksize=data.get("csv_chunksize"),
+    )
+
+
+def _resolve_path(data, path: Path | str) -> Path:
+    """Resolves relative paths against the directory of the config file, if the file exists there."""
+
+    path = Path(path)
+    config_dir = data.get("config_dir")
+    if config_dir is not None and not path.is_absolute() and (config_dir / path).exists():
+        return config_dir / path
+
+    return path
 
 
 def _check_minimum_inputs(data):
@@ -212,6 +433,30 @@ def _create_timeseries_metadata(data):
         data["assumed_year"] = timestep_to_use.year
 
 
+def _resample_consumption(data):
+    """Resamples consumption given at another resolution than hours per timestep."""
+
+    timestamps = pd.DatetimeIndex(data["timestamps"])
+    if len(timestamps) < 2:
+        return
+
+    hours_per_timestep = infer_hours_per_timestep(timestamps)
+    if math.isclose(hours_per_timestep, data["hours_per_timestep"]):
+        return
+
+    log.info(f"Resampling consumption from {hours_per_timestep:g}h to {data['hours_per_timestep']:g}h timesteps.")
+    values = resample(
+        data["consumption_timeseries"],
+        hours_per_timestep,
+        data["hours_per_timestep"],
+        timestamps=timestamps,
+    )
+    data["consumption_timeseries"] = pd.Series(values, name=data["consumption_timeseries"].name)
+    data["timestamps"] = pd.Series(
+        pd.date_range(timestamps[0], periods=len(values), freq=pd.Timedelta(hours=data["hours_per_timestep"]))
+    )
+
+
 def _detect_leap_year(data):
     """
     Detect if given timeseries is a leap year.
@@ -311,12 +556,12 @@ def _read_price_timeseries(data):
     Returns:
         pd.Series: The price timeseries.
     """
-    log.info("Reading price timeseries from CSV file.")
-    df = pd.read_csv(data["price_file_path"])
-    df.rename(
-        columns={data.get("price_value_column", "value"): "grid"},
-        inplace=True,
-    )
+    log.info("Reading price timeseries from file.")
+    value_column = data.get("price_value_column") or "value"
+    df = _read_data_file(data, "price_file_path", value_columns=[value_column])
+    df.rename(columns={value_column: "grid"}, inplace=True)
+    if len(df) != data["n_timesteps"]:
+        df = pd.DataFrame({"grid": resample_to_length(df["grid"], data["n_timesteps"], data["hours_per_timestep"])})
     df["consumption_site"] = 0
     df.loc[df["grid"] < 0, "grid"] = 0  # set negative prices to zero
     log.info("Price timeseries successfully read and processed.")
@@ -336,7 +581,8 @@ def _load_pv_timeseries(data):
     if data.get("pv_system_already_exists"):
         # load from CSV if provided
         if data.get("existing_pv_file_path"):
-            pv_gen = pd.read_csv(data["existing_pv_file_path"])[data.get("existing_pv_value_column", "value")]
+            value_column = data.get("existing_pv_value_column") or "value"
+            pv_gen = _read_data_file(data, "existing_pv_file_path", value_columns=[value_column])[value_column]
             pv_gen.rename("consumption_site", inplace=True)
             data["existing_pv_size_kwp"] = pv_gen.max()  # set existing system size
             pv_gen = pv_gen / pv_gen.max()  # scale to values from 0 to 1
@@ -355,14 +601,15 @@ def _load_pv_timeseries(data):
             data["pv_system_already_exists"] = False
 
         if pv_gen is not None:
-            existing_pv_gen_df = _pv_dataframe_from_series(pv_gen)
+            existing_pv_gen_df = _pv_dataframe_from_series(pv_gen, data)
             data["existing_pv_generation_timeseries"] = existing_pv_gen_df
 
     # if we want to add pv / PV...
     if data.get("allow_additional_pv"):
         # load from csv if provided
         if data.get("new_pv_file_path"):
-            pv_gen = pd.read_csv(data["new_pv_file_path"])[data.get("new_pv_value_column", "value")]
+            value_column = data.get("new_pv_value_column") or "value"
+            pv_gen = _read_data_file(data, "new_pv_file_path", value_columns=[value_column])[value_column]
             pv_gen.rename("consumption_site", inplace=True)
             log.info("existing pv generation timeseries loaded")
 
@@ -380,125 +627,45 @@ def _load_pv_timeseries(data):
             # get default pv generation timeseries for germany
             pv_gen = _fetch_pv_default(data)
 
-        new_pv_gen_df = _pv_dataframe_from_series(pv_gen)
+        new_pv_gen_df = _pv_dataframe_from_series(pv_gen, data)
         data["new_pv_generation_timeseries"] = new_pv_gen_df
 
 
 def _fetch_pv_from_brighsky(data) -> pd.Series:
-    log.info("Fetching pv timeseries from BrightSky API.")
-    # convert postal code to coordinates
-    nomi = pgeocode.Nominatim("de")
-    q = nomi.query_postal_code(data["postal_code"])
-    lat, lon = q["latitude"], q["longitude"]
-    log.info(f"Coordinates for postal code {data['postal_code']}: Latitude={lat}, Longitude={lon}")
-
-    # make API Call
-    url = f"https://api.brightsky.dev/weather?lat={lat}&lon={lon}&country=DE"
-    url += f"&date={data['assumed_year']}-01-01T00:00:00&last_date={data['assumed_year']}-12-31T23:45:00"
-    url += "&timezone=auto&format=json"
-    log.info(f"Making API call to: {url}")
-    weather_data = requests.get(url).json()
-
-    # put data in dataframe
-    df = pd.DataFrame(weather_data["weather"])[["solar"]]
-    log.info("PV timeseries data fetched successfully.")
-
-    # rename to location in ESM, add grid column with no operation possible
-    df.rename(columns={"solar": "consumption_site"}, inplace=True)
-
-    # resample to match hours per timestep
-    if data["hours_per_timestep"] != 1:
-        df = _resample_dataframe(
-            df,
-            hours_per_timestep=data["hours_per_timestep"],
-            assumed_year=data["assumed_year"],
-            n_timesteps=data["n_timesteps"],
-        )
+    location = PVLocation(postal_code=str(data["postal_code"]))
+    s = get_pv_generation(location, year=data["assumed_year"], cache=_pv_cache(data))
 
-    # convert from kWh/m2 to kW
-    # kWh/m2/h = kW/m2 = 1000W/m2
-    # no conversion necessary, as pv modules are tested with 1000W/m2
-
-    return df["consumption_site"]
+    return _resample_hourly(s, data)
 
 
 def _fetch_pv_default(data) -> pd.Series:
-    url = "https://www.renewables.ninja/country_downloads/DE/ninja-pv-country-DE-national-merra2.csv"
-    response = requests.get(url)
-    df = pd.read_csv(BytesIO(response.content), delimiter=",", header=3)
-
-    df["time"] = pd.to_datetime(df["time"])
-    df = df[df["time"].dt.year == data["assumed_year"]].reset_index(drop=True)
-
-    df.drop(columns="time", inplace=True)
-    df.rename(columns={"NATIONAL": "consumption_site"}, inplace=True)
-    df["grid"] = 0
-
-    df.fillna(0, inplace=True)
-
-    # resample to match hours per timestep
-    if data["hours_per_timestep"] != 1:
-        df = _resample_dataframe(
-            df,
-            hours_per_timestep=data["hours_per_timestep"],
-            assumed_year=data["assumed_year"],
-            n_timesteps=data["n_timesteps"],
-        )
-
-    return df["consumption_site"]
-
-
-def _resample_dataframe(df: pd.DataFrame, hours_per_timestep: float, assumed_year: int, n_timesteps: int):
-    """Resamples given dataframe for provided details.
-
-    Args:
-        df (pd.DataFrame): The dataframe to resample.
-
-    Returns:
-        pd.DataFrame: the resampled dataframe.
-    """
+    s = get_pv_generation(PVLocation(), year=data["assumed_year"], cache=_pv_cache(data))
 
-    log.info("Resampling pv timeseries to match your specifications")
+    return _resample_hourly(s, data)
 
-    df["timestamp"] = pd.date_range(start=f"{assumed_year}-01-01", periods=len(df), freq="H")
 
-    # upsample
-    if hours_per_timestep < 1:
-        # set index as needed for upsamling
-        df.set_index("timestamp", inplace=True)
+def _resample_hourly(s: pd.Series, data) -> pd.Series:
+    """Resamples an hourly timeseries of the assumed year to match hours per timestep."""
 
-        # upsample using forward filling
-        df = df.resample(rule=f"{hours_per_timestep}H", origin="start_day").ffill()
+    values = resample(s, 1, data["hours_per_timestep"], n_timesteps=data["n_timesteps"])
 
-        # the last three quarter hours are missing as original timeseries ends on
-        # Dec. 12th 23:00 and not 24:00 / Dec. 13th 00:00
-        # so we reindex to include the missing timestamps
-        df = df.reindex(
-            labels=pd.date_range(
-                start=f"{assumed_year}",
-                periods=n_timesteps,
-                freq=f"{hours_per_timestep}H",
-            )
-        )
+    return pd.Series(values, name="consumption_site")
 
-        # and fill the newly created timestamps
-        df.fillna(method="ffill", inplace=True)
 
-    # downsample
-    else:
-        # resample
-        df = df.resample(rule=f"{hours_per_timestep}H", on="timestamp").mean()
-
-    df.reset_index(drop=True, inplace=True)
+def _pv_cache(data) -> PVCache | None:
+    # opt-in, as it writes to the home directory unless a directory is given
+    if not (data.get("pv_cache") or data.get("pv_cache_dir") or data.get("pv_offline")):
+        return None
 
-    log.info("Successfully resampled pv timeseries.")
+    return PVCache(directory=data.get("pv_cache_dir"), offline=bool(data.get("pv_offline")))
 
-    return df
 
+def _pv_dataframe_from_series(s: pd.Series, data) -> pd.DataFrame:
+    if len(s) != data["n_timesteps"]:
+        s = resample_to_length(s, data["n_timesteps"], data["hours_per_timestep"])
 
-def _pv_dataframe_from_series(s: pd.Series) -> pd.DataFrame:
     df = pd.DataFrame(columns=["consumption_site", "grid"])
-    df["consumption_site"] = s.copy()
+    df["consumption_site"] = pd.Series(s).reset_index(drop=True)
     df["grid"] = 0
 
     df.fillna(0, inplace=True)
@@ -516,7 +683,7 @@ def _check_timeseries_length(data):
     log.info("Checking length of timeseries.")
     if len(data["consumption_timeseries"]) != data["n_timesteps"]:
         msg = "Length of consumption timeseries does not match expected number of timesteps. "
-        msg += f"Expected number of timesteps: {len(data['n_timesteps'])}, given timesteps: {len(data['consumption_timeseries'])}"
+        msg += f"Expected number of timesteps: {data['n_timesteps']}, given timesteps: {len(data['consumption_timeseries'])}"
         raise ValueError(msg)
     if len(data["price_timeseries"]) != data["n_timesteps"]:
         msg = "Length of price timeseries does not match expected number of timesteps. "
@@ -547,6 +714,11 @@ def _remove_unused_keys(data):
         "leap_year",
         "assumed_year",
         "config_dir",
+        "timeseries_dtype",
+        "csv_chunksize",
+        "pv_cache",
+        "pv_cache_dir",
+        "pv_offline",
     ]
     for key in keys_to_remove:
         data.pop(key, None)
@@ -0,0 +1,281 @@
+import hashlib
+import json
+import logging
+import pickle
+import shutil
+import sqlite3
+import time
+import uuid
+from contextlib import closing, contextmanager
+from dataclasses import asdict, astuple, dataclass
+from pathlib import Path
+
+import yaml
+
+from peakshaving_analyzer.cache import ResultCache, default_cache_dir
+from peakshaving_analyzer.output import Results
+
+log = logging.getLogger(__name__)
+
+# job states, queued and running jobs are in flight
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+IN_FLIGHT = (QUEUED, RUNNING)
+
+# progress of a running job per stage
+STAGES = {"queued": 0.0, "loading": 0.1, "optimizing": 0.3, "saving": 0.9, "done": 1.0}
+
+CONFIG_FILE = "config.yml"
+RESULTS_FILE = "results.pkl"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    key TEXT NOT NULL,
+    name TEXT,
+    status TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    progress REAL NOT NULL,
+    error TEXT,
+    submitted REAL NOT NULL,
+    started REAL,
+    finished REAL
+);
+CREATE INDEX IF NOT EXISTS ix_jobs_key ON jobs (key, status);
+CREATE INDEX IF NOT EXISTS ix_jobs_status ON jobs (status, submitted);
+"""
+
+
+@dataclass
+class Job:
+    id: str
+    key: str
+    name: str | None
+    status: str
+    stage: str
+    progress: float
+    error: str | None
+    submitted: float
+    started: float | None
+    finished: float | None
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        data.pop("key")
+
+        return data
+
+
+class JobQueue:
+    """Queue of optimization jobs persisted in a SQLite database.
+
+    Every job has a directory with its config file, the uploaded timeseries
+    and, once done, the pickled results. Identical payloads submitted while an
+    equal job is still queued or running are merged into that job. Jobs
+    interrupted by a restart are queued again.
+
+    Every call opens its own connection, so the queue can be used from worker
+    threads and processes.
+    """
+
+    def __init__(self, directory: str | Path | None = None) -> None:
+        """
+        Args:
+            directory (str | Path | None): Directory of the database and the jobs,
+                defaults to `~/.cache/peakshaving_analyzer/jobs`.
+        """
+
+        self.directory = Path(directory) if directory else default_cache_dir("jobs")
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.db_path = self.directory / "jobs.db"
+
+        with closing(sqlite3.connect(self.db_path, timeout=30)) as con:
+            con.executescript(SCHEMA)
+
+    def submit(self, config: dict, files: dict[str, bytes]) -> tuple[Job, bool]:
+        """Queues a job unless an identical one is in flight.
+
+        Args:
+            config (dict): Configuration as in a config file. File paths refer to
+                the names of the uploaded files.
+            files (dict[str, bytes]): Uploaded timeseries files by name.
+
+        Returns:
+            tuple[Job, bool]: The job and whether it is an existing in-flight job.
+        """
+
+        files = {_file_name(name): content for name, content in files.items()}
+        for key, value in config.items():
+            if key.endswith("_file_path") and value is not None and value not in files:
+                raise ValueError(f"{key} refers to '{value}', which was not uploaded.")
+
+        key = payload_hash(config, files)
+        with self._transaction() as con:
+            row = con.execute(
+                "SELECT * FROM jobs WHERE key = ? AND status IN (?, ?) ORDER BY submitted LIMIT 1", (key, *IN_FLIGHT)
+            ).fetchone()
+            if row is not None:
+                return Job(*row), True
+
+            job = Job(
+                id=str(uuid.uuid4()),
+                key=key,
+                name=config.get("name"),
+                status=QUEUED,
+                stage="queued",
+                progress=0.0,
+                error=None,
+                submitted=time.time(),
+                started=None,
+                finished=None,
+            )
+
+            directory = self.job_directory(job.id)
+            directory.mkdir(parents=True)
+            for name, content in files.items():
+                (directory / name).write_bytes(content)
+            with open(directory / CONFIG_FILE, "w") as f:
+                yaml.safe_dump(config, f, sort_keys=False)
+
+            con.execute("INSERT INTO jobs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", astuple(job))
+
+        log.info(f"Queued job {job.id} ({job.name}).")
+
+        return job, False
+
+    def get(self, job_id: str) -> Job | None:
+        with self._transaction() as con:
+            row = con.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+
+        return Job(*row) if row is not None else None
+
+    def list(self, status: str | None = None) -> list[Job]:
+        with self._transaction() as con:
+            if status is None:
+                rows = con.execute("SELECT * FROM jobs ORDER BY submitted").fetchall()
+            else:
+                rows = con.execute("SELECT * FROM jobs WHERE status = ? ORDER BY submitted", (status,)).fetchall()
+
+        return [Job(*row) for row in rows]
+
+    def next(self) -> Job | None:
+        """Marks the oldest queued job as running and returns it."""
+
+        with self._transaction() as con:
+            row = con.execute("SELECT id FROM jobs WHERE status = ? ORDER BY submitted LIMIT 1", (QUEUED,)).fetchone()
+            if row is None:
+                return None
+            con.execute("UPDATE jobs SET status = ?, started = ? WHERE id = ?", (RUNNING, time.time(), row[0]))
+
+        return self.get(row[0])
+
+    def set_stage(self, job_id: str, stage: str) -> None:
+        with self._transaction() as con:
+            con.execute("UPDATE jobs SET stage = ?, progress = ? WHERE id = ?", (stage, STAGES[stage], job_id))
+
+    def finish(self, job_id: str, error: str | None = None) -> None:
+        status, stage = (FAILED, "failed") if error else (DONE, "done")
+        with self._transaction() as con:
+            con.execute(
+                "UPDATE jobs SET status = ?, stage = ?, progress = ?, error = ?, finished = ? WHERE id = ?",
+                (status, stage, 1.0, error, time.time(), job_id),
+            )
+
+    def requeue_running(self) -> int:
+        """Queues jobs again that were running when the service stopped."""
+
+        with self._transaction() as con:
+            n_jobs = con.execute(
+                "UPDATE jobs SET status = ?, stage = ?, progress = ?, started = NULL WHERE status = ?",
+                (QUEUED, "queued", 0.0, RUNNING),
+            ).rowcount
+
+        if n_jobs:
+            log.info(f"Queued {n_jobs} interrupted jobs again.")
+
+        return n_jobs
+
+    def results(self, job_id: str) -> Results | None:
+        path = self.job_directory(job_id) / RESULTS_FILE
+        try:
+            with open(path, "rb") as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            log.warning(f"Can't read the results of job {job_id}: {e}")
+            return None
+
+    def remove(self, job_id: str) -> None:
+        with self._transaction() as con:
+            con.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+        shutil.rmtree(self.job_directory(job_id), ignore_errors=True)
+
+    def job_directory(self, job_id: str) -> Path:
+        return self.directory / job_id
+
+    @contextmanager
+    def _transaction(self):
+        with closing(sqlite3.connect(self.db_path, timeout=30, isolation_level=None)) as con:
+            # take the write lock at the start, so checking and updating jobs is atomic across processes
+            con.execute("BEGIN IMMEDIATE")
+            try:
+                yield con
+            except BaseException:
+                con.execute("ROLLBACK")
+                raise
+            con.execute("COMMIT")
+
+
+def run_job(directory: str | Path, job_id: str, solver: str | None = None, cache: ResultCache | None = None) -> None:
+    """Optimizes a queued job and saves its results, run inside a worker process.
+
+    Args:
+        directory (str | Path): Directory of the job queue.
+        job_id (str): Id of the job.
+        solver (str | None): Solver overriding the solver of the config.
+        cache (ResultCache | None): Cache to look up and store the results in.
+    """
+
+    # imported here to keep the server process free of the optimization modules until a job arrives
+    from peakshaving_analyzer.input import load_yaml_config
+    from peakshaving_analyzer.PSA import PeakShavingAnalyzer
+
+    queue = JobQueue(directory)
+    job_directory = queue.job_directory(job_id)
+
+    queue.set_stage(job_id, "loading")
+    config = load_yaml_config(job_directory / CONFIG_FILE)
+    config.optimization_id = job_id
+
+    queue.set_stage(job_id, "optimizing")
+    results = PeakShavingAnalyzer(config).optimize(solver=solver, cache=cache)
+
+    queue.set_stage(job_id, "saving")
+    tmp_path = job_directory / f"{RESULTS_FILE}.tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump(results, f, protocol=pickle.HIGHEST_PROTOCOL)
+    tmp_path.replace(job_directory / RESULTS_FILE)
+
+
+def payload_hash(config: dict, files: dict[str, bytes]) -> str:
+    """Hash of a job payload, equal payloads are optimized once while in flight."""
+
+    h = hashlib.sha256()
+    h.update(json.dumps(config, sort_keys=True, default=str).encode())
+    for name in sorted(files):
+        h.update(b"\0" + name.encode() + b"\0")
+        h.update(hashlib.sha256(files[name]).digest())
+
+    return h.hexdigest()
+
+
+def _file_name(name: str) -> str:
+    """Checks that an uploaded file name doesn't point outside of the job directory."""
+
+    if not name or Path(name).name != name or name in (".", "..", CONFIG_FILE, RESULTS_FILE):
+        raise ValueError(f"Invalid file name '{name}'.")
+
+    return name
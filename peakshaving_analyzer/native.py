@@ -0,0 +1,551 @@
+import logging
+import uuid
+from dataclasses import replace
+
+import highspy
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+from peakshaving_analyzer.config import Config
+from peakshaving_analyzer.output import Results
+from peakshaving_analyzer.profiling import SolverProfile
+
+log = logging.getLogger(__name__)
+
+HOURS_PER_YEAR = 8760
+
+# names of the capacity variables of the model
+CAPACITIES = ("grid_capacity", "storage_capacity", "inverter_capacity", "new_pv_capacity")
+
+# config parameters only entering the objective of the model
+COST_PARAMETERS = (
+    "storage_cost_per_kwh",
+    "inverter_cost_per_kw",
+    "pv_system_cost_per_kwp",
+    "grid_capacity_price",
+    "grid_energy_price",
+    "interest_rate",
+)
+
+
+class PeakShavingLP:
+    """Peak shaving LP built directly as sparse matrices and solved with HiGHS.
+
+    The LP is the same one FINE builds for the energy system model of
+    `PeakShavingAnalyzer` (grid source, consumption sink, capacity priced
+    transmission, storage with linked in- and outflow conversions and optional
+    PV systems), reduced to the variables that can be non-zero at the optimum.
+    Operation variables are energies per timestep (kWh), capacities are kW,
+    kWh and kWp respectively.
+    """
+
+    def __init__(
+        self,
+        config: Config,
+        initial_soc_kwh: float = 0.0,
+        final_soc_kwh: float | None = 0.0,
+        min_capacities: dict[str, float] | None = None,
+        profile: SolverProfile | None = None,
+    ) -> None:
+        """
+        Args:
+            config (Config): The configuration to build the model for.
+            initial_soc_kwh (float): State of charge at the start of the optimization period.
+            final_soc_kwh (float | None): State of charge at the end of the optimization
+                period, None leaves it free.
+            min_capacities (dict[str, float] | None): Lower bounds for the capacity
+                variables (see `CAPACITIES`), e.g. sizes decided in a previous period.
+            profile (SolverProfile | None): Profile to add the timings and model size to.
+        """
+
+        self.config = config
+        self.n_timesteps = config.n_timesteps
+        self.hours_per_timestep = config.hours_per_timestep
+
+        self.initial_soc_kwh = initial_soc_kwh
+        self.final_soc_kwh = final_soc_kwh
+        self.min_capacities = min_capacities or {}
+        self.profile = profile if profile is not None else SolverProfile(engine="native")
+
+        self._columns = {}
+        self._n_cols = 0
+        self._lower = []
+        self._upper = []
+
+        self._rows = []
+        self._row_blocks = {}
+        self._n_rows = 0
+        self._row_lower = []
+        self._row_upper = []
+
+        with self.profile.measure("build"):
+            self._add_columns()
+            self._add_rows()
+
+        with self.profile.measure("declare"):
+            self.highs = self._create_highs()
+
+        self.profile.record_model_size(self.highs.getNumCol(), self.highs.getNumRow(), self.highs.getNumNz())
+
+    def _add_columns(self):
+        n = self.n_timesteps
+        h = self.hours_per_timestep
+
+        # grid import, equal to the operation of the grid source and the
+        # transmission from grid to consumption site
+        self._add_column("grid", n)
+        self._add_column("grid_capacity", 1)
+
+        if self.config.add_storage:
+            self._add_column("to_storage", n)
+            self._add_column("from_storage", n)
+            self._add_column("charge", n)
+            self._add_column("discharge", n)
+
+            # state of charge is fixed at the start and end of the optimization
+            # period, by default to zero like the cyclic constraint in FINE
+            soc_lower = np.zeros(n + 1)
+            soc_upper = np.full(n + 1, np.inf)
+            soc_lower[0] = soc_upper[0] = self.initial_soc_kwh
+            if self.final_soc_kwh is not None:
+                soc_lower[n] = soc_upper[n] = self.final_soc_kwh
+            self._add_column("soc", n + 1, lower=soc_lower, upper=soc_upper)
+
+            self._add_column("storage_capacity", 1, upper=_optional_bound(self.config.max_storage_size_kwh))
+            inverter_max = min(
+                _optional_bound(self.config.max_inverter_charge),
+                _optional_bound(self.config.max_inverter_discharge),
+            )
+            self._add_column("inverter_capacity", 1, upper=inverter_max)
+
+        if self.config.pv_system_already_exists:
+            existing_size = _optional_bound(self.config.existing_pv_size_kwp)
+            rate = _location_values(self.config.existing_pv_generation_timeseries, n)
+            with np.errstate(invalid="ignore"):
+                upper = np.where(rate > 0, existing_size * rate * h, 0)
+            self._add_column("existing_pv", n, upper=upper)
+
+        if self.config.allow_additional_pv:
+            self._add_column("new_pv", n)
+            self._add_column("new_pv_capacity", 1, upper=_optional_bound(self.config.max_pv_system_size_kwp))
+
+    def _add_rows(self):
+        n = self.n_timesteps
+        h = self.hours_per_timestep
+        t = np.arange(n)
+        ones = np.ones(n)
+
+        consumption = np.asarray(self.config.consumption_timeseries, dtype=float) * h
+
+        # energy balance at the consumption site
+        balance = [(self._col("grid", t), ones)]
+        if self.config.add_storage:
+            balance += [(self._col("from_storage", t), ones), (self._col("to_storage", t), -ones)]
+        if self.config.pv_system_already_exists:
+            balance.append((self._col("existing_pv", t), ones))
+        if self.config.allow_additional_pv:
+            balance.append((self._col("new_pv", t), ones))
+        self._add_row_block("energy_balance", n, balance, lower=consumption, upper=consumption)
+
+        # grid usage is limited by the grid capacity
+        self._add_capacity_rows("grid_limit", "grid", "grid_capacity", np.full(n, h))
+
+        if self.config.add_storage:
+            cfg = self.config
+
+            # stored energy balance between conversions and storage
+            self._add_row_block(
+                "stored_energy_balance",
+                n,
+                [
+                    (self._col("to_storage", t), np.full(n, cfg.inverter_efficiency)),
+                    (self._col("from_storage", t), -ones),
+                    (self._col("charge", t), -ones),
+                    (self._col("discharge", t), ones),
+                ],
+                lower=0,
+                upper=0,
+            )
+
+            # state of charge development
+            self._add_row_block(
+                "soc_balance",
+                n,
+                [
+                    (self._col("soc", t + 1), ones),
+                    (self._col("soc", t), -ones),
+                    (self._col("charge", t), np.full(n, -cfg.storage_charge_efficiency)),
+                    (self._col("discharge", t), np.full(n, 1 / cfg.storage_discharge_efficiency)),
+                ],
+                lower=0,
+                upper=0,
+            )
+
+            self._add_capacity_rows("soc_limit", "soc", "storage_capacity", ones, n_rows=n)
+            self._add_capacity_rows(
+                "charge_limit", "charge", "storage_capacity", np.full(n, cfg.storage_charge_rate * h)
+            )
+            self._add_capacity_rows(
+                "discharge_limit", "discharge", "storage_capacity", np.full(n, cfg.storage_discharge_rate * h)
+            )
+            self._add_capacity_rows("to_storage_limit", "to_storage", "inverter_capacity", np.full(n, h))
+            self._add_capacity_rows("from_storage_limit", "from_storage", "inverter_capacity", np.full(n, h))
+
+            # yearly charged energy is limited by the cyclic lifetime
+            self._add_row_block(
+                "cyclic_lifetime",
+                1,
+                [
+                    (np.zeros(n, dtype=int), self._col("charge", t), np.full(n, self.annualization_factor)),
+                    (
+                        np.zeros(1, dtype=int),
+                        self._col("storage_capacity"),
+                        -np.array([cfg.storage_cyclic_lifetime / cfg.storage_lifetime]),
+                    ),
+                ],
+                upper=0,
+            )
+
+        if self.config.allow_additional_pv:
+            rate = _location_values(self.config.new_pv_generation_timeseries, n)
+            self._add_capacity_rows("new_pv_limit", "new_pv", "new_pv_capacity", rate * h)
+
+    def _add_column(self, name: str, size: int, lower=0.0, upper=np.inf):
+        if name in CAPACITIES:
+            lower = self.min_capacities.get(name, lower)
+
+        self._columns[name] = slice(self._n_cols, self._n_cols + size)
+        self._n_cols += size
+        self._lower.append(np.broadcast_to(np.asarray(lower, dtype=float), size))
+        self._upper.append(np.broadcast_to(np.asarray(upper, dtype=float), size))
+
+    def _col(self, name: str, index=0):
+        return self._columns[name].start + index
+
+    def _add_row_block(self, name: str, n_rows: int, entries: list, lower=-np.inf, upper=np.inf):
+        """Adds a block of rows.
+
+        Args:
+            name (str): Name of the block.
+            n_rows (int): Number of rows in the block.
+            entries (list): Tuples of (columns, values) with one entry per row or
+                tuples of (rows, columns, values) with rows relative to the block.
+            lower: Lower bounds of the rows.
+            upper: Upper bounds of the rows.
+        """
+
+        offset = self._n_rows
+        self._row_blocks[name] = slice(offset, offset + n_rows)
+        for entry in entries:
+            if len(entry) == 2:
+                cols, vals = entry
+                rows = np.arange(n_rows)
+            else:
+                rows, cols, vals = entry
+            self._rows.append((rows + offset, np.asarray(cols), np.asarray(vals, dtype=float)))
+
+        self._n_rows += n_rows
+        self._row_lower.append(np.broadcast_to(np.asarray(lower, dtype=float), n_rows))
+        self._row_upper.append(np.broadcast_to(np.asarray(upper, dtype=float), n_rows))
+
+    def _add_capacity_rows(
+        self, name: str, operation: str, capacity: str, factor: np.ndarray, n_rows: int | None = None
+    ):
+        """Adds rows `operation[t] - factor[t] * capacity <= 0`."""
+
+        n_rows = n_rows or self.n_timesteps
+        t = np.arange(n_rows)
+        self._add_row_block(
+            name,
+            n_rows,
+            [(self._col(operation, t), np.ones(n_rows)), (np.full(n_rows, self._col(capacity)), -factor)],
+            upper=0,
+        )
+
+    @property
+    def annualization_factor(self) -> float:
+        """Factor scaling operation over the optimization period to a year."""
+        return HOURS_PER_YEAR / (self.n_timesteps * self.hours_per_timestep)
+
+    def objective(self) -> np.ndarray:
+        cfg = self.config
+        cost = np.zeros(self._n_cols)
+
+        price = _location_values(cfg.price_timeseries, self.n_timesteps, location="grid")
+        cost[self._columns["grid"]] = (price + cfg.grid_energy_price) * self.annualization_factor
+
+        # the grid capacity is paid yearly, like an investment with a lifetime of one year in the FINE model
+        cost[self._columns["grid_capacity"]] = cfg.grid_capacity_price / capital_charge_factor(cfg.interest_rate, 1)
+
+        if cfg.add_storage:
+            cost[self._columns["storage_capacity"]] = cfg.storage_cost_per_kwh / capital_charge_factor(
+                cfg.interest_rate, cfg.storage_lifetime
+            )
+            cost[self._columns["inverter_capacity"]] = cfg.inverter_cost_per_kw / capital_charge_factor(
+                cfg.interest_rate, cfg.inverter_lifetime
+            )
+
+        if cfg.allow_additional_pv:
+            cost[self._columns["new_pv_capacity"]] = cfg.pv_system_cost_per_kwp / capital_charge_factor(
+                cfg.interest_rate, cfg.pv_system_lifetime
+            )
+
+        return cost
+
+    def matrix(self) -> sp.csc_matrix:
+        rows = np.concatenate([r for r, _, _ in self._rows])
+        cols = np.concatenate([np.broadcast_to(c, r.shape) for r, c, _ in self._rows])
+        vals = np.concatenate([np.broadcast_to(v, r.shape) for r, _, v in self._rows])
+
+        return sp.csc_matrix((vals, (rows, cols)), shape=(self._n_rows, self._n_cols))
+
+    def _create_highs(self) -> highspy.Highs:
+        A = self.matrix()
+
+        lp = highspy.HighsLp()
+        lp.num_col_ = self._n_cols
+        lp.num_row_ = self._n_rows
+        lp.col_cost_ = self.objective()
+        lp.col_lower_ = np.concatenate(self._lower)
+        lp.col_upper_ = np.concatenate(self._upper)
+        lp.row_lower_ = np.concatenate(self._row_lower)
+        lp.row_upper_ = np.concatenate(self._row_upper)
+        lp.a_matrix_.format_ = highspy.MatrixFormat.kColwise
+        lp.a_matrix_.start_ = A.indptr
+        lp.a_matrix_.index_ = A.indices
+        lp.a_matrix_.value_ = A.data
+
+        highs = highspy.Highs()
+        highs.setOptionValue("output_flag", bool(self.config.verbose))
+        highs.passModel(lp)
+
+        return highs
+
+    def update_costs(self, **parameters) -> None:
+        """Updates cost parameters of the model without rebuilding it.
+
+        Only the changed objective coefficients are passed to HiGHS, which keeps
+        the basis of the last solve as a warm start for the next one.
+
+        Args:
+            **parameters: Config cost parameters (see `COST_PARAMETERS`) to change.
+        """
+
+        unknown = set(parameters) - set(COST_PARAMETERS)
+        if unknown:
+            msg = f"Parameters {sorted(unknown)} can not be changed without rebuilding the model. "
+            msg += f"Choose from {COST_PARAMETERS}."
+            raise ValueError(msg)
+
+        old_cost = self.objective()
+        self.config = replace(self.config, **parameters)
+        new_cost = self.objective()
+
+        changed = np.flatnonzero(old_cost != new_cost)
+        if len(changed):
+            self.highs.changeColsCost(len(changed), changed.astype(np.int32), new_cost[changed])
+
+    def update_consumption(self, consumption_timeseries: pd.Series | np.ndarray) -> int:
+        """Updates the consumption of the model without rebuilding it.
+
+        Only the energy balance rows of changed timesteps get new bounds, which
+        keeps the basis of the last solve as a warm start for the next one.
+
+        Args:
+            consumption_timeseries (pd.Series | np.ndarray): Consumption in kW, one
+                value per timestep of the model.
+
+        Returns:
+            int: Number of changed timesteps.
+        """
+
+        new = np.asarray(consumption_timeseries, dtype=float)
+        if new.shape != (self.n_timesteps,):
+            raise ValueError(f"Expected {self.n_timesteps} timesteps, got {new.size}.")
+
+        old = np.asarray(self.config.consumption_timeseries, dtype=float)
+        changed = np.flatnonzero(old != new)
+
+        consumption = self.config.consumption_timeseries.copy()
+        consumption[:] = new
+        # results of the changed consumption get a new id
+        self.config = replace(self.config, consumption_timeseries=consumption, optimization_id=None)
+
+        if len(changed):
+            rows = (self._row_blocks["energy_balance"].start + changed).astype(np.int32)
+            bounds = new[changed] * self.hours_per_timestep
+            self.highs.changeRowsBounds(len(changed), rows, bounds, bounds)
+
+        return len(changed)
+
+    def solve(self) -> Results:
+        self.run()
+
+        with self.profile.measure("extract"):
+            return self.create_results()
+
+    def run(self) -> None:
+        """Solves the model, raising a RuntimeError if no optimum was found."""
+
+        log.info("Optimizing with native HiGHS model.")
+        with self.profile.measure("solve"):
+            self.highs.run()
+
+        status = self.highs.getModelStatus()
+        if status != highspy.HighsModelStatus.kOptimal:
+            raise RuntimeError(f"Optimization failed: {self.highs.modelStatusToString(status)}")
+
+    def solution(self) -> dict[str, np.ndarray | float]:
+        """Returns the optimal values of the last solve.
+
+        Operation variables are returned as arrays, capacities as floats. The
+        state of charge has one more value than timesteps, the last one being the
+        state of charge at the end of the optimization period.
+        """
+
+        x = np.asarray(self.highs.getSolution().col_value)
+
+        values = {}
+        for name, columns in self._columns.items():
+            if name in CAPACITIES:
+                values[name] = float(x[columns][0])
+            else:
+                values[name] = x[columns]
+
+        return values
+
+    def create_results(self) -> Results:
+        values = self.solution()
+        soc = values.get("soc")
+
+        return create_native_results(
+            config=self.config,
+            grid=values["grid"],
+            charge=values.get("charge"),
+            discharge=values.get("discharge"),
+            soc=soc[: self.n_timesteps] if soc is not None else None,
+            existing_pv=values.get("existing_pv"),
+            new_pv=values.get("new_pv"),
+            grid_capacity_kw=values["grid_capacity"],
+            storage_capacity_kwh=values.get("storage_capacity", 0.0),
+            inverter_capacity_kw=values.get("inverter_capacity", 0.0),
+            new_pv_capacity_kwp=values.get("new_pv_capacity", 0.0),
+        )
+
+
+def capital_charge_factor(interest_rate: float, lifetime: float) -> float:
+    """Present value factor of an annuity, as used by FINE to annualize investments.
+
+    Args:
+        interest_rate (float): Interest rate in percent.
+        lifetime (float): Economic lifetime in years.
+
+    Returns:
+        float: Investment divided by this factor gives the annuity.
+    """
+
+    r = interest_rate / 100
+    if r == 0:
+        return lifetime
+
+    return 1 / r - 1 / (pow(1 + r, lifetime) * r)
+
+
+def create_native_results(
+    config: Config,
+    grid: np.ndarray,
+    charge: np.ndarray | None,
+    discharge: np.ndarray | None,
+    soc: np.ndarray | None,
+    existing_pv: np.ndarray | None,
+    new_pv: np.ndarray | None,
+    grid_capacity_kw: float,
+    storage_capacity_kwh: float,
+    inverter_capacity_kw: float,
+    new_pv_capacity_kwp: float,
+) -> Results:
+    """Creates results from optimal operation (kWh per timestep) and capacities.
+
+    Costs are calculated the same way as FINE's optimization summary.
+    """
+
+    if not config.optimization_id:
+        config.optimization_id = str(uuid.uuid4())
+
+    n = config.n_timesteps
+    h = config.hours_per_timestep
+    annualization_factor = HOURS_PER_YEAR / (n * h)
+
+    def timeseries(values):
+        # missing components are zeros in the results
+        if values is None:
+            return None
+        return values / h
+
+    data = {}
+    data["optimization_id"] = config.optimization_id
+    data["name"] = config.name
+    data["timestamps"] = config.timestamps
+    data["dtype"] = config.results_dtype
+
+    data["grid_usage_kw"] = timeseries(grid)
+    data["storage_charge_kw"] = timeseries(charge)
+    data["storage_discharge_kw"] = timeseries(discharge)
+    data["storage_soc_kwh"] = timeseries(soc)
+    data["existing_pv_generation_kw"] = timeseries(existing_pv)
+    data["new_pv_generation_kw"] = timeseries(new_pv)
+    data["consumption_kw"] = config.consumption_timeseries
+    data["energy_price_eur"] = config.price_timeseries["grid"]
+
+    data["grid_capacity_kw"] = grid_capacity_kw
+    data["storage_capacity_kwh"] = storage_capacity_kwh
+    data["inverter_capacity_kw"] = inverter_capacity_kw
+    data["new_pv_capacity_kwp"] = new_pv_capacity_kwp
+
+    price = _location_values(config.price_timeseries, n, location="grid")
+    data["energy_costs_eur"] = float(price @ grid) * annualization_factor
+    data["grid_energy_costs_eur"] = float(grid.sum()) * config.grid_energy_price * annualization_factor
+    data["grid_capacity_costs_eur"] = grid_capacity_kw * config.grid_capacity_price
+
+    data["storage_invest_eur"] = storage_capacity_kwh * config.storage_cost_per_kwh
+    data["storage_annuity_eur"] = data["storage_invest_eur"] / capital_charge_factor(
+        config.interest_rate, config.storage_lifetime
+    )
+    data["inverter_invest_eur"] = inverter_capacity_kw * config.inverter_cost_per_kw
+    data["inverter_annuity_eur"] = data["inverter_invest_eur"] / capital_charge_factor(
+        config.interest_rate, config.inverter_lifetime
+    )
+    data["new_pv_invest_eur"] = new_pv_capacity_kwp * config.pv_system_cost_per_kwp
+    data["new_pv_annuity_eur"] = data["new_pv_invest_eur"] / capital_charge_factor(
+        config.interest_rate, config.pv_system_lifetime
+    )
+
+    data["total_yearly_costs_eur"] = (
+        data["energy_costs_eur"]
+        + data["grid_energy_costs_eur"]
+        + data["grid_capacity_costs_eur"]
+        + data["storage_annuity_eur"]
+        + data["inverter_annuity_eur"]
+        + data["new_pv_annuity_eur"]
+    )
+    data["total_annuity_eur"] = data["storage_annuity_eur"] + data["inverter_annuity_eur"] + data["new_pv_annuity_eur"]
+    data["total_invest_eur"] = data["storage_invest_eur"] + data["inverter_invest_eur"] + data["new_pv_invest_eur"]
+
+    return Results(**data)
+
+
+def _optional_bound(value: float | None) -> float:
+    # unset or zero maximum sizes mean unlimited, as in `PeakShavingAnalyzer`
+    if not value:
+        return np.inf
+
+    return float(value)
+
+
+def _location_values(df: pd.DataFrame, n_timesteps: int, location: str = "consumption_site") -> np.ndarray:
+    values = np.asarray(df[location], dtype=float)
+    if len(values) != n_timesteps:
+        raise ValueError(f"Expected {n_timesteps} timesteps, got {len(values)}.")
+
+    return values
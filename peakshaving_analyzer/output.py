@@ -2,17 +2,55 @@ import logging
 import uuid
 from dataclasses import dataclass
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-import fine as fn
+import numpy as np
 import pandas as pd
-import plotly.graph_objects as go
-import sqlalchemy
 
-from peakshaving_analyzer import Config
 from peakshaving_analyzer.common import IOHandler
+from peakshaving_analyzer.config import Config
+from peakshaving_analyzer.plotting import DEFAULT_MAX_POINTS, line_figure, show
+from peakshaving_analyzer.profiling import SolverProfile
+
+if TYPE_CHECKING:
+    import fine as fn
+    import sqlalchemy
 
 log = logging.getLogger(__name__)
 
+# timeseries fields of the results, all with one value per timestep
+TIMESERIES_FIELDS = (
+    "grid_usage_kw",
+    "storage_charge_kw",
+    "storage_discharge_kw",
+    "storage_soc_kwh",
+    "existing_pv_generation_kw",
+    "new_pv_generation_kw",
+    "consumption_kw",
+    "energy_price_eur",
+)
+
+
+class _Timeseries:
+    """Field of `Results` stored as a row of its contiguous timeseries array.
+
+    Reading returns a `pd.Series` viewing the row, writing copies the values
+    into the row. Missing timeseries are zeros.
+    """
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, obj, objtype=None):
+        # without an instance, the dataclass asks for the default value
+        if obj is None:
+            return None
+
+        return obj._get_timeseries(self.name)
+
+    def __set__(self, obj, value):
+        obj._set_timeseries(self.name, value)
+
 
 @dataclass
 class Results(IOHandler):
@@ -22,15 +60,15 @@ class Results(IOHandler):
     # general parameters
     name: str
 
-    # output timeseries
-    grid_usage_kw: pd.Series | None = None
-    storage_charge_kw: pd.Series | None = None
-    storage_discharge_kw: pd.Series | None = None
-    storage_soc_kwh: pd.Series | None = None
-    existing_pv_generation_kw: pd.Series | None = None
-    new_pv_generation_kw: pd.Series | None = None
-    consumption_kw: pd.Series | None = None
-    energy_price_eur: pd.Series | None = None
+    # output timeseries, kept as rows of one contiguous array (see `_Timeseries`)
+    grid_usage_kw: pd.Series | None = _Timeseries()
+    storage_charge_kw: pd.Series | None = _Timeseries()
+    storage_discharge_kw: pd.Series | None = _Timeseries()
+    storage_soc_kwh: pd.Series | None = _Timeseries()
+    existing_pv_generation_kw: pd.Series | None = _Timeseries()
+    new_pv_generation_kw: pd.Series | None = _Timeseries()
+    consumption_kw: pd.Series | None = _Timeseries()
+    energy_price_eur: pd.Series | None = _Timeseries()
 
     # energy costs itself
     energy_costs_eur: float | None = None
@@ -58,25 +96,96 @@ class Results(IOHandler):
     total_annuity_eur: float | None = None
     total_invest_eur: float | None = None
 
+    # time series aggregation errors and grid peak of the full resolution timeseries
+    tsa_rmse: float | None = None
+    tsa_mae: float | None = None
+    full_resolution_grid_peak_kw: float | None = None
+
     # timestamps
     timestamps: list | None = None
 
-    def timeseries_to_df(self):
-        df = pd.DataFrame()
+    # data type of the timeseries, "float32" halves their memory
+    dtype: str = "float64"
 
-        df["timestamp"] = self.timestamps
+    # timings and model size of the optimization
+    profile: SolverProfile | None = None
 
-        df["grid_usage_kw"] = self.grid_usage_kw
-        df["storage_charge_kw"] = self.storage_charge_kw
-        df["storage_discharge_kw"] = self.storage_discharge_kw
-        df["storage_soc_kwh"] = self.storage_soc_kwh
-        df["existing_pv_generation_kw"] = self.existing_pv_generation_kw
-        df["new_pv_generation_kw"] = self.new_pv_generation_kw
-        df["consumption_kw"] = self.consumption_kw
-        df["energy_price_eur"] = self.energy_price_eur
+    def __post_init__(self):
+        if isinstance(self.profile, dict):
+            self.profile = SolverProfile(**self.profile)
+
+        pending = self.__dict__.pop("_pending", {})
+        self._values = None
+        self._series = {}
+
+        lengths = {len(values) for values in pending.values() if values is not None}
+        if len(lengths) > 1:
+            raise ValueError(f"All timeseries of the results need the same length, got lengths {lengths}.")
+        if lengths:
+            self._allocate(lengths.pop())
+            for name, values in pending.items():
+                self._set_timeseries(name, values)
+
+    def __getstate__(self):
+        # series are only views of the array, no need to pickle them
+        state = self.__dict__.copy()
+        state["_series"] = {}
+
+        return state
+
+    def to_summary(self) -> dict:
+        """Scalar results with the profile flattened to `profile_*` values, e.g. for one row of a table."""
+
+        summary = self.to_dict(include_timeseries=False)
+        summary.pop("profile", None)
+        if self.profile is not None:
+            summary.update(self.profile.to_columns())
+
+        return summary
+
+    def timeseries_to_df(self) -> pd.DataFrame:
+        """Returns the timeseries as a dataframe viewing the array of the results without copying."""
+
+        if self._values is None:
+            df = pd.DataFrame(columns=list(TIMESERIES_FIELDS))
+        else:
+            df = pd.DataFrame(self._values.T, columns=list(TIMESERIES_FIELDS), copy=False)
+        df.insert(0, "timestamp", self.timestamps)
 
         return df
 
+    def _allocate(self, n_timesteps: int) -> None:
+        # zeroed memory is only committed by the OS when written, so missing
+        # components (e.g. no PV) don't use any memory
+        self._values = np.zeros((len(TIMESERIES_FIELDS), n_timesteps), dtype=self.dtype)
+
+    def _get_timeseries(self, name: str) -> pd.Series | None:
+        if self._values is None:
+            return None
+
+        if name not in self._series:
+            self._series[name] = pd.Series(self._values[TIMESERIES_FIELDS.index(name)], name=name, copy=False)
+
+        return self._series[name]
+
+    def _set_timeseries(self, name: str, values) -> None:
+        if "_values" not in self.__dict__:
+            # during __init__, the array is allocated once all timeseries are known
+            self.__dict__.setdefault("_pending", {})[name] = values
+            return
+
+        if values is None:
+            if self._values is not None:
+                self._values[TIMESERIES_FIELDS.index(name)] = 0
+            return
+
+        if self._values is None:
+            self._allocate(len(values))
+        elif len(values) != self._values.shape[1]:
+            raise ValueError(f"Expected {self._values.shape[1]} values for {name}, got {len(values)}.")
+
+        self._values[TIMESERIES_FIELDS.index(name)] = np.asarray(values, dtype=self.dtype)
+
     def timeseries_to_csv(self, path: str | Path):
         df = self.timeseries_to_df()
         df.to_csv(path)
@@ -87,64 +196,61 @@ class Results(IOHandler):
 
     def to_sql(
         self,
-        connection: str | sqlalchemy.engine.Connection,
+        connection: "str | sqlalchemy.engine.Engine | sqlalchemy.engine.Connection",
         include_timeseries: bool = True,
         overview_table_name: str = "overview",
         timeseries_table_name: str = "timeseries",
-        schema: str = "public",
+        schema: str | None = "public",
     ) -> None:
-        df = pd.DataFrame([self.to_dict(include_timeseries=False)])
-        df.to_sql(name=overview_table_name, schema=schema, con=connection, if_exists="append", index=False)
-
-        if include_timeseries:
-            df = self.timeseries_to_df()
-            df["name"] = self.name
-            df["optimization_id"] = self.optimization_id
-            df.to_sql(name=timeseries_table_name, schema=schema, con=connection, if_exists="append", index=False)
-
-    def plot_storage_timeseries(self):
-        fig = go.Figure()
-
-        ts_df = self.timeseries_to_df()
-        if "timestamp" in ts_df.columns:
-            x = ts_df["timestamp"]
-        elif "datetime" in ts_df.columns:
-            x = ts_df["datetime"]
-        else:
-            x = ts_df.index
-
-        fig.add_trace(
-            go.Scatter(
-                x=x,
-                y=ts_df["storage_charge_kw"],
-                name="Storage charge (kW)",
-                mode="lines",
-            )
-        )
-        fig.add_trace(
-            go.Scatter(
-                x=x,
-                y=ts_df["storage_discharge_kw"],
-                name="Storage discharge (kW)",
-                mode="lines",
-            )
+        """Writes the results to the database, creating missing tables.
+
+        Tables written by earlier versions are appended to, missing columns are
+        added. Use `schema=None` for databases without schemas like SQLite. To
+        write many results at once, use `peakshaving_analyzer.database.write_results`.
+        """
+
+        # imported here as the database module builds its tables from this class
+        from peakshaving_analyzer.database import write_results
+
+        write_results(
+            [self],
+            connection,
+            include_timeseries=include_timeseries,
+            overview_table_name=overview_table_name,
+            timeseries_table_name=timeseries_table_name,
+            schema=schema,
         )
 
-        fig.add_trace(go.Scatter(x=x, y=ts_df["storage_soc_kwh"], name="Storage SOC (kWh)", mode="lines", yaxis="y2"))
-
-        # Layout anpassen
-        fig.update_layout(
+    def plot_storage_timeseries(
+        self, max_points: int | None = DEFAULT_MAX_POINTS, dynamic: bool = False, path: str | Path | None = None
+    ):
+        """Plots charge and discharge of the storage and its state of charge, see `plot_timeseries`."""
+
+        x = self.timestamps if self.timestamps is not None else np.arange(len(self.storage_soc_kwh))
+        fig = line_figure(
+            x,
+            {
+                "Storage charge (kW)": self.storage_charge_kw,
+                "Storage discharge (kW)": self.storage_discharge_kw,
+                "Storage SOC (kWh)": self.storage_soc_kwh,
+            },
+            max_points=max_points,
+            dynamic=dynamic,
+            secondary_y=["Storage SOC (kWh)"],
             title="Charge / Discharge (kW) und SOC (kWh)",
-            yaxis=dict(
-                title="Charge / Discharge (kW)",
-            ),
-            yaxis2=dict(title="SOC (kWh)", overlaying="y", side="right"),
+            yaxis_title="Charge / Discharge (kW)",
+            yaxis2_title="SOC (kWh)",
             template="plotly_white",
         )
+        show(fig, path)
+
+        return fig
 
-        fig.show()
+    def plot_consumption_timeseries(
+        self, max_points: int | None = DEFAULT_MAX_POINTS, dynamic: bool = False, path: str | Path | None = None
+    ):
+        """Plots consumption, grid usage, storage discharge and PV generation, see `plot_timeseries`."""
 
-    def plot_consumption_timeseries(self):
         consumption_columns = [
             "grid_usage_kw",
             "storage_discharge_kw",
@@ -152,10 +258,59 @@ class Results(IOHandler):
             "new_pv_generation_kw",
             "consumption_kw",
         ]
-        self._plot(cols_to_plot=consumption_columns, yaxis_title="Power in kW")
 
+        return self._plot(
+            cols_to_plot=consumption_columns,
+            yaxis_title="Power in kW",
+            max_points=max_points,
+            dynamic=dynamic,
+            path=path,
+        )
 
-def create_results(config: Config, esm: fn.EnergySystemModel) -> Results:
+
+# optimal timeseries read from FINE: field -> (modeling class, variable, (component, location))
+FINE_TIMESERIES = {
+    "grid_usage_kw": ("SourceSinkModel", "operationVariablesOptimum", ("grid", "grid")),
+    "storage_charge_kw": ("StorageModel", "chargeOperationVariablesOptimum", ("storage", "consumption_site")),
+    "storage_discharge_kw": ("StorageModel", "dischargeOperationVariablesOptimum", ("storage", "consumption_site")),
+    "storage_soc_kwh": ("StorageModel", "stateOfChargeOperationVariablesOptimum", ("storage", "consumption_site")),
+    "existing_pv_generation_kw": ("SourceSinkModel", "operationVariablesOptimum", ("Existing PV", "consumption_site")),
+    "new_pv_generation_kw": ("SourceSinkModel", "operationVariablesOptimum", ("New PV", "consumption_site")),
+}
+
+# scalar results read from the optimization summaries of FINE: field -> (modeling class, index, location)
+FINE_SUMMARY = {
+    # system sizes
+    "grid_capacity_kw": ("TransmissionModel", ("capacity_price", "capacity", "[kWh]", "grid"), "consumption_site"),
+    "storage_capacity_kwh": ("StorageModel", ("storage", "capacity", "[kWh*h]"), "consumption_site"),
+    "inverter_capacity_kw": ("ConversionModel", ("from_storage", "capacity", "[kWh]"), "consumption_site"),
+    "new_pv_capacity_kwp": ("SourceSinkModel", ("New PV", "capacity", "[kWh]"), "consumption_site"),
+    # energy itself
+    "energy_costs_eur": ("SourceSinkModel", ("grid", "TAC", "[Euro/a]"), "grid"),
+    # grid, the invest of one direction of the transmission is half the capacity costs
+    "grid_energy_costs_eur": (
+        "TransmissionModel",
+        ("capacity_price", "opexOp", "[Euro/a]", "grid"),
+        "consumption_site",
+    ),
+    "grid_capacity_costs_eur": (
+        "TransmissionModel",
+        ("capacity_price", "invest", "[Euro]", "grid"),
+        "consumption_site",
+    ),
+    # storage
+    "storage_invest_eur": ("StorageModel", ("storage", "invest", "[Euro]"), "consumption_site"),
+    "storage_annuity_eur": ("StorageModel", ("storage", "TAC", "[Euro/a]"), "consumption_site"),
+    # inverter
+    "inverter_invest_eur": ("ConversionModel", ("from_storage", "invest", "[Euro]"), "consumption_site"),
+    "inverter_annuity_eur": ("ConversionModel", ("from_storage", "TAC", "[Euro/a]"), "consumption_site"),
+    # pv
+    "new_pv_invest_eur": ("SourceSinkModel", ("New PV", "invest", "[Euro]"), "consumption_site"),
+    "new_pv_annuity_eur": ("SourceSinkModel", ("New PV", "TAC", "[Euro/a]"), "consumption_site"),
+}
+
+
+def create_results(config: Config, esm: "fn.EnergySystemModel") -> Results:
     if not config.optimization_id:
         config.optimization_id = str(uuid.uuid4())
 
@@ -163,230 +318,78 @@ def create_results(config: Config, esm: fn.EnergySystemModel) -> Results:
     data["optimization_id"] = config.optimization_id
     data["name"] = config.name
     data["timestamps"] = config.timestamps
+    data["dtype"] = config.results_dtype
 
     _retrieve_timeseries(data, esm=esm, config=config)
     log.info("Retrieved timeseries")
 
-    _retrieve_system_sizes(data, esm=esm)
-    log.info("Retrieved system sizes")
+    _retrieve_summary(data, esm=esm)
+    log.info("Retrieved system sizes and costs")
 
-    _retrieve_system_costs(data, esm=esm)
-    log.info("Retrieved system costs")
+    _add_totals(data)
 
     return Results(**data)
 
 
-def _get_val_from_summary(esm: fn.EnergySystemModel, model_name: str, index: tuple[str], location) -> float:
-    try:
-        return esm.getOptimizationSummary(model_name).loc[index, location]
-    except KeyError:
-        log.warning(f"KeyError: {index} not found in {model_name} model.")
-        return 0.0
-
-
-def _get_optimum_ts(esm: fn.EnergySystemModel, model_name: str, variable: str, index: tuple[str]) -> pd.Series:
-    """Retrieves optimum timeseries from ESM.
-
-    Args:
-        model_name (str): Component model name.
-        variable (str): The variable to get.
-        index (tuple[str]): Index to use.
+def _retrieve_timeseries(data: dict[str], esm: "fn.EnergySystemModel", config: Config) -> None:
+    """Retrieves the optimum timeseries, missing components are zeros in the results.
 
-    Returns:
-        pd.Series: Optimum timeseries
+    Every frame of optimal values is read and converted to an array once.
     """
 
-    try:
-        mdl = esm.componentModelingDict[model_name]
-        vals_df = mdl.getOptimalValues(variable)["values"]
-
-        s = vals_df.loc[index]
-    except Exception as e:
-        raise e
-
-    return s
-
-
-def _retrieve_timeseries(data: dict[str], esm: fn.EnergySystemModel, config: Config) -> None:
-    """Writes optimum timeseries to database."""
-
-    data["grid_usage_kw"] = (
-        _get_optimum_ts(
-            esm=esm,
-            model_name="SourceSinkModel",
-            variable="operationVariablesOptimum",
-            index=("grid", "grid"),
-        )
-        / config.hours_per_timestep
-    )
-
-    if config.add_storage:
-        data["storage_charge_kw"] = (
-            _get_optimum_ts(
-                esm=esm,
-                model_name="StorageModel",
-                variable="chargeOperationVariablesOptimum",
-                index=("storage", "consumption_site"),
-            )
-            / config.hours_per_timestep
-        )
+    for (model_name, variable), names in _group(FINE_TIMESERIES, key=lambda spec: spec[:2]).items():
+        mdl = esm.componentModelingDict.get(model_name)
+        values_df = mdl.getOptimalValues(variable)["values"] if mdl is not None else None
+        if values_df is None:
+            continue
 
-        data["storage_discharge_kw"] = (
-            _get_optimum_ts(
-                esm=esm,
-                model_name="StorageModel",
-                variable="dischargeOperationVariablesOptimum",
-                index=("storage", "consumption_site"),
-            )
-            / config.hours_per_timestep
-        )
-
-        data["storage_soc_kwh"] = (
-            _get_optimum_ts(
-                esm=esm,
-                model_name="StorageModel",
-                variable="stateOfChargeOperationVariablesOptimum",
-                index=("storage", "consumption_site"),
-            )
-            / config.hours_per_timestep
-        )
-
-    else:
-        data["storage_charge_kw"] = pd.Series(0, index=list(range(config.n_timesteps)))
-        data["storage_discharge_kw"] = pd.Series(0, index=list(range(config.n_timesteps)))
-        data["storage_soc_kwh"] = pd.Series(0, index=list(range(config.n_timesteps)))
-
-    if config.pv_system_already_exists:
-        data["existing_pv_generation_kw"] = (
-            _get_optimum_ts(
-                esm=esm,
-                model_name="SourceSinkModel",
-                variable="operationVariablesOptimum",
-                index=("Existing PV", "consumption_site"),
-            )
-            / config.hours_per_timestep
-        )
+        values = values_df.to_numpy(dtype=float) / config.hours_per_timestep
+        for name in names:
+            row = _position(values_df.index, FINE_TIMESERIES[name][2])
+            if row is not None:
+                data[name] = values[row]
 
-    else:
-        data["existing_pv_generation_kw"] = pd.Series(0, index=list(range(config.n_timesteps)))
-
-    if config.allow_additional_pv:
-        data["new_pv_generation_kw"] = (
-            _get_optimum_ts(
-                esm=esm,
-                model_name="SourceSinkModel",
-                variable="operationVariablesOptimum",
-                index=("New PV", "consumption_site"),
-            )
-            / config.hours_per_timestep
-        )
-
-    else:
-        data["new_pv_generation_kw"] = pd.Series(0, index=list(range(config.n_timesteps)))
+    if "grid_usage_kw" not in data:
+        raise KeyError("Optimal grid usage not found in the energy system model.")
 
     data["consumption_kw"] = config.consumption_timeseries
     data["energy_price_eur"] = config.price_timeseries["grid"]
 
 
-def _retrieve_system_sizes(data: dict, esm: fn.EnergySystemModel) -> None:
-    data["grid_capacity_kw"] = _get_val_from_summary(
-        esm=esm,
-        model_name="TransmissionModel",
-        index=("capacity_price", "capacity", "[kWh]", "grid"),
-        location="consumption_site",
-    )
-
-    data["storage_capacity_kwh"] = _get_val_from_summary(
-        esm=esm,
-        model_name="StorageModel",
-        index=("storage", "capacity", "[kWh*h]"),
-        location="consumption_site",
-    )
+def _retrieve_summary(data: dict, esm: "fn.EnergySystemModel") -> None:
+    """Retrieves sizes and costs, reading the optimization summary of every modeling class once.
 
-    data["inverter_capacity_kw"] = _get_val_from_summary(
-        esm=esm,
-        model_name="ConversionModel",
-        index=("from_storage", "capacity", "[kWh]"),
-        location="consumption_site",
-    )
+    Values not found in the summaries (e.g. of components not in the model) are zero.
+    """
 
-    data["new_pv_capacity_kwp"] = _get_val_from_summary(
-        esm=esm,
-        model_name="SourceSinkModel",
-        index=("New PV", "capacity", "[kWh]"),
-        location="consumption_site",
-    )
+    for model_name, names in _group(FINE_SUMMARY, key=lambda spec: spec[0]).items():
+        summary = esm.getOptimizationSummary(model_name) if model_name in esm.componentModelingDict else None
+        values = summary.to_numpy() if summary is not None else None
 
+        for name in names:
+            _, index, location = FINE_SUMMARY[name]
+            row = _position(summary.index, index) if summary is not None else None
+            column = _position(summary.columns, location) if summary is not None else None
+            if row is None or column is None:
+                log.warning(f"KeyError: {index} not found in {model_name} model.")
+                data[name] = 0.0
+            else:
+                data[name] = float(values[row, column])
 
-def _retrieve_system_costs(data: dict[str], esm: fn.EnergySystemModel) -> None:
-    # energy itself
-    data["energy_costs_eur"] = _get_val_from_summary(
-        esm=esm,
-        model_name="SourceSinkModel",
-        index=("grid", "TAC", "[Euro/a]"),
-        location="grid",
-    )
+    # FINE splits the costs of a transmission between its two directions, the summary only contains one of them
+    data["grid_capacity_costs_eur"] *= 2
 
-    # grid data
-    data["grid_energy_costs_eur"] = _get_val_from_summary(
-        esm=esm,
-        model_name="TransmissionModel",
-        index=("capacity_price", "opexOp", "[Euro/a]", "grid"),
-        location="consumption_site",
-    )
-    data["grid_capacity_costs_eur"] = (
-        _get_val_from_summary(
-            esm=esm,
-            model_name="TransmissionModel",
-            index=("capacity_price", "invest", "[Euro]", "grid"),
-            location="consumption_site",
-        )
-        * 2
-    )
 
-    # storage data
-    data["storage_invest_eur"] = _get_val_from_summary(
-        esm=esm,
-        model_name="StorageModel",
-        index=("storage", "invest", "[Euro]"),
-        location="consumption_site",
-    )
-    data["storage_annuity_eur"] = _get_val_from_summary(
-        esm=esm,
-        model_name="StorageModel",
-        index=("storage", "TAC", "[Euro/a]"),
-        location="consumption_site",
-    )
+def _position(index: pd.Index, key) -> int | None:
+    """Position of a key in a unique index, None if it is missing."""
 
-    # inverter data
-    data["inverter_invest_eur"] = _get_val_from_summary(
-        esm=esm,
-        model_name="ConversionModel",
-        index=("from_storage", "invest", "[Euro]"),
-        location="consumption_site",
-    )
-    data["inverter_annuity_eur"] = _get_val_from_summary(
-        esm=esm,
-        model_name="ConversionModel",
-        index=("from_storage", "TAC", "[Euro/a]"),
-        location="consumption_site",
-    )
+    try:
+        return index.get_loc(key)
+    except KeyError:
+        return None
 
-    # pv data
-    data["new_pv_invest_eur"] = _get_val_from_summary(
-        esm=esm,
-        model_name="SourceSinkModel",
-        index=("New PV", "invest", "[Euro]"),
-        location="consumption_site",
-    )
-    data["new_pv_annuity_eur"] = _get_val_from_summary(
-        esm=esm,
-        model_name="SourceSinkModel",
-        index=("New PV", "TAC", "[Euro/a]"),
-        location="consumption_site",
-    )
 
-    # calculate total costs
+def _add_totals(data: dict) -> None:
     data["total_yearly_costs_eur"] = (
         data["energy_costs_eur"]
         + data["grid_energy_costs_eur"]
@@ -397,3 +400,13 @@ def _retrieve_system_costs(data: dict[str], esm: fn.EnergySystemModel) -> None:
     )
     data["total_annuity_eur"] = data["storage_annuity_eur"] + data["inverter_annuity_eur"] + data["new_pv_annuity_eur"]
     data["total_invest_eur"] = data["storage_invest_eur"] + data["inverter_invest_eur"] + data["new_pv_invest_eur"]
+
+
+def _group(specs: dict, key) -> dict:
+    """Groups field names by a key of their specification, keeping the order of the fields."""
+
+    groups = {}
+    for name, spec in specs.items():
+        groups.setdefault(key(spec), []).append(name)
+
+    return groups
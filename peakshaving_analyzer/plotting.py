@@ -0,0 +1,188 @@
+import logging
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import numpy as np
+import pandas as pd
+
+if TYPE_CHECKING:
+    import plotly.graph_objects as go
+
+log = logging.getLogger(__name__)
+
+# points per trace, about the horizontal resolution of a screen times two for minima and maxima
+DEFAULT_MAX_POINTS = 4000
+
+# file types written as static images, these need kaleido
+IMAGE_SUFFIXES = (".png", ".jpg", ".jpeg", ".webp", ".svg", ".pdf")
+
+
+def minmax_indices(y: np.ndarray, max_points: int) -> np.ndarray:
+    """Indices of the points kept when downsampling a line to at most `max_points`.
+
+    The values are split into buckets of equal length and the minimum and maximum
+    of every bucket are kept, together with the first and last value. Unlike
+    averaging or taking every n-th value, this keeps all peaks visible.
+
+    Args:
+        y (np.ndarray): Values of the line.
+        max_points (int): Maximum number of points to keep, at least 4.
+
+    Returns:
+        np.ndarray: Sorted indices of the kept points.
+    """
+
+    if max_points < 4:
+        raise ValueError(f"Need to keep at least 4 points, got {max_points}.")
+
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if n <= max_points:
+        return np.arange(n)
+
+    # buckets of equal size, leaving room for the first and last value
+    size = -(-n // (max_points // 2 - 1))
+    n_buckets = -(-n // size)
+    offsets = np.arange(n_buckets) * size
+
+    # missing values and the padding of the last bucket are never picked over a value
+    padded = np.full(n_buckets * size, np.nan)
+    padded[:n] = y
+    buckets = padded.reshape(n_buckets, size)
+    lows = offsets + np.where(np.isnan(buckets), np.inf, buckets).argmin(axis=1)
+    highs = offsets + np.where(np.isnan(buckets), -np.inf, buckets).argmax(axis=1)
+
+    return np.unique(np.concatenate([[0, n - 1], np.minimum(lows, n - 1), np.minimum(highs, n - 1)]))
+
+
+def line_figure(
+    x,
+    lines: dict[str, np.ndarray],
+    max_points: int | None = DEFAULT_MAX_POINTS,
+    dynamic: bool = False,
+    secondary_y: list[str] | None = None,
+    **layout,
+) -> "go.Figure":
+    """Line figure drawn with WebGL, each line downsampled with `minmax_indices`.
+
+    Args:
+        x: Common x values of the lines, sorted ascending for `dynamic`.
+        lines (dict[str, np.ndarray]): Values per line name.
+        max_points (int | None): Maximum number of points per line, None keeps all points.
+        dynamic (bool): Whether to downsample the visible range again when zooming.
+            Needs a Jupyter notebook with `anywidget`, otherwise the figure stays static.
+        secondary_y (list[str] | None): Names of the lines drawn on a second y axis.
+        **layout: Passed to `update_layout`, e.g. `title` or `yaxis_title`.
+
+    Returns:
+        go.Figure: The figure, a `go.FigureWidget` if dynamic.
+    """
+
+    # plotly is only imported when plotting
+    import plotly.graph_objects as go
+
+    x = _values(x)
+    lines = {name: np.asarray(y, dtype=float) for name, y in lines.items()}
+    secondary_y = set(secondary_y or [])
+
+    fig = go.Figure()
+    for name, y in lines.items():
+        kept = minmax_indices(y, max_points) if max_points else slice(None)
+        fig.add_trace(
+            go.Scattergl(x=x[kept], y=y[kept], name=name, mode="lines", yaxis="y2" if name in secondary_y else "y")
+        )
+
+    if secondary_y:
+        fig.update_layout(yaxis2=dict(overlaying="y", side="right"))
+    fig.update_layout(**layout)
+
+    if dynamic and max_points:
+        fig = _resample_on_zoom(fig, x, list(lines.values()), max_points)
+
+    return fig
+
+
+def show(fig: "go.Figure", path: str | Path | None = None) -> None:
+    """Shows a figure or writes it to an HTML file or a static image.
+
+    Args:
+        fig (go.Figure): The figure.
+        path (str | Path | None): File to write to instead of showing the figure.
+            Static images (png, jpg, webp, svg or pdf) need kaleido.
+    """
+
+    import plotly.graph_objects as go
+
+    if path is None:
+        if isinstance(fig, go.FigureWidget):
+            # shown as widget, `show` would render a static copy that doesn't resample
+            from IPython.display import display
+
+            display(fig)
+        else:
+            fig.show()
+        return
+
+    path = Path(path)
+    if path.suffix == ".html":
+        # the plotly library is loaded from a CDN instead of embedding several MB per file
+        fig.write_html(path, include_plotlyjs="cdn")
+    elif path.suffix in IMAGE_SUFFIXES:
+        _import_kaleido()
+        fig.write_image(path)
+    else:
+        raise ValueError(f"Can't write figures to '{path.suffix}' files. Choose html or one of {IMAGE_SUFFIXES}.")
+
+
+def visible_slice(x: np.ndarray, x_range) -> slice:
+    """Slice of the sorted x values inside an axis range, including one point beyond each end."""
+
+    if x_range is None:
+        return slice(0, len(x))
+
+    if np.issubdtype(x.dtype, np.datetime64):
+        bounds = pd.to_datetime(list(x_range)).to_numpy(dtype=x.dtype)
+    else:
+        bounds = np.asarray(x_range, dtype=float)
+
+    start = max(int(np.searchsorted(x, bounds[0])) - 1, 0)
+    stop = min(int(np.searchsorted(x, bounds[1], side="right")) + 1, len(x))
+
+    return slice(start, stop)
+
+
+def _resample_on_zoom(fig: "go.Figure", x: np.ndarray, lines: list[np.ndarray], max_points: int) -> "go.Figure":
+    import plotly.graph_objects as go
+
+    try:
+        widget = go.FigureWidget(fig)
+    except ImportError:
+        log.warning("Resampling on zoom needs anywidget in a Jupyter notebook, the figure stays static.")
+        return fig
+
+    def resample(layout, x_range):
+        visible = visible_slice(x, x_range)
+        with widget.batch_update():
+            for trace, y in zip(widget.data, lines, strict=True):
+                kept = visible.start + minmax_indices(y[visible], max_points)
+                trace.x = x[kept]
+                trace.y = y[kept]
+
+    widget.layout.xaxis.on_change(resample, "range")
+
+    return widget
+
+
+def _values(x) -> np.ndarray:
+    if isinstance(x, pd.DatetimeIndex | pd.Series) and isinstance(x.dtype, pd.DatetimeTZDtype):
+        # plotly draws timezone aware timestamps in local time
+        x = x.tz_localize(None) if isinstance(x, pd.DatetimeIndex) else x.dt.tz_localize(None)
+
+    return np.asarray(x)
+
+
+def _import_kaleido():
+    try:
+        import kaleido  # noqa: F401
+    except ImportError as e:
+        raise ImportError("Static images need kaleido, install peakshaving-analyzer[images].") from e
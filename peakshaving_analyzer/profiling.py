@@ -0,0 +1,101 @@
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, fields
+
+from peakshaving_analyzer.common import IOHandler
+
+# phases of an optimization, each timed in `<phase>_seconds`
+PHASES = ("build", "declare", "solve", "extract")
+
+# prefix of the profile columns in flat result summaries
+COLUMN_PREFIX = "profile_"
+
+
+@dataclass
+class SolverProfile(IOHandler):
+    """Timings and model size of one optimization.
+
+    The phases are building the model (FINE energy system model or native LP
+    columns and rows), declaring it to the solver (pyomo model or HiGHS
+    matrix), solving and extracting the results. Rolling horizon optimizations
+    add up the timings of their windows and report the size of the largest one.
+    """
+
+    engine: str | None = None
+
+    build_seconds: float = 0.0
+    declare_seconds: float = 0.0
+    solve_seconds: float = 0.0
+    extract_seconds: float = 0.0
+    total_seconds: float = 0.0
+
+    n_variables: int | None = None
+    n_constraints: int | None = None
+    n_nonzeros: int | None = None
+
+    # results were loaded from a cache, no model was built or solved
+    cache_hit: bool = False
+
+    @contextmanager
+    def measure(self, phase: str):
+        """Adds the time spent in the block to the given phase."""
+
+        if phase not in PHASES:
+            raise ValueError(f"Unknown phase '{phase}'. Choose one of {PHASES}.")
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            name = f"{phase}_seconds"
+            setattr(self, name, getattr(self, name) + time.perf_counter() - start)
+
+    def record_model_size(self, n_variables: int, n_constraints: int, n_nonzeros: int | None = None) -> None:
+        """Records the model size, keeping the largest one of several models."""
+
+        self.n_variables = max(n_variables, self.n_variables or 0)
+        self.n_constraints = max(n_constraints, self.n_constraints or 0)
+        if n_nonzeros is not None:
+            self.n_nonzeros = max(n_nonzeros, self.n_nonzeros or 0)
+
+    def report(self) -> str:
+        """Human readable table of the timings and the model size."""
+
+        lines = [f"Solver profile ({self.engine or 'unknown'} engine{', cached' if self.cache_hit else ''})"]
+        for phase in PHASES:
+            seconds = getattr(self, f"{phase}_seconds")
+            share = seconds / self.total_seconds * 100 if self.total_seconds else 0.0
+            lines.append(f"  {phase:<12}{seconds:>10.3f} s {share:>6.1f} %")
+        lines.append(f"  {'total':<12}{self.total_seconds:>10.3f} s")
+
+        for name in ("n_variables", "n_constraints", "n_nonzeros"):
+            value = getattr(self, name)
+            lines.append(f"  {name[2:]:<12}{'-' if value is None else f'{value:,}':>10}")
+
+        return "\n".join(lines)
+
+    def to_columns(self) -> dict:
+        """Flat `profile_<field>` values for tables with one row per optimization."""
+
+        return {f"{COLUMN_PREFIX}{field.name}": getattr(self, field.name) for field in fields(self)}
+
+    @classmethod
+    def from_columns(cls, row: dict) -> "SolverProfile | None":
+        """Removes the columns written by `to_columns` from a row and returns the profile, if any."""
+
+        data = {}
+        for field in fields(cls):
+            value = row.pop(f"{COLUMN_PREFIX}{field.name}", None)
+            if value is not None:
+                data[field.name] = value
+
+        if not data:
+            return None
+
+        for name in ("n_variables", "n_constraints", "n_nonzeros"):
+            if name in data:
+                data[name] = int(data[name])
+        if "cache_hit" in data:
+            data["cache_hit"] = bool(data["cache_hit"])
+
+        return cls(**data)
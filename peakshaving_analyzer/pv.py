@@ -0,0 +1,208 @@
+import importlib.util
+import logging
+import os
+import tempfile
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from functools import lru_cache
+from io import BytesIO
+from pathlib import Path
+
+import pandas as pd
+
+from peakshaving_analyzer.cache import default_cache_dir
+
+log = logging.getLogger(__name__)
+
+# seconds to wait for a provider to respond
+REQUEST_TIMEOUT = 60
+
+
+@dataclass(frozen=True)
+class PVLocation:
+    """Location to get the PV generation for.
+
+    Either a postal code or coordinates. Without both, the national average of
+    Germany is used.
+    """
+
+    postal_code: str | None = None
+    latitude: float | None = None
+    longitude: float | None = None
+
+    @property
+    def is_national(self) -> bool:
+        return self.postal_code is None and (self.latitude is None or self.longitude is None)
+
+    @property
+    def key(self) -> str:
+        if self.postal_code is not None:
+            return f"plz{self.postal_code}"
+        if self.is_national:
+            return "de"
+        return f"lat{self.latitude:.4f}_lon{self.longitude:.4f}"
+
+    def coordinates(self) -> tuple[float, float]:
+        if self.latitude is not None and self.longitude is not None:
+            return self.latitude, self.longitude
+
+        return postal_code_to_coordinates(self.postal_code)
+
+
+class PVProvider(ABC):
+    """Source of hourly PV generation per kWp for a location and year."""
+
+    name = "provider"
+
+    @abstractmethod
+    def fetch(self, location: PVLocation, year: int) -> pd.Series:
+        """Hourly generation per kWp of the location in the year, named "consumption_site"."""
+
+
+class BrightSkyProvider(PVProvider):
+    """Solar irradiation of the weather station next to the location from BrightSky."""
+
+    name = "brightsky"
+
+    def fetch(self, location: PVLocation, year: int) -> pd.Series:
+        import requests
+
+        log.info("Fetching pv timeseries from BrightSky API.")
+        lat, lon = location.coordinates()
+
+        url = f"https://api.brightsky.dev/weather?lat={lat}&lon={lon}&country=DE"
+        url += f"&date={year}-01-01T00:00:00&last_date={year}-12-31T23:45:00"
+        url += "&timezone=auto&format=json"
+        log.info(f"Making API call to: {url}")
+        weather_data = requests.get(url, timeout=REQUEST_TIMEOUT).json()
+
+        # convert from kWh/m2 to kW
+        # kWh/m2/h = kW/m2 = 1000W/m2
+        # no conversion necessary, as pv modules are tested with 1000W/m2
+        s = pd.DataFrame(weather_data["weather"])["solar"].astype(float)
+        log.info("PV timeseries data fetched successfully.")
+
+        return s.rename("consumption_site")
+
+
+class RenewablesNinjaProvider(PVProvider):
+    """National PV generation of Germany from renewables.ninja (MERRA-2)."""
+
+    name = "ninja"
+
+    def fetch(self, location: PVLocation, year: int) -> pd.Series:
+        import requests
+
+        log.info("Fetching national pv timeseries from renewables.ninja.")
+        url = "https://www.renewables.ninja/country_downloads/DE/ninja-pv-country-DE-national-merra2.csv"
+        response = requests.get(url, timeout=REQUEST_TIMEOUT)
+        df = pd.read_csv(BytesIO(response.content), delimiter=",", header=3, usecols=["time", "NATIONAL"])
+
+        df["time"] = pd.to_datetime(df["time"])
+        s = df.loc[df["time"].dt.year == year, "NATIONAL"].reset_index(drop=True).fillna(0)
+
+        return s.rename("consumption_site")
+
+
+class PVCache:
+    """On-disk store of PV generation timeseries in Parquet files.
+
+    Entries are keyed by provider, location and year, e.g.
+    `brightsky_plz52066_2023.parquet`. The hourly generation of the providers
+    is stored as fetched and resampled to the timestep of a config after
+    loading it. In offline mode, only stored entries are used, so the
+    directory can be pre-seeded with `put` for environments without internet
+    access.
+    """
+
+    def __init__(self, directory: str | Path | None = None, offline: bool = False) -> None:
+        self.directory = Path(directory) if directory else default_cache_dir("pv")
+        self.offline = offline
+
+    def get(self, provider: str, location: PVLocation, year: int) -> pd.Series | None:
+        path = self._path(provider, location, year)
+        if not path.exists() or not _has_pyarrow():
+            return None
+
+        return pd.read_parquet(path)["consumption_site"]
+
+    def put(self, provider: str, location: PVLocation, year: int, s: pd.Series) -> None:
+        if not _has_pyarrow():
+            log.warning("Caching PV generation needs pyarrow, install peakshaving-analyzer[parquet].")
+            return
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        # write to a temporary file first, so concurrent readers never see partial entries
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            pd.DataFrame({"consumption_site": s.to_numpy()}).to_parquet(f)
+        os.replace(tmp_path, self._path(provider, location, year))
+
+    def _path(self, provider: str, location: PVLocation, year: int) -> Path:
+        return self.directory / f"{provider}_{location.key}_{year}.parquet"
+
+
+def get_pv_generation(
+    location: PVLocation,
+    year: int,
+    provider: PVProvider | None = None,
+    cache: PVCache | None = None,
+) -> pd.Series:
+    """Returns hourly PV generation per kWp, from the cache if available.
+
+    Args:
+        location (PVLocation): The location.
+        year (int): The year.
+        provider (PVProvider | None): Source of the data. Defaults to BrightSky for
+            local and renewables.ninja for national generation.
+        cache (PVCache | None): Cache to look up and store the timeseries in.
+
+    Returns:
+        pd.Series: The hourly generation.
+    """
+
+    if provider is None:
+        provider = RenewablesNinjaProvider() if location.is_national else BrightSkyProvider()
+
+    if cache is not None:
+        s = cache.get(provider.name, location, year)
+        if s is not None:
+            log.info(f"Loaded PV generation for {location.key} in {year} from cache.")
+            return s
+
+        if cache.offline:
+            raise FileNotFoundError(
+                f"No cached PV generation of {provider.name} for {location.key} in {year} in {cache.directory}."
+            )
+
+    s = provider.fetch(location, year)
+
+    if cache is not None:
+        cache.put(provider.name, location, year, s)
+
+    return s
+
+
+@lru_cache(maxsize=1)
+def _has_pyarrow() -> bool:
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+@lru_cache(maxsize=1)
+def _nominatim():
+    # pgeocode loads pandas' IO machinery and its postal code database on import
+    import pgeocode
+
+    return pgeocode.Nominatim("de")
+
+
+@lru_cache(maxsize=4096)
+def postal_code_to_coordinates(postal_code: str | int) -> tuple[float, float]:
+    """Converts a German postal code to latitude and longitude."""
+
+    q = _nominatim().query_postal_code(str(postal_code))
+    lat, lon = float(q["latitude"]), float(q["longitude"])
+    log.info(f"Coordinates for postal code {postal_code}: Latitude={lat}, Longitude={lon}")
+
+    return lat, lon
@@ -0,0 +1,141 @@
+import logging
+
+import numpy as np
+import pandas as pd
+
+log = logging.getLogger(__name__)
+
+METHODS = ("mean", "ffill", "linear")
+
+
+def resample(
+    values: np.ndarray | pd.Series,
+    hours_per_timestep: float,
+    target_hours_per_timestep: float,
+    n_timesteps: int | None = None,
+    method: str = "mean",
+    timestamps: pd.DatetimeIndex | pd.Series | None = None,
+) -> np.ndarray:
+    """Resamples a timeseries of average values per timestep to another resolution.
+
+    "mean" averages the values over every target timestep, weighted by the
+    overlap with the source timesteps. This conserves the energy of power
+    timeseries and works for up- and downsampling with any ratio of the
+    resolutions; upsampling repeats the values like "ffill". "linear"
+    interpolates between the values at the start of the source timesteps.
+
+    If timestamps are given, they define the start of the source timesteps. As
+    they are converted to UTC, days with clock changes are resampled correctly.
+
+    Args:
+        values (np.ndarray | pd.Series): The values.
+        hours_per_timestep (float): Resolution of the values. Only used if no
+            timestamps are given and for the length of the last timestep.
+        target_hours_per_timestep (float): The resolution to resample to.
+        n_timesteps (int | None): Length of the result. Timesteps after the end of
+            the source timeseries repeat its last value. Defaults to the length
+            covering the source timeseries.
+        method (str): One of "mean", "ffill" and "linear".
+        timestamps (pd.DatetimeIndex | pd.Series | None): Start of every source timestep.
+
+    Returns:
+        np.ndarray: The resampled values.
+    """
+
+    if method not in METHODS:
+        raise ValueError(f"Unknown resampling method '{method}'. Choose one of {METHODS}.")
+
+    values = np.asarray(values, dtype=float)
+    starts = _start_hours(len(values), hours_per_timestep, timestamps)
+    end = starts[-1] + hours_per_timestep
+
+    if n_timesteps is None:
+        n_timesteps = int(round(end / target_hours_per_timestep))
+
+    if len(values) == n_timesteps and np.isclose(hours_per_timestep, target_hours_per_timestep) and timestamps is None:
+        return values.copy()
+
+    target_starts = np.arange(n_timesteps) * target_hours_per_timestep
+
+    if method == "linear":
+        return np.interp(target_starts, starts, values)
+
+    if method == "ffill":
+        index = np.searchsorted(starts, target_starts, side="right") - 1
+        return values[np.clip(index, 0, len(values) - 1)]
+
+    # cumulative integral at the source boundaries, extended with the last value
+    # beyond the end of the source timeseries
+    boundaries = np.append(starts, end)
+    integral = np.zeros(len(boundaries))
+    np.cumsum(values * np.diff(boundaries), out=integral[1:])
+
+    target_boundaries = np.arange(n_timesteps + 1) * target_hours_per_timestep
+    target_integral = np.interp(target_boundaries, boundaries, integral)
+    beyond = target_boundaries > end
+    target_integral[beyond] = integral[-1] + (target_boundaries[beyond] - end) * values[-1]
+
+    return np.diff(target_integral) / target_hours_per_timestep
+
+
+def resample_to_length(
+    values: np.ndarray | pd.Series, n_timesteps: int, hours_per_timestep: float, method: str = "mean"
+) -> np.ndarray:
+    """Resamples a timeseries covering the same period as `n_timesteps` timesteps.
+
+    The resolution of the values is derived from their length, e.g. 8760 hourly
+    values resampled to 35040 quarter hours. This is only done if one length is
+    an integer multiple of the other, any other mismatch (e.g. a few missing
+    rows or hourly values of a year without leap day) would stretch the values
+    over the period instead of changing their resolution.
+
+    Args:
+        values (np.ndarray | pd.Series): The values.
+        n_timesteps (int): Number of timesteps to resample to.
+        hours_per_timestep (float): Resolution of the result.
+        method (str): One of "mean", "ffill" and "linear".
+
+    Returns:
+        np.ndarray: The resampled values.
+
+    Raises:
+        ValueError: If the lengths are no integer multiple of each other.
+    """
+
+    if len(values) == n_timesteps:
+        return np.asarray(values, dtype=float)
+
+    if len(values) == 0 or (n_timesteps % len(values) and len(values) % n_timesteps):
+        msg = f"Can't resample {len(values)} values to {n_timesteps} timesteps, the lengths need to be "
+        msg += "an integer multiple of each other. Check the timeseries for missing or additional rows."
+        raise ValueError(msg)
+
+    source_hours = n_timesteps * hours_per_timestep / len(values)
+    log.info(f"Resampling timeseries from {source_hours:g}h to {hours_per_timestep:g}h timesteps.")
+
+    return resample(values, source_hours, hours_per_timestep, n_timesteps=n_timesteps, method=method)
+
+
+def infer_hours_per_timestep(timestamps: pd.DatetimeIndex | pd.Series) -> float:
+    """Infers the resolution of timestamps from their most common difference."""
+
+    starts = _start_hours(len(timestamps), None, timestamps)
+    differences = np.round(np.diff(starts), 6)
+    values, counts = np.unique(differences, return_counts=True)
+
+    return float(values[np.argmax(counts)])
+
+
+def _start_hours(n_timesteps: int, hours_per_timestep: float | None, timestamps) -> np.ndarray:
+    """Hours from the first timestep to the start of every timestep."""
+
+    if timestamps is None:
+        return np.arange(n_timesteps) * hours_per_timestep
+
+    timestamps = pd.DatetimeIndex(timestamps)
+    if timestamps.tz is not None:
+        timestamps = timestamps.tz_convert("UTC")
+
+    nanoseconds = timestamps.asi8
+
+    return (nanoseconds - nanoseconds[0]) / 3.6e12
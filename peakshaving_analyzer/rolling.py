@@ -0,0 +1,116 @@
+import logging
+from dataclasses import replace
+
+import numpy as np
+import pandas as pd
+
+from peakshaving_analyzer.config import Config
+from peakshaving_analyzer.native import CAPACITIES, PeakShavingLP, create_native_results
+from peakshaving_analyzer.output import Results
+from peakshaving_analyzer.profiling import SolverProfile
+
+log = logging.getLogger(__name__)
+
+# operation variables stitched together from the windows
+OPERATIONS = ("grid", "charge", "discharge", "soc", "existing_pv", "new_pv")
+
+
+def optimize_rolling(config: Config, profile: SolverProfile | None = None) -> Results:
+    """Optimizes the system in consecutive windows (rolling horizon).
+
+    Every window is optimized together with the following overlap, but only
+    the operation within the window is kept. The state of charge at the end of
+    a window is the start of the next one. Grid peak and system sizes of
+    earlier windows are lower bounds in the following ones, so the final sizes
+    fit the whole period. Only one window is held in memory at a time.
+
+    Args:
+        config (Config): The configuration with `rolling_window_hours` and
+            `rolling_overlap_hours` set.
+        profile (SolverProfile | None): Profile to add the timings of all windows and the
+            size of the largest one to.
+
+    Returns:
+        Results: Results for the whole period.
+    """
+
+    n = config.n_timesteps
+    h = config.hours_per_timestep
+
+    window = int(round(config.rolling_window_hours / h))
+    overlap = int(round((config.rolling_overlap_hours or 0) / h))
+    if window < 1:
+        raise ValueError("Rolling window must be at least one timestep long.")
+    if overlap < 0:
+        raise ValueError("Rolling overlap must not be negative.")
+
+    stitched = {}
+    soc = 0.0
+    min_capacities = {}
+
+    if profile is None:
+        profile = SolverProfile(engine="native")
+
+    start = 0
+    while start < n:
+        stop = min(start + window + overlap, n)
+        # the last window keeps everything up to the end of the period
+        commit = stop - start if stop == n else window
+
+        log.info(f"Optimizing timesteps {start} to {stop} of {n}.")
+        lp = PeakShavingLP(
+            _slice_config(config, start, stop),
+            initial_soc_kwh=soc,
+            final_soc_kwh=0.0 if stop == n else None,
+            min_capacities=min_capacities,
+            profile=profile,
+        )
+        lp.run()
+
+        with profile.measure("extract"):
+            values = lp.solution()
+            for name in OPERATIONS:
+                if name in values:
+                    stitched.setdefault(name, np.zeros(n))[start : start + commit] = values[name][:commit]
+
+            if "soc" in values:
+                soc = values["soc"][commit]
+            min_capacities = {name: values[name] for name in CAPACITIES if name in values}
+
+        start += commit
+
+    with profile.measure("extract"):
+        return create_native_results(
+            config=config,
+            grid=stitched["grid"],
+            charge=stitched.get("charge"),
+            discharge=stitched.get("discharge"),
+            soc=stitched.get("soc"),
+            existing_pv=stitched.get("existing_pv"),
+            new_pv=stitched.get("new_pv"),
+            grid_capacity_kw=min_capacities["grid_capacity"],
+            storage_capacity_kwh=min_capacities.get("storage_capacity", 0.0),
+            inverter_capacity_kw=min_capacities.get("inverter_capacity", 0.0),
+            new_pv_capacity_kwp=min_capacities.get("new_pv_capacity", 0.0),
+        )
+
+
+def _slice_config(config: Config, start: int, stop: int) -> Config:
+    """Returns a copy of the config restricted to the timesteps from start to stop."""
+
+    def cut(ts):
+        if ts is None:
+            return None
+        if isinstance(ts, (pd.Series | pd.DataFrame)):
+            return ts.iloc[start:stop].reset_index(drop=True)
+        return ts[start:stop]
+
+    return replace(
+        config,
+        consumption_timeseries=cut(config.consumption_timeseries),
+        price_timeseries=cut(config.price_timeseries),
+        existing_pv_generation_timeseries=cut(config.existing_pv_generation_timeseries),
+        new_pv_generation_timeseries=cut(config.new_pv_generation_timeseries),
+        timestamps=cut(config.timestamps),
+        n_timesteps=stop - start,
+    )
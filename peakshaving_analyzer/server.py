@@ -0,0 +1,345 @@
+import asyncio
+import email.parser
+import email.policy
+import json
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pandas as pd
+import yaml
+
+from peakshaving_analyzer.batch import _format_error
+from peakshaving_analyzer.cache import ResultCache
+from peakshaving_analyzer.jobs import DONE, QUEUED, RUNNING, JobQueue, run_job
+
+log = logging.getLogger(__name__)
+
+# largest accepted request body, uploaded timeseries included
+MAX_BODY_BYTES = 512 * 1024 * 1024
+
+# seconds between looking for jobs submitted by other processes
+POLL_SECONDS = 5
+
+REASONS = {
+    200: "OK",
+    202: "Accepted",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    409: "Conflict",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+}
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+class JobServer:
+    """HTTP API queueing optimizations onto a pool of worker processes.
+
+    Endpoints:
+        POST /jobs: Submits a job, either as JSON `{"config": {...}, "files": {name: text}}`
+            or as multipart form data with a `config` part (YAML or JSON) and one
+            part per timeseries file. File paths in the config refer to the file names.
+            Returns the job with status 202, or the identical job already in flight.
+        GET /jobs: Lists all jobs, optionally filtered with `?status=`.
+        GET /jobs/<id>: Status, stage and progress of a job.
+        GET /jobs/<id>/results: Scalar results and solver profile of a finished job.
+        GET /jobs/<id>/timeseries: Timeseries of a finished job as CSV.
+        DELETE /jobs/<id>: Removes a job that isn't running.
+        GET /health: Number of queued and running jobs.
+
+    Optimizations run in worker processes, so the event loop keeps answering
+    requests while solving. Queued jobs are started in the order of submission
+    whenever a worker is free.
+    """
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        n_workers: int | None = None,
+        solver: str | None = None,
+        cache: ResultCache | None = None,
+    ) -> None:
+        """
+        Args:
+            queue (JobQueue): The job queue.
+            n_workers (int | None): Number of worker processes, defaults to the number of CPUs.
+            solver (str | None): Solver overriding the solver of each config.
+            cache (ResultCache | None): Cache to look up and store the results in.
+        """
+
+        self.queue = queue
+        self.n_workers = n_workers or os.cpu_count() or 1
+        self.solver = solver
+        self.cache = cache
+
+        self._executor = None
+        self._wakeup = None
+        self._slots = None
+        self._tasks = set()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8080) -> asyncio.Server:
+        """Starts the workers and the HTTP server, returns the server."""
+
+        # spawned workers don't inherit the threads of the event loop
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.n_workers, mp_context=multiprocessing.get_context("spawn")
+        )
+        self._wakeup = asyncio.Event()
+        self._slots = asyncio.Semaphore(self.n_workers)
+
+        await asyncio.to_thread(self.queue.requeue_running)
+        self._spawn(self._dispatch())
+
+        server = await asyncio.start_server(self._handle, host, port, limit=2**16)
+        log.info(f"Serving on {', '.join(str(s.getsockname()) for s in server.sockets)}.")
+
+        return server
+
+    async def stop(self) -> None:
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _dispatch(self) -> None:
+        """Starts queued jobs in the order of submission while workers are free."""
+
+        while True:
+            await self._slots.acquire()
+
+            while True:
+                # cleared before looking, so a submission in between isn't missed
+                self._wakeup.clear()
+                job = await asyncio.to_thread(self.queue.next)
+                if job is not None:
+                    break
+                try:
+                    # jobs may also be submitted by other processes sharing the queue
+                    await asyncio.wait_for(self._wakeup.wait(), POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+
+            self._spawn(self._run(job.id))
+
+    async def _run(self, job_id: str) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(self._executor, run_job, self.queue.directory, job_id, self.solver, self.cache)
+            error = None
+        except Exception as e:
+            error = _format_error(e)
+            log.warning(f"Job {job_id} failed: {error}")
+
+        try:
+            await asyncio.to_thread(self.queue.finish, job_id, error)
+        finally:
+            self._slots.release()
+
+    def _spawn(self, coroutine) -> None:
+        task = asyncio.ensure_future(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            status, body, content_type = await self._respond(reader)
+        except HTTPError as e:
+            status, body, content_type = e.status, _json({"error": str(e)}), "application/json"
+        except Exception as e:
+            log.exception("Request failed.")
+            status, body, content_type = 500, _json({"error": _format_error(e)}), "application/json"
+
+        head = f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+        head += f"Content-Type: {content_type}\r\nContent-Length: {len(body)}\r\nConnection: close\r\n\r\n"
+        try:
+            writer.write(head.encode() + body)
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def _respond(self, reader: asyncio.StreamReader) -> tuple[int, bytes, str]:
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError) as e:
+            raise HTTPError(400, "Malformed request.") from e
+
+        request_line, *header_lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, target, _ = request_line.split(" ", 2)
+        except ValueError as e:
+            raise HTTPError(400, "Malformed request line.") from e
+        headers = {}
+        for line in header_lines:
+            if ":" in line:
+                name, value = line.split(":", 1)
+                headers[name.strip().lower()] = value.strip()
+
+        length = int(headers.get("content-length") or 0)
+        if length > MAX_BODY_BYTES:
+            raise HTTPError(413, f"Request body exceeds {MAX_BODY_BYTES} bytes.")
+        body = await reader.readexactly(length) if length else b""
+
+        url = urlsplit(target)
+        parts = [part for part in url.path.split("/") if part]
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+
+        if parts == ["health"] and method == "GET":
+            jobs = await asyncio.to_thread(self.queue.list)
+            counts = {status: sum(job.status == status for job in jobs) for status in (QUEUED, RUNNING)}
+            return _ok({"status": "ok", "workers": self.n_workers, **counts})
+
+        if parts == ["jobs"]:
+            if method == "POST":
+                return await self._submit(headers.get("content-type", ""), body)
+            if method == "GET":
+                jobs = await asyncio.to_thread(self.queue.list, query.get("status"))
+                return _ok([job.to_dict() for job in jobs])
+            raise HTTPError(405, f"{method} not allowed on /jobs.")
+
+        if len(parts) in (2, 3) and parts[0] == "jobs":
+            job = await asyncio.to_thread(self.queue.get, parts[1])
+            if job is None:
+                raise HTTPError(404, f"No job with id {parts[1]}.")
+
+            if len(parts) == 2 and method == "GET":
+                return _ok(job.to_dict())
+            if len(parts) == 2 and method == "DELETE":
+                if job.status == RUNNING:
+                    raise HTTPError(409, "Running jobs can't be removed.")
+                await asyncio.to_thread(self.queue.remove, job.id)
+                return _ok(job.to_dict())
+            if len(parts) == 3 and method == "GET" and parts[2] in ("results", "timeseries"):
+                if job.status != DONE:
+                    raise HTTPError(409, f"Job is {job.status}, results are available once it is done.")
+                results = await asyncio.to_thread(self.queue.results, job.id)
+                if results is None:
+                    raise HTTPError(404, f"Results of job {job.id} are missing or unreadable, submit it again.")
+                if parts[2] == "results":
+                    return _ok(results.to_dict(include_timeseries=False))
+                csv = await asyncio.to_thread(lambda: results.timeseries_to_df().to_csv(index=False))
+                return 200, csv.encode(), "text/csv"
+
+        raise HTTPError(404, f"No route for {method} {url.path}.")
+
+    async def _submit(self, content_type: str, body: bytes) -> tuple[int, bytes, str]:
+        config, files = _parse_payload(content_type, body)
+        if not isinstance(config, dict):
+            raise HTTPError(400, "The config must be a mapping of parameters.")
+
+        try:
+            job, existing = await asyncio.to_thread(self.queue.submit, config, files)
+        except ValueError as e:
+            raise HTTPError(400, str(e)) from e
+
+        if not existing:
+            self._wakeup.set()
+
+        return 202, _json(job.to_dict() | {"deduplicated": existing}), "application/json"
+
+
+def serve(
+    host: str = "127.0.0.1",
+    port: int = 8080,
+    directory: str | Path | None = None,
+    n_workers: int | None = None,
+    solver: str | None = None,
+    cache: ResultCache | None = None,
+) -> None:
+    """Runs the job server until interrupted, see `JobServer`.
+
+    Args:
+        host (str): Address to listen on.
+        port (int): Port to listen on.
+        directory (str | Path | None): Directory of the job queue.
+        n_workers (int | None): Number of worker processes, defaults to the number of CPUs.
+        solver (str | None): Solver overriding the solver of each config.
+        cache (ResultCache | None): Cache to look up and store the results in.
+    """
+
+    async def main():
+        job_server = JobServer(JobQueue(directory), n_workers=n_workers, solver=solver, cache=cache)
+        server = await job_server.start(host, port)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            await job_server.stop()
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        log.info("Server stopped.")
+
+
+def _parse_payload(content_type: str, body: bytes) -> tuple[dict, dict[str, bytes]]:
+    """Reads the config and the uploaded files of a submitted job."""
+
+    if content_type.startswith("multipart/form-data"):
+        message = email.parser.BytesParser(policy=email.policy.HTTP).parsebytes(
+            f"Content-Type: {content_type}\r\n\r\n".encode() + body
+        )
+        if not message.is_multipart():
+            raise HTTPError(400, "Malformed multipart body.")
+
+        config = None
+        files = {}
+        for part in message.iter_parts():
+            name = part.get_param("name", header="content-disposition")
+            content = part.get_payload(decode=True) or b""
+            if name == "config":
+                config = _load_config(content)
+            else:
+                files[part.get_filename() or name] = content
+
+        if config is None:
+            raise HTTPError(400, "Missing config part.")
+
+        return config, files
+
+    try:
+        payload = json.loads(body)
+    except ValueError as e:
+        raise HTTPError(400, f"Invalid JSON: {e}") from e
+    if not isinstance(payload, dict) or "config" not in payload:
+        raise HTTPError(400, 'Expected a JSON object with "config" and optional "files".')
+
+    files = {name: content.encode() for name, content in (payload.get("files") or {}).items()}
+
+    return payload["config"], files
+
+
+def _load_config(content: bytes) -> dict:
+    try:
+        return yaml.safe_load(content)
+    except yaml.YAMLError as e:
+        raise HTTPError(400, f"Invalid config: {e}") from e
+
+
+def _ok(data) -> tuple[int, bytes, str]:
+    return 200, _json(data), "application/json"
+
+
+def _json(data) -> bytes:
+    return json.dumps(data, default=_json_default).encode()
+
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat()
+
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
@@ -0,0 +1,273 @@
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from collections.abc import Hashable
+from dataclasses import dataclass, replace
+from multiprocessing import resource_tracker, shared_memory
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from peakshaving_analyzer.config import Config
+
+log = logging.getLogger(__name__)
+
+# config fields that can reference shared timeseries
+TIMESERIES_FIELDS = (
+    "consumption_timeseries",
+    "price_timeseries",
+    "existing_pv_generation_timeseries",
+    "new_pv_generation_timeseries",
+    "timestamps",
+)
+
+# shared memory segments attached in this process, kept open while their values are in use
+_attached: dict[str, shared_memory.SharedMemory] = {}
+_attach_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class SharedArray:
+    """Reference to an array held in shared memory or in a `.npy` file."""
+
+    # name of the shared memory segment or path to the .npy file
+    location: str
+    shape: tuple[int, ...]
+    dtype: str
+    file: bool = False
+
+    def array(self) -> np.ndarray:
+        """Read-only view of the values, without copying them."""
+
+        if self.file:
+            return np.asarray(np.load(self.location, mmap_mode="r"))
+
+        if self.location not in _attached:
+            _attached[self.location] = _attach(self.location)
+        array = np.ndarray(self.shape, dtype=self.dtype, buffer=_attached[self.location].buf)
+        array.flags.writeable = False
+
+        return array
+
+
+@dataclass(frozen=True)
+class SharedTimeseries:
+    """Picklable reference to a series, frame or datetime index whose values are shared.
+
+    Pickling the reference only copies the column names and locations of the
+    values, `load` builds the pandas object on top of the shared values.
+    """
+
+    # "series", "frame" or "index"
+    kind: str
+    names: tuple[Hashable, ...]
+    columns: tuple[SharedArray, ...]
+    index: pd.RangeIndex | SharedArray | None = None
+    # timezone of datetime values, stored as UTC
+    tz: str | None = None
+
+    def load(self) -> pd.Series | pd.DataFrame | pd.DatetimeIndex:
+        columns = [_from_utc(c.array(), self.tz) for c in self.columns]
+        index = self.index.array() if isinstance(self.index, SharedArray) else self.index
+
+        if self.kind == "index":
+            return pd.DatetimeIndex(columns[0], name=self.names[0], copy=False)
+        if self.kind == "series":
+            return pd.Series(columns[0], index=index, name=self.names[0], copy=False)
+
+        return pd.DataFrame(dict(zip(self.names, columns, strict=True)), index=index, copy=False)
+
+
+class SharedTimeseriesStore:
+    """Holds the timeseries of many configs once per distinct content.
+
+    The values are written to shared memory, or to `.npy` files if a directory is
+    given, and the configs reference them instead of carrying copies. Worker
+    processes attach to the values without copying, so identical price or PV
+    timeseries of hundreds of sites are stored and sent to the workers once.
+    Shared memory segments are removed on `close`, `.npy` files are kept and
+    reused by later stores using the same directory.
+    """
+
+    def __init__(self, directory: str | Path | None = None) -> None:
+        self.directory = Path(directory) if directory else None
+        self._arrays: dict[str, SharedArray] = {}
+        self._segments: list[shared_memory.SharedMemory] = []
+
+    def __enter__(self) -> "SharedTimeseriesStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the stored values in bytes."""
+        return sum(int(np.prod(a.shape)) * np.dtype(a.dtype).itemsize for a in self._arrays.values())
+
+    def share(self, config: Config) -> Config:
+        """Copy of the config referencing shared timeseries instead of holding them.
+
+        Args:
+            config (Config): The config, left unchanged.
+
+        Returns:
+            Config: The config with its timeseries replaced by `SharedTimeseries`.
+        """
+
+        changes = {}
+        for field in TIMESERIES_FIELDS:
+            value = getattr(config, field)
+            if isinstance(value, pd.Series | pd.DataFrame | pd.DatetimeIndex):
+                changes[field] = self.share_timeseries(value)
+
+        return replace(config, **changes)
+
+    def share_timeseries(
+        self, timeseries: pd.Series | pd.DataFrame | pd.DatetimeIndex
+    ) -> SharedTimeseries | pd.Series | pd.DataFrame | pd.DatetimeIndex:
+        """Shares the values of a timeseries, returned unchanged if they can't be shared (e.g. strings)."""
+
+        if isinstance(timeseries, pd.DatetimeIndex):
+            kind, names, columns = "index", (timeseries.name,), [timeseries]
+        elif isinstance(timeseries, pd.Series):
+            kind, names, columns = "series", (timeseries.name,), [timeseries]
+        else:
+            kind, names, columns = "frame", tuple(timeseries.columns), [timeseries[c] for c in timeseries.columns]
+
+        # numeric or datetime values, datetimes with one timezone for all columns
+        tz = getattr(columns[0].dtype, "tz", None) if columns else None
+        if not all(_shareable(c.dtype) and getattr(c.dtype, "tz", None) == tz for c in columns):
+            log.debug(f"Can't share timeseries with dtypes {[str(c.dtype) for c in columns]}, keeping a copy.")
+            return timeseries
+
+        index = None
+        if kind != "index":
+            index = timeseries.index
+            if not isinstance(index, pd.RangeIndex):
+                if not isinstance(index.dtype, np.dtype) or index.dtype.hasobject:
+                    log.debug(f"Can't share timeseries with a {index.dtype} index, keeping a copy.")
+                    return timeseries
+                index = self._share_array(index.to_numpy())
+
+        return SharedTimeseries(
+            kind=kind,
+            names=names,
+            columns=tuple(self._share_array(_to_utc(c)) for c in columns),
+            index=index,
+            tz=str(tz) if tz is not None else None,
+        )
+
+    def close(self) -> None:
+        """Removes the shared memory segments. Configs referencing them can't be loaded afterwards."""
+
+        for segment in self._segments:
+            segment.close()
+            try:
+                segment.unlink()
+            except FileNotFoundError:
+                log.warning(f"Shared memory segment {segment.name} was already removed.")
+        self._segments.clear()
+        self._arrays.clear()
+
+    def _share_array(self, values: np.ndarray) -> SharedArray:
+        values = np.ascontiguousarray(values)
+        key = _digest(values)
+        if key in self._arrays:
+            return self._arrays[key]
+
+        if self.directory is None:
+            # shared memory can't be empty
+            segment = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+            np.ndarray(values.shape, dtype=values.dtype, buffer=segment.buf)[...] = values
+            self._segments.append(segment)
+            shared = SharedArray(segment.name, values.shape, values.dtype.str)
+        else:
+            path = self.directory / f"{key}.npy"
+            if not path.exists():
+                self.directory.mkdir(parents=True, exist_ok=True)
+                # write to a temporary file first, so concurrent stores never read partial files
+                fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+                with os.fdopen(fd, "wb") as f:
+                    np.save(f, values)
+                os.replace(tmp_path, path)
+            shared = SharedArray(str(path), values.shape, values.dtype.str, file=True)
+
+        self._arrays[key] = shared
+
+        return shared
+
+
+def attach_timeseries(config: Config) -> Config:
+    """Config with its shared timeseries loaded as read-only pandas objects on the shared values.
+
+    Args:
+        config (Config): Config possibly referencing shared timeseries.
+
+    Returns:
+        Config: The config itself if it doesn't reference shared timeseries, otherwise a copy.
+    """
+
+    changes = {}
+    for field in TIMESERIES_FIELDS:
+        value = getattr(config, field)
+        if isinstance(value, SharedTimeseries):
+            changes[field] = value.load()
+
+    return replace(config, **changes) if changes else config
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """Attaches to a segment without registering it with the resource tracker of this process.
+
+    The tracker unlinks registered segments when the process exits, which would
+    remove the values of the store for all other processes.
+    """
+
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13 always registers the segment
+        pass
+
+    with _attach_lock:
+        register = resource_tracker.register
+        resource_tracker.register = lambda name, rtype: None
+        try:
+            return shared_memory.SharedMemory(name=name)
+        finally:
+            resource_tracker.register = register
+
+
+def _digest(values: np.ndarray) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"{values.dtype.str}{values.shape}".encode())
+    h.update(values.tobytes())
+
+    return h.hexdigest()
+
+
+def _shareable(dtype) -> bool:
+    if isinstance(dtype, pd.DatetimeTZDtype):
+        return True
+
+    return isinstance(dtype, np.dtype) and not dtype.hasobject
+
+
+def _to_utc(values: pd.Series | pd.DatetimeIndex) -> np.ndarray:
+    if getattr(values.dtype, "tz", None) is not None:
+        values = (
+            values.tz_convert("UTC").tz_localize(None) if isinstance(values, pd.Index) else values.dt.tz_convert(None)
+        )
+
+    return np.asarray(values)
+
+
+def _from_utc(values: np.ndarray, tz: str | None):
+    if tz is None:
+        return values
+
+    return pd.DatetimeIndex(values, copy=False).tz_localize("UTC").tz_convert(tz)
@@ -0,0 +1,210 @@
+import json
+import logging
+from collections.abc import Iterable
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from peakshaving_analyzer.output import TIMESERIES_FIELDS, Results
+from peakshaving_analyzer.profiling import SolverProfile
+
+log = logging.getLogger(__name__)
+
+META_FILE = "meta.json"
+SUMMARY_FILE = "summary.csv"
+
+# profiles read at once when reducing a whole variable
+BLOCK_SIZE = 256
+
+
+class ResultStore:
+    """On-disk store of the results of many profiles.
+
+    Every timeseries variable is stored as one binary file holding a
+    profiles x timesteps array, which is memory mapped when reading. Scalar
+    results are stored as one row per profile in `summary.csv`. Only the
+    selected profiles and timesteps are loaded into memory, so thousands of
+    results can be compared without holding them all.
+
+    All profiles need the same number of timesteps. The store supports one
+    writing process at a time.
+    """
+
+    def __init__(self, directory: str | Path, dtype: str = "float64") -> None:
+        """
+        Args:
+            directory (str | Path): Directory of the store, created on the first append.
+            dtype (str): Data type of new stores, e.g. "float32" to halve their size.
+                Existing stores keep the type they were created with.
+        """
+
+        self.directory = Path(directory)
+        self.dtype = np.dtype(dtype)
+        self.n_timesteps = None
+        self._summary = None
+
+        meta_path = self.directory / META_FILE
+        if meta_path.exists():
+            meta = json.loads(meta_path.read_text())
+            self.dtype = np.dtype(meta["dtype"])
+            self.n_timesteps = meta["n_timesteps"]
+
+        self._n_profiles = len(self.summary)
+
+    def __len__(self) -> int:
+        return self._n_profiles
+
+    @property
+    def summary(self) -> pd.DataFrame:
+        """Scalar results with one row per profile, in the order of appending."""
+
+        if self._summary is None:
+            path = self.directory / SUMMARY_FILE
+            self._summary = pd.read_csv(path) if path.exists() else pd.DataFrame()
+
+        return self._summary
+
+    def append(self, results: Results) -> int:
+        """Appends the results of a profile.
+
+        Args:
+            results (Results): The results.
+
+        Returns:
+            int: Index of the profile in the store.
+        """
+
+        values = self._timeseries_values(results)
+        if self.n_timesteps is None:
+            self.n_timesteps = values.shape[1]
+            self._write_meta()
+
+        # arrays are written first, rows beyond the summary of an interrupted append are overwritten
+        offset = self._n_profiles * self.n_timesteps * self.dtype.itemsize
+        for variable, row in zip(TIMESERIES_FIELDS, values, strict=True):
+            with open(self._path(variable), "ab") as f:
+                f.truncate(offset)
+                f.write(row.tobytes())
+
+        summary_path = self.directory / SUMMARY_FILE
+        row = pd.DataFrame([results.to_summary()])
+        if summary_path.exists():
+            # keep the columns of the first profile, e.g. if only some results have a solver profile
+            row = row.reindex(columns=pd.read_csv(summary_path, nrows=0).columns)
+        row.to_csv(summary_path, mode="a", header=not summary_path.exists(), index=False)
+        self._summary = None
+
+        self._n_profiles += 1
+
+        return self._n_profiles - 1
+
+    def extend(self, results: Iterable[Results]) -> None:
+        for r in results:
+            self.append(r)
+
+    def array(self, variable: str) -> np.ndarray:
+        """Read-only memory map of a variable with shape profiles x timesteps."""
+
+        if variable not in TIMESERIES_FIELDS:
+            raise ValueError(f"Unknown variable '{variable}'. Choose one of {TIMESERIES_FIELDS}.")
+
+        if not self._n_profiles:
+            return np.empty((0, self.n_timesteps or 0), dtype=self.dtype)
+
+        return np.memmap(self._path(variable), dtype=self.dtype, mode="r", shape=(self._n_profiles, self.n_timesteps))
+
+    def get(
+        self, variable: str, profiles: int | slice | list[int] | None = None, timesteps: slice | None = None
+    ) -> np.ndarray:
+        """Loads a variable for the selected profiles and timesteps.
+
+        Args:
+            variable (str): One of the timeseries fields of `Results`.
+            profiles (int | slice | list[int] | None): Profiles to load, defaults to all.
+            timesteps (slice | None): Time window to load, defaults to the whole period.
+
+        Returns:
+            np.ndarray: The values, one row per profile (1D for a single profile).
+        """
+
+        array = self.array(variable)
+        if profiles is None:
+            profiles = slice(None)
+        if timesteps is None:
+            timesteps = slice(None)
+
+        return np.array(array[profiles, timesteps])
+
+    def index(self, optimization_id: str) -> int:
+        """Index of the profile with the given optimization id."""
+
+        matches = np.flatnonzero(self.summary["optimization_id"].to_numpy() == optimization_id)
+        if not len(matches):
+            raise KeyError(f"No results with optimization id {optimization_id} in the store.")
+
+        return int(matches[-1])
+
+    def results(self, profile: int) -> Results:
+        """Loads the complete results of one profile."""
+
+        if not -self._n_profiles <= profile < self._n_profiles:
+            raise IndexError(f"Profile {profile} out of range for a store with {self._n_profiles} profiles.")
+
+        row = self.summary.iloc[profile]
+        data = {key: (None if pd.isna(value) else value) for key, value in row.items()}
+        data["profile"] = SolverProfile.from_columns(data)
+        data["optimization_id"] = str(data["optimization_id"])
+        data["name"] = str(data["name"])
+        for variable in TIMESERIES_FIELDS:
+            data[variable] = pd.Series(self.get(variable, profile))
+
+        return Results(**data)
+
+    def reduce(self, variable: str, func=np.max) -> np.ndarray:
+        """Applies a reduction over the timesteps of every profile, e.g. `np.max` for the peaks.
+
+        The profiles are processed in blocks, so memory use doesn't grow with the size of the store.
+        """
+
+        array = self.array(variable)
+
+        return np.concatenate(
+            [func(array[start : start + BLOCK_SIZE], axis=1) for start in range(0, len(array), BLOCK_SIZE)]
+            or [np.empty(0, dtype=self.dtype)]
+        )
+
+    def peak_reduction(self) -> pd.Series:
+        """Reduction of the peak load by the optimized system in kW, per profile."""
+
+        reduction = self.reduce("consumption_kw") - self.reduce("grid_usage_kw")
+
+        return pd.Series(reduction, index=self.summary["name"] if len(self) else None, name="peak_reduction_kw")
+
+    def _timeseries_values(self, results: Results) -> np.ndarray:
+        lengths = {
+            len(getattr(results, variable)) for variable in TIMESERIES_FIELDS if getattr(results, variable) is not None
+        }
+        if len(lengths) != 1:
+            raise ValueError(f"Timeseries of {results.name} need the same length, got lengths {lengths}.")
+        n_timesteps = lengths.pop()
+        if self.n_timesteps is not None and n_timesteps != self.n_timesteps:
+            raise ValueError(
+                f"Results of {results.name} have {n_timesteps} timesteps, the store holds {self.n_timesteps}."
+            )
+
+        values = np.zeros((len(TIMESERIES_FIELDS), n_timesteps), dtype=self.dtype)
+        for row, variable in zip(values, TIMESERIES_FIELDS, strict=True):
+            s = getattr(results, variable)
+            if s is not None:
+                row[:] = np.asarray(s, dtype=self.dtype)
+
+        return values
+
+    def _write_meta(self) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        meta = {"n_timesteps": self.n_timesteps, "dtype": self.dtype.name, "variables": list(TIMESERIES_FIELDS)}
+        (self.directory / META_FILE).write_text(json.dumps(meta, indent=4))
+
+    def _path(self, variable: str) -> Path:
+        return self.directory / f"{variable}.bin"
@@ -9,9 +9,13 @@ def create_default_yaml():
         "allow_additional_pv": False,
         "auto_opt": False,
         "solver": "gurobi",
+        "engine": "fine",
+        "results_dtype": "float64",
         "verbose": True,
         "timestamp_column": None,
         "consumption_file_path": None,
+        "timeseries_dtype": "float64",
+        "csv_chunksize": None,
         "consumption_value_column": None,
         "price_file_path": None,
         "price_value_column": None,
@@ -32,6 +36,9 @@ def create_default_yaml():
         "existing_pv_column": None,
         "existing_pv_size_kwp": None,
         "postal_code": None,
+        "pv_cache": False,
+        "pv_cache_dir": None,
+        "pv_offline": False,
         "pv_system_lifetime": 30,
         "pv_system_cost_per_kwp": 1250,
         "pv_system_kwp_per_m2": 0.4,
@@ -42,6 +49,10 @@ def create_default_yaml():
         "producer_energy_price": 0.1665,
         "grid_capacity_price": 101.22,
         "grid_energy_price": 0.0460,
+        "rolling_window_hours": None,
+        "rolling_overlap_hours": 0,
+        "tsa_typical_periods": None,
+        "tsa_hours_per_period": 24,
     }
     with open("config.yaml", "w") as f:
         yaml.dump(data, f, sort_keys=False, default_flow_style=False)
@@ -11,7 +11,7 @@ import argcomplete
 
 def cli():
     parser = argparse.ArgumentParser(description="Peak Shaving Analyzer CLI")
-    parser.add_argument("-c", "--config", type=str, required=True, help="Path to the configuration YAML file")
+    parser.add_argument("-c", "--config", type=str, help="Path to the configuration YAML file")
     parser.add_argument("-o", "--output", type=str, default="std", help="Path to save results (yaml, json or std)")
     parser.add_argument("--solver", type=str, default="appsi_highs", help="Solver to use (optional)")
     parser.add_argument(
@@ -21,12 +21,48 @@ def cli():
         help="Path to save resulting timeseries to (not saving if not provided)",
     )
     parser.add_argument("-v", "--verbose", help="Whether to print progress or not", action="store_true")
+    parser.add_argument("--profile", help="Print the timings and model size of the optimization", action="store_true")
+    add_cache_arguments(parser)
+
+    subparsers = parser.add_subparsers(dest="command")
+
+    batch_parser = subparsers.add_parser("batch", help="Optimize many configurations in parallel")
+    batch_parser.add_argument("configs", type=str, nargs="+", help="Paths to the configuration YAML files")
+    batch_parser.add_argument(
+        "-j", "--workers", type=int, default=None, help="Number of worker processes (defaults to number of CPUs)"
+    )
+    batch_parser.add_argument("--timeout", type=float, default=None, help="Maximum time per optimization in seconds")
+    batch_parser.add_argument("--solver", type=str, default="appsi_highs", help="Solver to use (optional)")
+    batch_parser.add_argument(
+        "-o", "--output", type=str, default=None, help="Path to save a summary of all results to (csv or json)"
+    )
+    batch_parser.add_argument(
+        "--store", type=str, default=None, help="Directory of a result store to append all timeseries to"
+    )
+    batch_parser.add_argument("-v", "--verbose", help="Whether to print progress or not", action="store_true")
+    add_cache_arguments(batch_parser)
+
+    serve_parser = subparsers.add_parser("serve", help="Run a local HTTP service queueing optimizations")
+    serve_parser.add_argument("--host", type=str, default="127.0.0.1", help="Address to listen on")
+    serve_parser.add_argument("--port", type=int, default=8080, help="Port to listen on")
+    serve_parser.add_argument(
+        "-j", "--workers", type=int, default=None, help="Number of worker processes (defaults to number of CPUs)"
+    )
+    serve_parser.add_argument(
+        "--directory",
+        type=str,
+        default=None,
+        help="Directory of the job queue (defaults to ~/.cache/peakshaving_analyzer/jobs)",
+    )
+    serve_parser.add_argument("--solver", type=str, default="appsi_highs", help="Solver to use (optional)")
+    serve_parser.add_argument("-v", "--verbose", help="Whether to print progress or not", action="store_true")
+    add_cache_arguments(serve_parser)
 
     argcomplete.autocomplete(parser)
     args = parser.parse_args()
 
-    from peakshaving_analyzer.input import load_yaml_config
-    from peakshaving_analyzer.PSA import PeakShavingAnalyzer
+    if args.command is None and args.config is None:
+        parser.error("the following arguments are required: -c/--config")
 
     if args.verbose:
         level = logging.INFO
@@ -34,6 +70,25 @@ def cli():
         level = logging.ERROR
     logging.basicConfig(format="%(asctime)s %(levelname)-8s %(message)s", level=level, datefmt="%Y-%m-%d %H:%M:%S")
 
+    if args.command == "batch":
+        sys.exit(batch(args))
+
+    if args.command == "serve":
+        from peakshaving_analyzer.server import serve
+
+        serve(
+            host=args.host,
+            port=args.port,
+            directory=args.directory,
+            n_workers=args.workers,
+            solver=args.solver,
+            cache=create_cache(args),
+        )
+        return
+
+    from peakshaving_analyzer.input import load_yaml_config
+    from peakshaving_analyzer.PSA import PeakShavingAnalyzer
+
     # Load config
     config_path = Path(args.config)
     if not config_path.exists():
@@ -43,7 +98,7 @@ def cli():
 
     # Run optimization
     psa = PeakShavingAnalyzer(config=config)
-    results = psa.optimize(solver=args.solver)
+    results = psa.optimize(solver=args.solver, cache=create_cache(args))
 
     print("---------------------------------------------------------")
 
@@ -66,6 +121,86 @@ def cli():
         else:
             raise NotImplementedError
 
+    if args.profile:
+        print("---------------------------------------------------------")
+        print(results.profile.report())
+
+
+def add_cache_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--cache", help="Cache results and reuse cached results", action="store_true")
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        default=None,
+        help="Directory to cache results in, enables the cache (defaults to ~/.cache/peakshaving_analyzer/results)",
+    )
+
+
+def create_cache(args):
+    # opt-in, as the cache writes to the home directory unless a directory is given
+    if not (args.cache or args.cache_dir):
+        return None
+
+    from peakshaving_analyzer.cache import ResultCache
+
+    return ResultCache(directory=args.cache_dir)
+
+
+def batch(args) -> int:
+    import pandas as pd
+
+    from peakshaving_analyzer.batch import optimize_batch
+
+    missing = [path for path in args.configs if not Path(path).exists()]
+    for path in missing:
+        print(f"Config file not found: {path}", file=sys.stderr)
+    if missing:
+        return 1
+
+    store = None
+    if args.store:
+        from peakshaving_analyzer.store import ResultStore
+
+        store = ResultStore(args.store)
+
+    rows = []
+    n_failed = 0
+    for batch_result in optimize_batch(
+        args.configs,
+        n_workers=args.workers,
+        timeout=args.timeout,
+        solver=args.solver,
+        cache=create_cache(args),
+    ):
+        if batch_result.ok:
+            row = batch_result.results.to_summary()
+            row["error"] = None
+            if store is not None:
+                store.append(batch_result.results)
+            print(f"[done]   {batch_result.name}: {batch_result.results.total_yearly_costs_eur:.2f} EUR/a")
+        else:
+            row = {"name": batch_result.name, "error": batch_result.error}
+            n_failed += 1
+            print(f"[failed] {batch_result.name}: {batch_result.error}", file=sys.stderr)
+
+        row["config"] = args.configs[batch_result.index]
+        rows.append(row)
+
+    print("---------------------------------------------------------")
+    print(f"{len(rows) - n_failed} of {len(rows)} optimizations succeeded.")
+
+    if args.output:
+        df = pd.DataFrame(rows)
+        if args.output.endswith(".csv"):
+            df.to_csv(args.output, index=False)
+        elif args.output.endswith(".json"):
+            df.to_json(args.output, orient="records", indent=4)
+        else:
+            raise NotImplementedError
+        print(f"Summary saved to {args.output}")
+
+    return 1 if n_failed else 0
+
 
 if __name__ == "__main__":
     cli()
@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from peakshaving_analyzer.input import Config
+
+PV_PROFILE_HOURLY = [0] * 6 + [0.2, 0.4, 0.6, 0.8, 1, 1, 1, 1, 0.8, 0.6, 0.4, 0.2] + [0] * 6
+
+
+def _config(engine, n_timesteps=48, hours_per_timestep=1, grid_capacity_price=300, **kwargs):
+    steps = np.arange(n_timesteps)
+    # base load with a short peak every day
+    consumption = 5 + 3 * (np.sin(steps * hours_per_timestep / 24 * 2 * np.pi * 3) > 0.9)
+    pv_profile = (PV_PROFILE_HOURLY * n_timesteps)[0:n_timesteps]
+
+    return Config(
+        "test_config",
+        engine=engine,
+        consumption_timeseries=pd.Series(consumption, dtype=float),
+        hours_per_timestep=hours_per_timestep,
+        n_timesteps=n_timesteps,
+        price_timeseries=pd.DataFrame(
+            {"grid": np.linspace(0.1, 0.3, n_timesteps), "consumption_site": [0] * n_timesteps}
+        ),
+        grid_capacity_price=grid_capacity_price,
+        existing_pv_generation_timeseries=pd.DataFrame({"grid": 0, "consumption_site": pv_profile}),
+        new_pv_generation_timeseries=pd.DataFrame({"grid": 0, "consumption_site": pv_profile}),
+        **kwargs,
+    )
+
+
+@pytest.fixture(scope="session")
+def make_config():
+    """Factory of small configs with a daily peak and PV, `make_config(engine, n_timesteps, ...)`."""
+    return _config
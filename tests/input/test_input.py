@@ -1,6 +1,9 @@
+import numpy as np
 import pandas as pd
+import pytest
+import yaml
 
-from peakshaving_analyzer.input import load_yaml_config
+from peakshaving_analyzer.input import load_yaml_config, read_timeseries_file
 
 
 def test_existing_pv():
@@ -16,3 +19,60 @@ def test_brightsky():
 
     # brightsky should fetch for whole year
     assert len(conf.existing_pv_generation_timeseries) == 8760
+
+
+def _meter_export():
+    return pd.DataFrame(
+        {
+            "timestamp": pd.date_range("2024-01-01", periods=10, freq="1min"),
+            "consumption": np.arange(10, dtype=float),
+            "unused": ["x"] * 10,
+        }
+    )
+
+
+@pytest.mark.parametrize("chunksize", [None, 3])
+def test_read_timeseries_file_csv(tmp_path, chunksize):
+    path = tmp_path / "meter.csv"
+    _meter_export().to_csv(path, index=False)
+
+    df = read_timeseries_file(path, ["consumption"], timestamp_column="timestamp", dtype="float32", chunksize=chunksize)
+
+    assert list(df.columns) == ["consumption", "timestamp"]
+    assert df["consumption"].dtype == np.float32
+    assert pd.api.types.is_datetime64_any_dtype(df["timestamp"])
+    assert (df["consumption"] == np.arange(10)).all()
+
+
+@pytest.mark.parametrize("suffix", [".parquet", ".feather"])
+def test_read_timeseries_file_arrow_formats(tmp_path, suffix):
+    pytest.importorskip("pyarrow")
+    path = tmp_path / f"meter{suffix}"
+    if suffix == ".parquet":
+        _meter_export().to_parquet(path)
+    else:
+        _meter_export().to_feather(path)
+
+    df = read_timeseries_file(path, ["consumption"], timestamp_column="timestamp")
+
+    assert list(df.columns) == ["consumption", "timestamp"]
+    assert df["consumption"].dtype == np.float64
+    assert (df["timestamp"] == _meter_export()["timestamp"]).all()
+
+
+def test_price_file_with_missing_rows_fails(tmp_path):
+    pd.DataFrame({"consumption": np.ones(48)}).to_csv(tmp_path / "consumption.csv", index=False)
+    pd.DataFrame({"value": np.full(44, 0.2)}).to_csv(tmp_path / "price.csv", index=False)
+    config = {
+        "name": "missing_rows",
+        "hours_per_timestep": 1,
+        "consumption_file_path": "consumption.csv",
+        "consumption_value_column": "consumption",
+        "price_file_path": "price.csv",
+        "grid_capacity_price": 100,
+        "grid_energy_price": 0.05,
+    }
+    (tmp_path / "config.yml").write_text(yaml.safe_dump(config))
+
+    with pytest.raises(ValueError, match="44 values to 48 timesteps"):
+        load_yaml_config(tmp_path / "config.yml", test_mode=True)
@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import pytest
+import sqlalchemy
+
+from peakshaving_analyzer.input import load_oeds_config, load_oeds_configs
+
+N_TIMESTEPS = 96
+
+
+@pytest.fixture
+def oeds_engine(tmp_path):
+    """SQLite database with the OEDS tables in an attached `vea_industrial_load_profiles` schema."""
+
+    engine = sqlalchemy.create_engine(f"sqlite:///{tmp_path / 'main.db'}")
+    schema_path = tmp_path / "vea.db"
+
+    @sqlalchemy.event.listens_for(engine, "connect")
+    def attach_schema(dbapi_connection, connection_record):
+        dbapi_connection.execute(f"ATTACH DATABASE '{schema_path}' AS vea_industrial_load_profiles")
+
+    timestamps = pd.date_range("2016-01-01", periods=N_TIMESTEPS, freq="15min")
+    load = pd.concat(
+        [
+            pd.DataFrame({"id": profile_id, "timestamp": timestamps, "value": np.arange(N_TIMESTEPS) + profile_id})
+            for profile_id in (1, 2, 3)
+        ]
+    )
+    master = pd.DataFrame(
+        {
+            "id": [1, 2, 3],
+            "capacity_price_under_2500h_eur_per_kw": [10.0, 20.0, 30.0],
+            "capacity_price_over_2500h_eur_per_kw": [100.0, 200.0, 300.0],
+            "energy_price_under_2500h_eur_per_kwh": [0.1, 0.2, 0.3],
+            "energy_price_over_2500h_eur_per_kwh": [0.01, 0.02, 0.03],
+        }
+    )
+    with engine.begin() as con:
+        # shuffled rows, the loader has to sort them
+        load.sample(frac=1, random_state=0).to_sql("load", con, schema="vea_industrial_load_profiles", index=False)
+        master.to_sql("master", con, schema="vea_industrial_load_profiles", index=False)
+
+    return engine
+
+
+def test_load_oeds_configs(oeds_engine):
+    # small chunks split the rows of a profile over several chunks
+    configs = load_oeds_configs(oeds_engine, [3, 1, 4], price_inflation_percent=0, chunksize=50)
+
+    assert [config.name for config in configs] == ["profile_3", "profile_1"]
+    for config, profile_id in zip(configs, (3, 1), strict=True):
+        assert config.n_timesteps == N_TIMESTEPS
+        assert (config.consumption_timeseries == np.arange(N_TIMESTEPS) + profile_id).all()
+        assert config.grid_capacity_price == 100.0 * profile_id
+        assert config.grid_energy_price == pytest.approx(0.01 * profile_id)
+
+
+def test_load_oeds_config_matches_bulk_loader(oeds_engine):
+    config = load_oeds_config(oeds_engine, 2, name="single")
+    bulk_config = load_oeds_configs(oeds_engine, [2])[0]
+
+    assert config.name == "single"
+    assert config.grid_capacity_price == bulk_config.grid_capacity_price
+    assert (config.consumption_timeseries == bulk_config.consumption_timeseries).all()
+
+    with pytest.raises(ValueError):
+        load_oeds_config(oeds_engine, 4)
@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+import pytest
+import yaml
+
+from peakshaving_analyzer.input import _pv_cache, load_yaml_config
+from peakshaving_analyzer.pv import PVCache, PVLocation, PVProvider, get_pv_generation
+
+pytest.importorskip("pyarrow")
+
+
+class CountingProvider(PVProvider):
+    name = "counting"
+
+    def __init__(self):
+        self.calls = 0
+
+    def fetch(self, location, year):
+        self.calls += 1
+        return pd.Series(np.linspace(0, 1, 8760), name="consumption_site")
+
+
+def test_pv_generation_is_fetched_once(tmp_path):
+    provider = CountingProvider()
+    cache = PVCache(tmp_path)
+    location = PVLocation(latitude=50.77, longitude=6.08)
+
+    first = get_pv_generation(location, 2023, provider=provider, cache=cache)
+    second = get_pv_generation(location, 2023, provider=provider, cache=cache)
+
+    assert provider.calls == 1
+    assert (first.to_numpy() == second.to_numpy()).all()
+
+
+def test_offline_mode_only_uses_cache(tmp_path):
+    provider = CountingProvider()
+    cache = PVCache(tmp_path, offline=True)
+
+    with pytest.raises(FileNotFoundError):
+        get_pv_generation(PVLocation(postal_code="52066"), 2023, provider=provider, cache=cache)
+    assert provider.calls == 0
+
+
+def test_load_yaml_config_offline(tmp_path):
+    # pre-seed the cache, as it would be done for machines without internet access
+    generation = pd.Series(np.linspace(0, 1, 8760))
+    PVCache(tmp_path / "pv").put("brightsky", PVLocation(postal_code="52066"), 2023, generation)
+
+    pd.DataFrame(
+        {"timestamp": pd.date_range("2023-01-01", periods=8760, freq="h"), "consumption": np.ones(8760)}
+    ).to_csv(tmp_path / "consumption.csv", index=False)
+    config = {
+        "name": "offline",
+        "hours_per_timestep": 1,
+        "timestamp_column": "timestamp",
+        "consumption_file_path": "consumption.csv",
+        "consumption_value_column": "consumption",
+        "producer_energy_price": 0.2,
+        "grid_capacity_price": 100,
+        "grid_energy_price": 0.05,
+        "allow_additional_pv": True,
+        "postal_code": 52066,
+        "pv_offline": True,
+        "pv_cache_dir": str(tmp_path / "pv"),
+    }
+    with open(tmp_path / "config.yml", "w") as f:
+        yaml.safe_dump(config, f)
+
+    conf = load_yaml_config(tmp_path / "config.yml")
+
+    assert (conf.new_pv_generation_timeseries["consumption_site"].to_numpy() == generation.to_numpy()).all()
+
+
+def test_pv_cache_is_opt_in(tmp_path):
+    assert _pv_cache({}) is None
+    assert _pv_cache({"pv_cache": True}) is not None
+    assert _pv_cache({"pv_cache_dir": str(tmp_path)}).directory == tmp_path
+
+    with pytest.raises(TypeError):
+        PVProvider()
@@ -0,0 +1,55 @@
+import pandas as pd
+import pytest
+
+from peakshaving_analyzer.cache import config_hash
+from peakshaving_analyzer.config import Config
+from peakshaving_analyzer.output import TIMESERIES_FIELDS, Results
+from peakshaving_analyzer.PSA import PeakShavingAnalyzer
+
+pytest.importorskip("pyarrow")
+
+
+@pytest.fixture(scope="module")
+def results(make_config):
+    config = make_config("native", allow_additional_pv=True)
+    config.timestamps = pd.date_range("2023-03-25", periods=config.n_timesteps, freq="h", tz="Europe/Berlin")
+
+    return PeakShavingAnalyzer(config).optimize()
+
+
+def _assert_results_equal(results, loaded):
+    assert loaded.to_dict(include_timeseries=False) == results.to_dict(include_timeseries=False)
+    for name in TIMESERIES_FIELDS:
+        pd.testing.assert_series_equal(
+            getattr(loaded, name), getattr(results, name).reset_index(drop=True), check_names=False
+        )
+    pd.testing.assert_index_equal(pd.DatetimeIndex(loaded.timestamps), pd.DatetimeIndex(results.timestamps))
+
+
+def test_results_parquet(results, tmp_path):
+    results.to_parquet(tmp_path / "results.parquet")
+
+    _assert_results_equal(results, Results.from_parquet(tmp_path / "results.parquet"))
+
+
+def test_results_arrow_ipc(results, tmp_path):
+    results.to_arrow_ipc(tmp_path / "results.arrow")
+
+    _assert_results_equal(results, Results.from_arrow_ipc(tmp_path / "results.arrow"))
+
+
+def test_config_parquet(tmp_path, make_config):
+    config = make_config("native")
+    config.to_parquet(tmp_path / "config.parquet")
+
+    loaded = Config.from_parquet(tmp_path / "config.parquet")
+
+    assert config_hash(loaded) == config_hash(config)
+    pd.testing.assert_frame_equal(loaded.price_timeseries, config.price_timeseries)
+
+
+def test_wrong_class(results, tmp_path):
+    results.to_parquet(tmp_path / "results.parquet")
+
+    with pytest.raises(ValueError):
+        Config.from_parquet(tmp_path / "results.parquet")
@@ -0,0 +1,67 @@
+import time
+
+import pandas as pd
+
+from peakshaving_analyzer.batch import optimize_batch
+from peakshaving_analyzer.input import Config
+
+
+def _config(name, n_timesteps, n_consumption=None):
+    return Config(
+        name,
+        consumption_timeseries=[1] * (n_consumption or n_timesteps),
+        hours_per_timestep=1,
+        n_timesteps=n_timesteps,
+        price_timeseries=pd.DataFrame({"grid": [0.3] * n_timesteps, "consumption_site": [0] * n_timesteps}),
+    )
+
+
+def test_batch_returns_all_results():
+    configs = [_config(f"profile_{i}", n_timesteps=4) for i in range(3)]
+
+    batch_results = list(optimize_batch(configs, n_workers=2))
+
+    assert sorted(r.index for r in batch_results) == [0, 1, 2]
+    assert all(r.ok for r in batch_results)
+    for r in batch_results:
+        assert r.name == f"profile_{r.index}"
+        assert r.results.grid_capacity_kw == 1
+
+
+def test_failed_job_does_not_abort_batch():
+    configs = [
+        _config("good", n_timesteps=4),
+        _config("broken", n_timesteps=4, n_consumption=2),
+        "does/not/exist.yml",
+    ]
+
+    batch_results = {r.index: r for r in optimize_batch(configs, n_workers=2)}
+
+    assert batch_results[0].ok
+    assert batch_results[0].results is not None
+
+    assert not batch_results[1].ok
+    assert batch_results[1].name == "broken"
+    assert batch_results[1].results is None
+
+    assert not batch_results[2].ok
+    assert batch_results[2].name == "exist"
+    assert "FileNotFoundError" in batch_results[2].error
+
+
+def test_timeout_stops_long_solve():
+    configs = [
+        _config("long", n_timesteps=17520),
+        _config("short", n_timesteps=4),
+    ]
+    configs[0].hours_per_timestep = 0.25
+    configs[0].engine = "native"
+
+    start = time.perf_counter()
+    batch_results = {r.index: r for r in optimize_batch(configs, n_workers=1, timeout=3)}
+
+    # without the timeout this takes about a minute, nearly all of it inside HiGHS
+    assert time.perf_counter() - start < 30
+    assert "TimeoutError" in batch_results[0].error
+    # the replaced worker runs the next job
+    assert batch_results[1].ok
@@ -0,0 +1,77 @@
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from benchmarks.runner import compare, run_benchmarks
+from benchmarks.scenarios import SCENARIOS, Scenario
+from benchmarks.startup import ROOT, run_startup_benchmarks
+from benchmarks.synthetic import synthetic_config, synthetic_load, synthetic_pv
+from peakshaving_analyzer.fast import is_fast_path_applicable
+
+
+def test_synthetic_profiles_are_seeded():
+    load = synthetic_load(35040, 0.25, seed=1)
+
+    assert len(load) == 35040
+    assert (load >= 0).all()
+    np.testing.assert_array_equal(load, synthetic_load(35040, 0.25, seed=1))
+    assert not np.array_equal(load, synthetic_load(35040, 0.25, seed=2))
+
+    pv = synthetic_pv(8760, 1)
+    assert pv.min() == 0
+    assert pv.max() <= 1
+    # more generation in summer
+    assert pv[4000:5000].sum() > 2 * pv[:1000].sum()
+
+
+def test_synthetic_config():
+    config = synthetic_config(years=2, hours_per_timestep=0.25, pv=True)
+
+    assert config.n_timesteps == 2 * 35040
+    assert len(config.timestamps) == config.n_timesteps
+    assert len(config.new_pv_generation_timeseries) == config.n_timesteps
+
+
+def test_scenarios_cover_engines():
+    scenario = next(s for s in SCENARIOS if s.name == "storage_1y_60min")
+
+    assert scenario.engines() == ["fine", "native", "fast", "rolling"]
+    assert "fine" not in next(s for s in SCENARIOS if s.name == "pv_3y_15min").engines()
+
+    for scenario in (s for s in SCENARIOS if s.years == 1 and s.hours_per_timestep == 1):
+        assert scenario.fast_path_applicable == is_fast_path_applicable(scenario.config("fast"))
+
+
+def test_run_and_compare():
+    scenario = Scenario("storage", years=0.05, hours_per_timestep=1)
+
+    report = run_benchmarks([scenario], engines=["native", "fast"], repeat=2)
+
+    assert [b["engine"] for b in report["benchmarks"]] == ["native", "fast"]
+    native = report["benchmarks"][0]
+    assert native["median_seconds"]["solve"] > 0
+    assert native["n_nonzeros"] > 0
+    assert native["total_yearly_costs_eur"] == pytest.approx(report["benchmarks"][1]["total_yearly_costs_eur"])
+
+    rows = compare(report, report)
+    assert [row["ratio"] for row in rows] == [1, 1]
+    assert not any(row["costs_changed"] for row in rows)
+
+
+def test_package_import_is_lazy():
+    heavy = ["fine", "pyomo", "plotly", "statsmodels", "sqlalchemy", "pgeocode", "requests"]
+    code = f"import sys, peakshaving_analyzer; print([m for m in {heavy} if m in sys.modules])"
+
+    loaded = subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True, capture_output=True, text=True)
+
+    assert loaded.stdout.strip() == "[]"
+
+
+def test_startup_benchmarks():
+    report = run_startup_benchmarks(["python", "import_package"], repeat=1)
+
+    assert [b["engine"] for b in report["benchmarks"]] == ["python", "import_package"]
+    assert all(b["median_seconds"]["total"] > 0 for b in report["benchmarks"])
+    assert len(compare(report, report)) == 2
@@ -0,0 +1,77 @@
+import pandas as pd
+
+from peakshaving_analyzer.cache import ResultCache, config_hash
+from peakshaving_analyzer.input import Config
+from peakshaving_analyzer.PSA import PeakShavingAnalyzer
+
+
+def _config(consumption=None, **kwargs):
+    consumption = consumption or [1, 2, 1, 3]
+    n_timesteps = len(consumption)
+
+    return Config(
+        "test_config",
+        engine="native",
+        consumption_timeseries=pd.Series(consumption, dtype=float),
+        hours_per_timestep=1,
+        n_timesteps=n_timesteps,
+        price_timeseries=pd.DataFrame({"grid": [0.3] * n_timesteps, "consumption_site": [0] * n_timesteps}),
+        **kwargs,
+    )
+
+
+def test_hash_is_stable_and_content_based():
+    assert config_hash(_config()) == config_hash(_config())
+    assert config_hash(_config(optimization_id="some-id")) == config_hash(_config())
+
+    assert config_hash(_config()) != config_hash(_config(consumption=[1, 2, 1, 4]))
+    assert config_hash(_config()) != config_hash(_config(grid_capacity_price=10))
+    assert config_hash(_config(), solver="gurobi") != config_hash(_config(), solver="appsi_highs")
+
+
+def test_cache_hit_skips_optimization(tmp_path, monkeypatch):
+    cache = ResultCache(tmp_path)
+
+    first = PeakShavingAnalyzer(config=_config()).optimize(cache=cache)
+    assert len(list(tmp_path.glob("*.pkl"))) == 1
+
+    def fail(*args, **kwargs):
+        raise AssertionError("optimization should not run on a cache hit")
+
+    monkeypatch.setattr(PeakShavingAnalyzer, "_optimize_native", fail)
+    config = _config(optimization_id="second-run")
+    second = PeakShavingAnalyzer(config=config).optimize(cache=cache)
+
+    assert second.optimization_id == "second-run"
+    assert second.total_yearly_costs_eur == first.total_yearly_costs_eur
+    assert (second.grid_usage_kw == first.grid_usage_kw).all()
+
+
+def test_lru_eviction(tmp_path):
+    results = PeakShavingAnalyzer(config=_config()).optimize()
+
+    cache = ResultCache(tmp_path)
+    cache.put("a", results)
+    entry_size = cache.size_bytes()
+
+    cache.max_size_bytes = 2 * entry_size
+    cache.put("b", results)
+    cache.get("a")  # a is now more recently used than b
+    cache.put("c", results)
+
+    assert cache.get("a") is not None
+    assert cache.get("b") is None
+    assert cache.get("c") is not None
+
+
+def test_unreadable_entry_is_a_miss(tmp_path):
+    cache = ResultCache(tmp_path)
+    key = config_hash(_config())
+    # pickled reference to a module that doesn't exist, as left by another package version
+    cache._path(key).write_bytes(b"cmissing_module\nResults\n.")
+
+    assert cache.get(key) is None
+    assert not cache._path(key).exists()
+
+    results = PeakShavingAnalyzer(config=_config()).optimize(cache=cache)
+    assert results.total_yearly_costs_eur is not None
@@ -0,0 +1,122 @@
+import numpy as np
+import pandas as pd
+import pytest
+import sqlalchemy
+
+from peakshaving_analyzer.database import create_tables, write_results
+from peakshaving_analyzer.output import Results
+
+N_TIMESTEPS = 96
+
+
+def _results(i):
+    timestamps = pd.date_range("2023-01-01", periods=N_TIMESTEPS, freq="15min", tz="UTC")
+    values = pd.Series(np.arange(N_TIMESTEPS, dtype=float) + i)
+
+    return Results(
+        optimization_id=f"id_{i}",
+        name=f"results_{i}",
+        grid_usage_kw=values,
+        storage_charge_kw=values,
+        storage_discharge_kw=values,
+        storage_soc_kwh=values,
+        existing_pv_generation_kw=pd.Series(0.0, index=range(N_TIMESTEPS)),
+        new_pv_generation_kw=pd.Series(0.0, index=range(N_TIMESTEPS)),
+        consumption_kw=values,
+        energy_price_eur=values,
+        grid_capacity_kw=10.0 + i,
+        total_yearly_costs_eur=np.float64(100.0 * i),
+        timestamps=timestamps,
+    )
+
+
+@pytest.fixture
+def engine(tmp_path):
+    return sqlalchemy.create_engine(f"sqlite:///{tmp_path / 'results.db'}")
+
+
+def test_write_results(engine):
+    assert write_results((_results(i) for i in range(3)), engine) == 3
+
+    with engine.connect() as con:
+        overview = pd.read_sql("SELECT * FROM overview ORDER BY optimization_id", con)
+        timeseries = pd.read_sql("SELECT * FROM timeseries WHERE optimization_id = 'id_2'", con)
+
+    assert overview["name"].tolist() == ["results_0", "results_1", "results_2"]
+    assert overview["grid_capacity_kw"].tolist() == [10.0, 11.0, 12.0]
+    assert overview["total_yearly_costs_eur"].tolist() == [0.0, 100.0, 200.0]
+    assert overview["storage_capacity_kwh"].isna().all()
+
+    assert len(timeseries) == N_TIMESTEPS
+    assert (timeseries["grid_usage_kw"] == np.arange(N_TIMESTEPS) + 2).all()
+    assert (timeseries["name"] == "results_2").all()
+    assert pd.to_datetime(timeseries["timestamp"]).iloc[4] == pd.Timestamp("2023-01-01 01:00", tz="UTC")
+
+
+def test_typed_tables(engine):
+    create_tables(engine)
+
+    inspector = sqlalchemy.inspect(engine)
+    overview_columns = {column["name"]: column["type"] for column in inspector.get_columns("overview")}
+    assert isinstance(overview_columns["grid_capacity_kw"], sqlalchemy.Float)
+    assert isinstance(overview_columns["optimization_id"], sqlalchemy.Text)
+    assert "timestamps" not in overview_columns
+
+    timeseries_columns = {column["name"]: column["type"] for column in inspector.get_columns("timeseries")}
+    assert isinstance(timeseries_columns["timestamp"], sqlalchemy.DateTime)
+
+    indexed = [index["column_names"] for index in inspector.get_indexes("timeseries")]
+    assert ["optimization_id", "timestamp"] in indexed
+
+
+def test_to_sql_appends(engine):
+    # SQLite has no schemas
+    _results(0).to_sql(engine, schema=None)
+    _results(1).to_sql(engine, include_timeseries=False, schema=None)
+
+    with engine.connect() as con:
+        assert con.exec_driver_sql("SELECT COUNT(*) FROM overview").scalar() == 2
+        assert con.exec_driver_sql("SELECT COUNT(*) FROM timeseries").scalar() == N_TIMESTEPS
+
+
+def test_write_results_is_atomic(engine):
+    broken = _results(1)
+    broken.optimization_id = None
+
+    with pytest.raises(sqlalchemy.exc.IntegrityError):
+        write_results([_results(0), broken], engine)
+
+    with engine.connect() as con:
+        assert con.exec_driver_sql("SELECT COUNT(*) FROM overview").scalar() == 0
+        assert con.exec_driver_sql("SELECT COUNT(*) FROM timeseries").scalar() == 0
+
+
+def test_results_without_timestamps_are_rejected(engine):
+    results = _results(1)
+    results.timestamps = None
+
+    with pytest.raises(ValueError, match="no timestamps"):
+        write_results([_results(0), results], engine)
+
+    assert write_results([results], engine, include_timeseries=False) == 1
+
+
+def test_append_to_tables_of_earlier_versions(engine):
+    # written with pandas to_sql before the typed tables, without the later added columns
+    old = _results(0)
+    pd.DataFrame([{"optimization_id": "old", "name": "old", "grid_capacity_kw": 1.0}]).to_sql(
+        "overview", engine, index=False
+    )
+    old.timeseries_to_df().drop(columns="energy_price_eur").assign(name="old", optimization_id="old").to_sql(
+        "timeseries", engine, index=False
+    )
+
+    write_results([_results(1)], engine)
+
+    with engine.connect() as con:
+        overview = pd.read_sql("SELECT * FROM overview ORDER BY optimization_id", con)
+        prices = pd.read_sql("SELECT energy_price_eur FROM timeseries WHERE optimization_id = 'id_1'", con)
+
+    assert overview["optimization_id"].tolist() == ["id_1", "old"]
+    assert overview["total_yearly_costs_eur"].tolist()[0] == 100
+    assert (prices["energy_price_eur"] == np.arange(N_TIMESTEPS) + 1).all()
@@ -0,0 +1,179 @@
+from dataclasses import replace
+from math import isclose
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from peakshaving_analyzer.fast import is_fast_path_applicable
+from peakshaving_analyzer.PSA import PeakShavingAnalyzer
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {},
+        {"add_storage": False},
+        {"hours_per_timestep": 0.25, "n_timesteps": 96},
+        {"pv_system_already_exists": True, "existing_pv_size_kwp": 2},
+        {"allow_additional_pv": True, "interest_rate": 0},
+        {
+            "max_storage_size_kwh": 1,
+            "max_inverter_charge": 0.5,
+            "max_inverter_discharge": 0.5,
+            "storage_cyclic_lifetime": 100,
+        },
+    ],
+)
+def test_native_matches_fine(kwargs, make_config):
+    fine_results = PeakShavingAnalyzer(config=make_config("fine", **kwargs)).optimize()
+    native_results = PeakShavingAnalyzer(config=make_config("native", **kwargs)).optimize()
+
+    fine_dict = fine_results.to_dict(include_timeseries=False)
+    native_dict = native_results.to_dict(include_timeseries=False)
+    for key, value in fine_dict.items():
+        if isinstance(value, float):
+            assert isclose(value, native_dict[key], rel_tol=1e-6, abs_tol=1e-6), key
+
+    assert np.allclose(fine_results.grid_usage_kw.max(), native_results.grid_usage_kw.max())
+
+
+def test_native_does_not_build_esm(make_config):
+    psa = PeakShavingAnalyzer(config=make_config("native"))
+    results = psa.optimize()
+
+    assert psa._esm is None
+    assert results.storage_capacity_kwh > 0
+    assert len(results.grid_usage_kw) == 48
+
+
+def test_unknown_engine(make_config):
+    psa = PeakShavingAnalyzer(config=make_config("native"))
+
+    with pytest.raises(ValueError):
+        psa.optimize(engine="unknown")
+
+
+def test_solver_of_other_engines_is_reported(make_config, caplog):
+    psa = PeakShavingAnalyzer(config=make_config("native"))
+
+    psa.optimize(solver="appsi_highs")
+    assert not caplog.records
+
+    psa.optimize(solver="gurobi")
+    assert "only used by the FINE engine" in caplog.text
+
+
+def test_sweep_matches_single_optimizations(make_config):
+    psa = PeakShavingAnalyzer(config=make_config("native"))
+    df = psa.sweep({"grid_capacity_price": [50, 300], "storage_cost_per_kwh": [100, 285], "interest_rate": [0, 5]})
+
+    assert len(df) == 8
+    assert {"grid_capacity_price", "storage_cost_per_kwh", "interest_rate", "total_yearly_costs_eur"} <= set(df.columns)
+
+    for _, row in df.iterrows():
+        config = make_config(
+            "native",
+            grid_capacity_price=row["grid_capacity_price"],
+            storage_cost_per_kwh=row["storage_cost_per_kwh"],
+            interest_rate=row["interest_rate"],
+        )
+        results = PeakShavingAnalyzer(config=config).optimize()
+        assert isclose(row["total_yearly_costs_eur"], results.total_yearly_costs_eur, rel_tol=1e-6)
+
+
+def test_sweep_rejects_non_cost_parameters(make_config):
+    psa = PeakShavingAnalyzer(config=make_config("native"))
+
+    with pytest.raises(ValueError):
+        psa.sweep({"storage_charge_efficiency": [0.9, 0.95]})
+
+
+def test_reoptimize_matches_new_optimization(make_config):
+    config = make_config("native", pv_system_already_exists=True, existing_pv_size_kwp=2)
+    psa = PeakShavingAnalyzer(config=config)
+    first = psa.optimize()
+    lp = psa._lp
+
+    consumption = config.consumption_timeseries.to_numpy().copy()
+    consumption[-12:] = [4, 9, 9, 4, 4, 4, 4, 8, 8, 8, 4, 4]
+    results = psa.reoptimize(consumption)
+
+    assert psa._lp is lp
+    assert results.optimization_id != first.optimization_id
+    np.testing.assert_array_equal(results.consumption_kw, consumption)
+
+    expected_config = replace(config, consumption_timeseries=pd.Series(consumption), optimization_id=None)
+    expected = PeakShavingAnalyzer(config=expected_config).optimize()
+    assert isclose(results.total_yearly_costs_eur, expected.total_yearly_costs_eur, rel_tol=1e-6)
+    assert isclose(results.grid_capacity_kw, expected.grid_capacity_kw, rel_tol=1e-6)
+
+    with pytest.raises(ValueError):
+        psa.reoptimize(consumption[:-1])
+
+
+def test_rolling_window_covering_period_matches_full_optimization(make_config):
+    full = PeakShavingAnalyzer(config=make_config("native")).optimize()
+    rolling = PeakShavingAnalyzer(config=make_config("native", rolling_window_hours=48)).optimize()
+
+    assert isclose(rolling.total_yearly_costs_eur, full.total_yearly_costs_eur, rel_tol=1e-6)
+
+
+def test_rolling_windows_are_stitched_consistently(make_config):
+    config = make_config(
+        "native", n_timesteps=96, rolling_window_hours=24, rolling_overlap_hours=12, allow_additional_pv=True
+    )
+    full = PeakShavingAnalyzer(config=make_config("native", n_timesteps=96, allow_additional_pv=True)).optimize()
+    rolling = PeakShavingAnalyzer(config=config).optimize()
+
+    assert len(rolling.grid_usage_kw) == 96
+    assert rolling.total_yearly_costs_eur >= full.total_yearly_costs_eur - 1e-6
+
+    # stitched operation respects the final capacities
+    assert rolling.grid_usage_kw.max() <= rolling.grid_capacity_kw + 1e-6
+    assert rolling.storage_soc_kwh.max() <= rolling.storage_capacity_kwh + 1e-6
+
+    # state of charge continues across window boundaries
+    soc = rolling.storage_soc_kwh.to_numpy()
+    stored = (
+        rolling.storage_charge_kw.to_numpy() * config.storage_charge_efficiency
+        - rolling.storage_discharge_kw.to_numpy() / config.storage_discharge_efficiency
+    )
+    assert np.allclose(np.diff(soc), stored[:-1], atol=1e-6)
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {},
+        {"hours_per_timestep": 0.25, "n_timesteps": 96},
+        {"storage_charge_rate": 0.1},
+        {"storage_cyclic_lifetime": 50},
+        {"max_storage_size_kwh": 1},
+        {"grid_capacity_price": 20},
+    ],
+)
+def test_fast_path_matches_native(kwargs, make_config):
+    native_config = make_config("native", **kwargs)
+    fast_config = make_config("fast", **kwargs)
+    for config in (native_config, fast_config):
+        config.price_timeseries["grid"] = 0.2
+
+    native_results = PeakShavingAnalyzer(config=native_config).optimize()
+    fast_results = PeakShavingAnalyzer(config=fast_config).optimize()
+
+    assert isclose(fast_results.total_yearly_costs_eur, native_results.total_yearly_costs_eur, rel_tol=1e-6)
+    assert fast_results.grid_usage_kw.max() <= fast_results.grid_capacity_kw + 1e-6
+    # the state of charge is reported per hour of timestep, as by FINE
+    soc = fast_results.storage_soc_kwh * fast_config.hours_per_timestep
+    assert soc.max() <= fast_results.storage_capacity_kwh + 1e-6
+
+
+def test_fast_path_falls_back_to_native_lp(make_config):
+    # varying prices make the timing of charging matter, which the fast path ignores
+    assert not is_fast_path_applicable(make_config("fast"))
+
+    fast_results = PeakShavingAnalyzer(config=make_config("fast")).optimize()
+    native_results = PeakShavingAnalyzer(config=make_config("native")).optimize()
+
+    assert isclose(fast_results.total_yearly_costs_eur, native_results.total_yearly_costs_eur, rel_tol=1e-9)
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import pytest
+
+from peakshaving_analyzer.plotting import line_figure, minmax_indices, show, visible_slice
+
+
+def test_minmax_keeps_peaks():
+    rng = np.random.default_rng(0)
+    y = rng.uniform(0, 1, 35041)
+    y[12345] = 5
+    y[20000] = -5
+    y[100] = np.nan
+
+    kept = minmax_indices(y, 1000)
+
+    assert len(kept) <= 1000
+    assert np.all(np.diff(kept) > 0)
+    assert {0, 12345, 20000, 35040} <= set(kept)
+    np.testing.assert_array_equal(minmax_indices(y[:500], 1000), np.arange(500))
+
+    with pytest.raises(ValueError):
+        minmax_indices(y, 3)
+
+
+def test_line_figure_downsamples_with_webgl():
+    x = pd.date_range("2024-01-01", periods=35040, freq="15min", tz="Europe/Berlin")
+    y = np.sin(np.arange(35040) / 100)
+
+    fig = line_figure(x, {"a": y, "b": -y}, max_points=2000, secondary_y=["b"], title="test")
+
+    assert [trace.type for trace in fig.data] == ["scattergl", "scattergl"]
+    assert all(len(trace.x) <= 2000 for trace in fig.data)
+    assert fig.data[1].yaxis == "y2"
+    assert len(line_figure(x, {"a": y}, max_points=None).data[0].x) == 35040
+
+
+def test_visible_slice():
+    x = pd.date_range("2024-01-01", periods=96, freq="15min").to_numpy()
+
+    visible = visible_slice(x, ["2024-01-01 01:10", "2024-01-01 02:00"])
+
+    assert (visible.start, visible.stop) == (4, 10)
+    assert visible_slice(x, None) == slice(0, 96)
+    assert visible_slice(np.arange(10), [2.5, 4]) == slice(2, 6)
+
+
+def test_show_writes_html(tmp_path):
+    fig = go.Figure(go.Scattergl(x=[0, 1], y=[0, 1]))
+
+    show(fig, tmp_path / "figure.html")
+
+    html = (tmp_path / "figure.html").read_text()
+    assert "cdn.plot.ly" in html
+    # the library isn't embedded
+    assert len(html) < 100_000
+
+    with pytest.raises(ValueError):
+        show(fig, tmp_path / "figure.txt")
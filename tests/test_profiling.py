@@ -0,0 +1,67 @@
+import pytest
+
+from peakshaving_analyzer.cache import ResultCache
+from peakshaving_analyzer.native import PeakShavingLP
+from peakshaving_analyzer.profiling import PHASES, SolverProfile
+from peakshaving_analyzer.PSA import PeakShavingAnalyzer
+from peakshaving_analyzer.store import ResultStore
+
+
+@pytest.mark.parametrize("engine", ["fine", "native"])
+def test_profile_phases(engine, make_config):
+    results = PeakShavingAnalyzer(make_config(engine)).optimize()
+    profile = results.profile
+
+    assert profile.engine == engine
+    assert all(getattr(profile, f"{phase}_seconds") > 0 for phase in PHASES)
+    assert profile.total_seconds >= sum(getattr(profile, f"{phase}_seconds") for phase in PHASES)
+    assert profile.n_variables > 0
+    assert profile.n_constraints > 0
+    assert "solve" in profile.report()
+
+
+def test_native_model_size(make_config):
+    config = make_config("native")
+    lp = PeakShavingLP(config)
+
+    profile = PeakShavingAnalyzer(config).optimize().profile
+
+    assert profile.n_variables == lp.matrix().shape[1]
+    assert profile.n_constraints == lp.matrix().shape[0]
+    assert profile.n_nonzeros == lp.matrix().nnz
+
+
+def test_rolling_profile_sums_windows(make_config):
+    profile = PeakShavingAnalyzer(make_config("native", rolling_window_hours=12)).optimize().profile
+    window = PeakShavingAnalyzer(make_config("native", n_timesteps=12)).optimize().profile
+
+    assert profile.n_variables == window.n_variables
+    assert profile.solve_seconds > 0
+
+
+def test_cache_hit(tmp_path, make_config):
+    cache = ResultCache(tmp_path)
+    PeakShavingAnalyzer(make_config("native")).optimize(cache=cache)
+
+    profile = PeakShavingAnalyzer(make_config("native")).optimize(cache=cache).profile
+
+    assert profile.cache_hit
+    assert profile.solve_seconds == 0
+
+
+def test_store_keeps_profile(tmp_path, make_config):
+    results = PeakShavingAnalyzer(make_config("native")).optimize()
+    store = ResultStore(tmp_path)
+    store.append(results)
+
+    assert store.summary["profile_engine"].tolist() == ["native"]
+
+    profile = ResultStore(tmp_path).results(0).profile
+    assert profile.n_nonzeros == results.profile.n_nonzeros
+    assert profile.solve_seconds == pytest.approx(results.profile.solve_seconds)
+
+
+def test_unknown_phase():
+    with pytest.raises(ValueError):
+        with SolverProfile().measure("presolve"):
+            pass
@@ -4,7 +4,9 @@ from math import isclose
 import pandas as pd
 import pytest
 
+from peakshaving_analyzer.aggregation import full_resolution_grid_peak
 from peakshaving_analyzer.input import Config
+from peakshaving_analyzer.output import Results
 from peakshaving_analyzer.PSA import PeakShavingAnalyzer
 
 
@@ -183,3 +185,60 @@ def test_existing_pv():
     ts = results.timeseries_to_df()
 
     assert (ts["existing_pv_generation_kw"] == [1, 1, 1]).all()
+
+
+def _weekly_config(**kwargs):
+    # flat days with a short evening peak, one day with a much higher peak
+    day = [4] * 18 + [6, 6] + [4] * 4
+    consumption = day * 3 + [4] * 18 + [12, 12] + [4] * 4 + day * 3
+
+    return Config(
+        "test_config",
+        consumption_timeseries=consumption,
+        hours_per_timestep=1,
+        n_timesteps=len(consumption),
+        price_timeseries=pd.DataFrame({"grid": [0.3] * len(consumption), "consumption_site": [0] * len(consumption)}),
+        **kwargs,
+    )
+
+
+def test_tsa_with_one_period_per_day_matches_full_resolution():
+    full_results = PeakShavingAnalyzer(config=_weekly_config()).optimize()
+    tsa_results = PeakShavingAnalyzer(config=_weekly_config(tsa_typical_periods=7)).optimize()
+
+    assert isclose(tsa_results.total_yearly_costs_eur, full_results.total_yearly_costs_eur, rel_tol=1e-6)
+    assert isclose(tsa_results.tsa_rmse, 0, abs_tol=1e-9)
+    assert isclose(tsa_results.full_resolution_grid_peak_kw, tsa_results.grid_capacity_kw, rel_tol=1e-6)
+    assert full_results.tsa_rmse is None
+
+
+def test_tsa_reports_errors_and_full_resolution_peak():
+    results = PeakShavingAnalyzer(config=_weekly_config(tsa_typical_periods=1)).optimize()
+
+    assert len(results.grid_usage_kw) == 7 * 24
+    assert results.tsa_rmse > 0
+    assert results.tsa_mae > 0
+    # a single typical day misses the high peak, which the sized storage can't shave
+    assert results.full_resolution_grid_peak_kw > results.grid_capacity_kw + 1
+
+
+@pytest.mark.parametrize(("existing_pv_size_kwp", "expected"), [(None, 6), (2, 10)])
+def test_full_resolution_peak_with_existing_pv(existing_pv_size_kwp, expected):
+    config = _weekly_config(
+        add_storage=False,
+        pv_system_already_exists=True,
+        existing_pv_size_kwp=existing_pv_size_kwp,
+    )
+    # generation only during the high peak
+    rate = [0.0] * len(config.consumption_timeseries)
+    rate[90] = rate[91] = 1
+    config.existing_pv_generation_timeseries = pd.DataFrame({"grid": 0, "consumption_site": rate})
+
+    assert full_resolution_grid_peak(config, Results("id", "test")) == expected
+
+
+def test_tsa_requires_whole_periods():
+    config = _weekly_config(tsa_typical_periods=2, tsa_hours_per_period=48)
+
+    with pytest.raises(ValueError):
+        PeakShavingAnalyzer(config=config).optimize()
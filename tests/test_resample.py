@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from peakshaving_analyzer.resample import infer_hours_per_timestep, resample, resample_to_length
+
+
+def test_downsampling_conserves_energy():
+    rng = np.random.default_rng(0)
+    values = rng.uniform(0, 10, 96)
+
+    hourly = resample(values, 0.25, 1)
+
+    assert len(hourly) == 24
+    np.testing.assert_allclose(hourly, values.reshape(24, 4).mean(axis=1))
+    assert np.isclose(hourly.sum() * 1, values.sum() * 0.25)
+
+
+def test_upsampling_repeats_values():
+    values = np.array([1.0, 2.0, 3.0])
+
+    np.testing.assert_allclose(resample(values, 1, 0.25), np.repeat(values, 4))
+    np.testing.assert_allclose(resample(values, 1, 0.25, method="ffill"), np.repeat(values, 4))
+
+
+def test_uneven_ratio():
+    values = np.array([1.0, 2.0, 3.0, 4.0])
+
+    # 15 minute values to 20 minute timesteps
+    result = resample(values, 0.25, 1 / 3)
+
+    np.testing.assert_allclose(result, [1.25, 2.5, 3.75])
+
+
+def test_pads_with_last_value():
+    result = resample(np.array([1.0, 2.0]), 1, 1, n_timesteps=4)
+
+    np.testing.assert_allclose(result, [1, 2, 2, 2])
+
+
+def test_linear():
+    result = resample(np.array([0.0, 1.0, 2.0]), 1, 0.5, method="linear")
+
+    np.testing.assert_allclose(result, [0, 0.5, 1, 1.5, 2, 2])
+
+
+def test_unknown_method():
+    with pytest.raises(ValueError):
+        resample(np.ones(4), 1, 0.5, method="cubic")
+
+
+def test_clock_change():
+    # the day of the change to summer time only has 23 hours
+    timestamps = pd.date_range("2023-03-26", periods=23 * 4, freq="15min", tz="Europe/Berlin")
+    values = np.arange(len(timestamps), dtype=float)
+
+    assert infer_hours_per_timestep(timestamps) == 0.25
+
+    hourly = resample(values, 0.25, 1, timestamps=timestamps)
+
+    assert len(hourly) == 23
+    np.testing.assert_allclose(hourly, values.reshape(23, 4).mean(axis=1))
+
+
+def test_resample_to_length():
+    hourly = np.arange(24, dtype=float)
+
+    quarter_hourly = resample_to_length(hourly, 96, 0.25)
+
+    np.testing.assert_allclose(quarter_hourly, np.repeat(hourly, 4))
+    np.testing.assert_allclose(resample_to_length(quarter_hourly, 24, 1), hourly)
+
+
+@pytest.mark.parametrize(("n_values", "n_timesteps"), [(8760, 8784), (35036, 35040), (24, 36)])
+def test_resample_to_length_rejects_other_mismatches(n_values, n_timesteps):
+    with pytest.raises(ValueError):
+        resample_to_length(np.arange(n_values, dtype=float), n_timesteps, 1)
@@ -0,0 +1,83 @@
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from peakshaving_analyzer.output import TIMESERIES_FIELDS, Results, create_results
+from peakshaving_analyzer.PSA import PeakShavingAnalyzer
+
+N_TIMESTEPS = 24
+
+
+def _results(**kwargs):
+    return Results(
+        optimization_id="id",
+        name="results",
+        grid_usage_kw=pd.Series(np.arange(N_TIMESTEPS, dtype=float)),
+        consumption_kw=np.full(N_TIMESTEPS, 2.0),
+        timestamps=pd.date_range("2023-01-01", periods=N_TIMESTEPS, freq="h"),
+        **kwargs,
+    )
+
+
+def test_timeseries_share_one_array():
+    results = _results()
+
+    df = results.timeseries_to_df()
+
+    assert df.columns.tolist() == ["timestamp", *TIMESERIES_FIELDS]
+    assert np.shares_memory(df["grid_usage_kw"].to_numpy(), results.grid_usage_kw.to_numpy())
+    assert (df["consumption_kw"] == 2).all()
+
+    # missing components are zeros
+    assert (results.storage_soc_kwh == 0).all()
+    assert len(results.new_pv_generation_kw) == N_TIMESTEPS
+
+
+def test_set_timeseries():
+    results = _results()
+    series = results.grid_usage_kw
+
+    results.grid_usage_kw = np.ones(N_TIMESTEPS)
+
+    assert (series == 1).all()
+    with pytest.raises(ValueError):
+        results.grid_usage_kw = np.ones(N_TIMESTEPS + 1)
+
+
+def test_float32():
+    results = _results(dtype="float32")
+
+    assert results.grid_usage_kw.dtype == np.float32
+    assert results.timeseries_to_df()["consumption_kw"].dtype == np.float32
+
+
+def test_without_timeseries():
+    results = Results(optimization_id="id", name="results", grid_capacity_kw=1.0)
+
+    assert results.grid_usage_kw is None
+    assert results.timeseries_to_df().empty
+
+
+def test_pickle():
+    results = pickle.loads(pickle.dumps(_results()))
+
+    assert (results.grid_usage_kw == np.arange(N_TIMESTEPS)).all()
+    assert results.timestamps[1] == pd.Timestamp("2023-01-01 01:00")
+
+
+def test_fine_summaries_are_read_once(monkeypatch, make_config):
+    config = make_config("fine", allow_additional_pv=True)
+    psa = PeakShavingAnalyzer(config)
+    results = psa.optimize()
+
+    calls = []
+    get_summary = psa.esm.getOptimizationSummary
+    monkeypatch.setattr(psa.esm, "getOptimizationSummary", lambda name: calls.append(name) or get_summary(name))
+
+    extracted = create_results(config, psa.esm)
+
+    assert sorted(calls) == sorted(set(calls))
+    assert extracted.to_dict(include_timeseries=False) == results.to_dict(include_timeseries=False) | {"profile": None}
+    assert (extracted.new_pv_generation_kw == results.new_pv_generation_kw).all()
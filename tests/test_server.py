@@ -0,0 +1,120 @@
+import asyncio
+import json
+
+import pytest
+
+from peakshaving_analyzer.jobs import DONE, QUEUED, RUNNING, JobQueue
+from peakshaving_analyzer.server import JobServer
+
+CONSUMPTION = "consumption\n" + "\n".join(str(5 + 3 * (i % 12 == 0)) for i in range(48)) + "\n"
+
+CONFIG = {
+    "name": "served",
+    "engine": "native",
+    "hours_per_timestep": 1,
+    "add_storage": True,
+    "consumption_file_path": "consumption.csv",
+    "consumption_value_column": "consumption",
+    "producer_energy_price": 0.15,
+    "grid_capacity_price": 300,
+    "grid_energy_price": 0.046,
+}
+
+
+def test_queue_deduplicates_in_flight_jobs(tmp_path):
+    queue = JobQueue(tmp_path)
+    files = {"consumption.csv": CONSUMPTION.encode()}
+
+    job, existing = queue.submit(CONFIG, files)
+    assert not existing
+    assert (queue.job_directory(job.id) / "consumption.csv").read_text() == CONSUMPTION
+
+    assert queue.submit(CONFIG, files) == (job, True)
+    assert queue.submit(CONFIG | {"grid_capacity_price": 200}, files)[0].id != job.id
+
+    assert queue.next().status == RUNNING
+    queue.requeue_running()
+    assert queue.get(job.id).status == QUEUED
+
+    queue.next()
+    queue.finish(job.id)
+    assert queue.get(job.id).status == DONE
+    # finished jobs are optimized again
+    assert queue.submit(CONFIG, files)[0].id != job.id
+
+
+def test_queue_rejects_invalid_files(tmp_path):
+    queue = JobQueue(tmp_path)
+
+    with pytest.raises(ValueError, match="not uploaded"):
+        queue.submit(CONFIG, {})
+    with pytest.raises(ValueError, match="Invalid file name"):
+        queue.submit(CONFIG, {"../consumption.csv": b""})
+
+
+async def _request(port, method, path, payload=None):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    body = json.dumps(payload).encode() if payload is not None else b""
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n\r\n".encode()
+        + body
+    )
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+
+    head, body = response.split(b"\r\n\r\n", 1)
+    status = int(head.split(b" ")[1])
+
+    return status, body
+
+
+def test_server_runs_jobs(tmp_path):
+    async def main():
+        job_server = JobServer(JobQueue(tmp_path), n_workers=1)
+        server = await job_server.start(port=0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            payload = {"config": CONFIG, "files": {"consumption.csv": CONSUMPTION}}
+            status, body = await _request(port, "POST", "/jobs", payload)
+            assert status == 202
+            job = json.loads(body)
+
+            status, body = await _request(port, "POST", "/jobs", payload)
+            assert json.loads(body)["id"] == job["id"]
+            assert json.loads(body)["deduplicated"]
+
+            status, _ = await _request(port, "POST", "/jobs", {"config": CONFIG})
+            assert status == 400
+
+            for _ in range(600):
+                status, body = await _request(port, "GET", f"/jobs/{job['id']}")
+                if json.loads(body)["status"] not in (QUEUED, RUNNING):
+                    break
+                await asyncio.sleep(0.1)
+            assert json.loads(body)["status"] == DONE, json.loads(body)["error"]
+
+            status, body = await _request(port, "GET", f"/jobs/{job['id']}/results")
+            assert status == 200
+            results = json.loads(body)
+            assert results["name"] == "served"
+            assert results["total_yearly_costs_eur"] > 0
+
+            status, body = await _request(port, "GET", f"/jobs/{job['id']}/timeseries")
+            assert status == 200
+            assert len(body.decode().splitlines()) == 49
+
+            status, _ = await _request(port, "GET", "/jobs/unknown")
+            assert status == 404
+
+            (job_server.queue.job_directory(job["id"]) / "results.pkl").write_bytes(b"not a pickle")
+            for route in ("results", "timeseries"):
+                status, body = await _request(port, "GET", f"/jobs/{job['id']}/{route}")
+                assert status == 404
+                assert "missing or unreadable" in json.loads(body)["error"]
+        finally:
+            server.close()
+            await job_server.stop()
+
+    asyncio.run(main())
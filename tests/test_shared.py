@@ -0,0 +1,102 @@
+import pickle
+import subprocess
+import sys
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from peakshaving_analyzer.batch import optimize_batch
+from peakshaving_analyzer.PSA import PeakShavingAnalyzer
+from peakshaving_analyzer.shared import SharedTimeseries, SharedTimeseriesStore, attach_timeseries
+
+
+@pytest.mark.parametrize("in_files", [False, True])
+def test_shared_timeseries_round_trip(tmp_path, in_files):
+    timestamps = pd.date_range("2024-01-01", periods=96, freq="15min", tz="Europe/Berlin")
+    timeseries = [
+        pd.Series(np.random.default_rng(0).uniform(0, 100, 96), name="consumption"),
+        pd.DataFrame({"grid": [0.2] * 96, "consumption_site": [0] * 96}),
+        pd.Series(np.arange(96.0), index=pd.date_range("2024-01-01", periods=96, freq="15min")),
+        pd.Series(timestamps),
+        timestamps,
+    ]
+
+    with SharedTimeseriesStore(tmp_path if in_files else None) as store:
+        for ts in timeseries:
+            shared = store.share_timeseries(ts)
+            assert isinstance(shared, SharedTimeseries)
+
+            loaded = pickle.loads(pickle.dumps(shared)).load()
+
+            if isinstance(ts, pd.Index):
+                pd.testing.assert_index_equal(loaded, ts)
+            elif isinstance(ts, pd.Series):
+                # the frequency of a datetime index isn't kept
+                pd.testing.assert_series_equal(loaded, ts, check_freq=False)
+            else:
+                pd.testing.assert_frame_equal(loaded, ts)
+
+        # strings can't be shared
+        strings = pd.Series(["a", "b"])
+        assert store.share_timeseries(strings) is strings
+
+
+def test_identical_timeseries_are_stored_once(make_config):
+    configs = [make_config("native", n_timesteps=8760) for _ in range(3)]
+    for i, config in enumerate(configs):
+        config.consumption_timeseries = config.consumption_timeseries + i
+
+    with SharedTimeseriesStore() as store:
+        shared = [store.share(config) for config in configs]
+
+        # three consumption timeseries, the price, the PV generation and the zeros once
+        assert store.nbytes == 6 * 8760 * 8
+        assert len(pickle.dumps(shared[0])) < len(pickle.dumps(configs[0])) / 10
+
+        attached = attach_timeseries(shared[1])
+        pd.testing.assert_series_equal(attached.consumption_timeseries, configs[1].consumption_timeseries)
+        assert not attached.consumption_timeseries.to_numpy().flags.writeable
+        assert attach_timeseries(configs[0]) is configs[0]
+
+
+@pytest.mark.parametrize("engine", ["native", "fast"])
+def test_optimize_shared_config(engine, make_config):
+    config = make_config(engine, n_timesteps=48)
+
+    with SharedTimeseriesStore() as store:
+        results = PeakShavingAnalyzer(store.share(config)).optimize()
+
+    expected = PeakShavingAnalyzer(config).optimize()
+    assert results.total_yearly_costs_eur == pytest.approx(expected.total_yearly_costs_eur)
+
+
+def test_batch_with_shared_timeseries(make_config):
+    configs = [make_config("native", n_timesteps=48) for _ in range(3)]
+
+    with SharedTimeseriesStore() as store:
+        batch_results = list(optimize_batch(configs, n_workers=2, shared_timeseries=store))
+
+    assert all(r.ok for r in batch_results)
+    expected = PeakShavingAnalyzer(configs[0]).optimize().total_yearly_costs_eur
+    assert [r.results.total_yearly_costs_eur for r in batch_results] == pytest.approx([expected] * 3)
+
+
+def test_attaching_process_does_not_remove_shared_memory(tmp_path):
+    with SharedTimeseriesStore() as store:
+        shared = store.share_timeseries(pd.Series(np.arange(96.0)))
+        (tmp_path / "shared.pkl").write_bytes(pickle.dumps(shared))
+
+        code = f"import pickle; print(pickle.load(open({str(tmp_path / 'shared.pkl')!r}, 'rb')).load().sum())"
+        attached = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True)
+        assert float(attached.stdout) == np.arange(96).sum()
+
+        # still available after the other process exited
+        shared_memory.SharedMemory(name=shared.columns[0].location).close()
+
+    # closing tolerates segments removed by others
+    store = SharedTimeseriesStore()
+    shared = store.share_timeseries(pd.Series(np.arange(4.0)))
+    shared_memory.SharedMemory(name=shared.columns[0].location).unlink()
+    store.close()
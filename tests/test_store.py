@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from peakshaving_analyzer.output import Results
+from peakshaving_analyzer.store import ResultStore
+
+N_TIMESTEPS = 48
+
+
+def _results(i, n_timesteps=N_TIMESTEPS):
+    consumption = pd.Series(np.arange(n_timesteps, dtype=float) + i)
+
+    return Results(
+        optimization_id=f"id_{i}",
+        name=f"profile_{i}",
+        grid_usage_kw=consumption.clip(upper=30),
+        storage_discharge_kw=(consumption - 30).clip(lower=0),
+        consumption_kw=consumption,
+        energy_price_eur=pd.Series(0.2, index=range(n_timesteps)),
+        grid_capacity_kw=30.0,
+        total_yearly_costs_eur=100.0 + i,
+    )
+
+
+def test_append_and_slice(tmp_path):
+    store = ResultStore(tmp_path / "store")
+    store.extend(_results(i) for i in range(3))
+
+    assert len(store) == 3
+    assert store.array("consumption_kw").shape == (3, N_TIMESTEPS)
+    np.testing.assert_array_equal(store.get("consumption_kw", 1), np.arange(N_TIMESTEPS) + 1)
+    np.testing.assert_array_equal(store.get("consumption_kw", [0, 2], slice(10, 12)), [[10, 11], [12, 13]])
+
+    # components missing in the results are stored as zeros
+    assert not store.get("storage_charge_kw").any()
+
+    assert store.summary["total_yearly_costs_eur"].tolist() == [100.0, 101.0, 102.0]
+    assert store.index("id_2") == 2
+
+
+def test_reopen(tmp_path):
+    ResultStore(tmp_path, dtype="float32").append(_results(0))
+
+    store = ResultStore(tmp_path)
+    store.append(_results(1))
+
+    assert store.array("grid_usage_kw").dtype == np.float32
+    assert len(ResultStore(tmp_path)) == 2
+
+    results = store.results(1)
+    assert results.name == "profile_1"
+    assert results.grid_capacity_kw == 30.0
+    assert results.storage_capacity_kwh is None
+    pd.testing.assert_series_equal(results.consumption_kw, _results(1).consumption_kw, check_dtype=False)
+
+
+def test_peak_reduction(tmp_path):
+    store = ResultStore(tmp_path)
+    store.extend(_results(i) for i in range(3))
+
+    reduction = store.peak_reduction()
+
+    assert reduction.tolist() == [17.0, 18.0, 19.0]
+    assert reduction.index.tolist() == ["profile_0", "profile_1", "profile_2"]
+
+
+def test_length_mismatch(tmp_path):
+    store = ResultStore(tmp_path)
+    store.append(_results(0))
+
+    short = _results(1, n_timesteps=10)
+
+    with pytest.raises(ValueError):
+        store.append(short)
+    assert len(store) == 1
@@ -0,0 +1,115 @@
+import warnings
+from dataclasses import replace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from peakshaving_analyzer.fast import StorageSizing
+from peakshaving_analyzer.TSA import TimeseriesAnalyzer, calculate_portfolio_statistics
+
+
+def test_statistics_match_pandas(make_config):
+    config = make_config("native", hours_per_timestep=0.25, n_timesteps=96)
+    consumption = config.consumption_timeseries
+
+    stats = TimeseriesAnalyzer(config).calculate_statistics()
+
+    assert stats["min_load_kw"] == consumption.min()
+    assert stats["max_load_kw"] == consumption.max()
+    assert stats["mean_load_kw"] == pytest.approx(consumption.mean())
+    assert stats["median_load_kw"] == consumption.median()
+    assert stats["variance"] == pytest.approx(consumption.var())
+    assert stats["std"] == pytest.approx(consumption.std())
+    assert stats["total_consumption_kwh"] == pytest.approx(consumption.sum() * 0.25)
+    assert stats["p95_load_kw"] == consumption.quantile(0.95)
+    assert stats["full_load_hours"] == pytest.approx(consumption.sum() * 0.25 / consumption.max())
+    assert stats["peak_to_average_ratio"] == pytest.approx(consumption.max() / consumption.mean())
+
+
+def test_statistics_are_cached_until_the_config_changes(make_config):
+    config = make_config("native")
+    tsa = TimeseriesAnalyzer(config)
+
+    consumption = tsa.consumption()
+    stats = tsa.calculate_statistics()
+    assert tsa.consumption() is consumption
+    assert not consumption.flags.writeable
+    # the config's timeseries stays writable
+    config.consumption_timeseries.iloc[0] = 5
+
+    config.consumption_timeseries = config.consumption_timeseries * 2
+    assert tsa.calculate_statistics()["max_load_kw"] == 2 * stats["max_load_kw"]
+
+    tsa.config = replace(config, hours_per_timestep=0.5)
+    assert tsa.calculate_statistics()["total_consumption_kwh"] == stats["total_consumption_kwh"]
+
+
+def test_portfolio_statistics_match_single_profiles(make_config):
+    rng = np.random.default_rng(0)
+    consumption = rng.uniform(0, 100, size=(5, 96))
+
+    df = calculate_portfolio_statistics(consumption, 0.25, names=list("abcde"))
+
+    assert list(df.index) == list("abcde")
+    for name, values in zip(df.index, consumption, strict=True):
+        config = make_config("native", hours_per_timestep=0.25, n_timesteps=96)
+        config.consumption_timeseries = pd.Series(values)
+        expected = TimeseriesAnalyzer(config).calculate_statistics()
+        assert df.loc[name].to_dict() == pytest.approx(expected)
+
+    with pytest.raises(ValueError):
+        calculate_portfolio_statistics(consumption[0], 0.25)
+
+
+def test_statistics_of_a_single_timestep():
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        df = calculate_portfolio_statistics(np.array([[5.0]]), 1)
+
+    assert np.isnan(df["variance"].iloc[0])
+    assert np.isnan(df["std"].iloc[0])
+    assert df["max_load_kw"].iloc[0] == 5
+
+
+def test_load_duration_curve(make_config):
+    config = make_config("native", hours_per_timestep=0.25, n_timesteps=96)
+
+    ldc = TimeseriesAnalyzer(config).load_duration_curve()
+
+    np.testing.assert_array_equal(ldc["load_kw"], np.sort(config.consumption_timeseries)[::-1])
+    assert ldc["hours"].iloc[-1] == 24
+
+
+def test_shaving_potential(make_config):
+    config = make_config(
+        "native",
+        n_timesteps=6,
+        storage_charge_efficiency=1,
+        storage_discharge_efficiency=1,
+        inverter_efficiency=1,
+    )
+    config.consumption_timeseries = pd.Series([1.0, 1, 5, 1, 1, 5])
+
+    df = TimeseriesAnalyzer(config).shaving_potential([6, 4, 3, 2, 1])
+
+    assert df["peak_reduction_kw"].tolist() == [0, 1, 2, 3, 4]
+    assert df["hours_above_cap"].tolist() == [0, 2, 2, 2, 2]
+    assert df["energy_above_cap_kwh"].tolist() == [0, 2, 4, 6, 8]
+    # charging before the peaks is limited by the cap, below a cap of 3 the first peak can't be covered
+    np.testing.assert_allclose(df["storage_energy_kwh"], [0, 1, 2, np.nan, np.nan])
+
+
+def test_shaving_potential_is_lower_bound_of_fast_sizing(make_config):
+    config = make_config("fast", n_timesteps=96, hours_per_timestep=0.25)
+    config.price_timeseries = pd.DataFrame({"grid": [0.2] * 96, "consumption_site": [0] * 96})
+    tsa = TimeseriesAnalyzer(config)
+
+    df = tsa.shaving_potential()
+
+    assert len(df) == 10
+    sizing = StorageSizing(config)
+    for cap, storage_kwh in zip(df["peak_cap_kw"], df["storage_energy_kwh"], strict=True):
+        size = sizing.size(cap)
+        if size is not None:
+            assert storage_kwh <= size[0] * (1 + 1e-6)